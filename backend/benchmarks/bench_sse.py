@@ -0,0 +1,174 @@
+"""
+Subscriber-scaling benchmark for the /api/logs SSE endpoint.
+
+Starts the server in a child process in either 'threaded' (Flask) or
+'async' (AsyncSSEServer) mode, connects increasing numbers of idle
+subscribers, then publishes timestamped lines and records, per subscriber
+count, the server's resident memory and thread count and the delivery
+latency from publish to receipt.
+
+Usage:
+    python -m benchmarks.bench_sse --mode async --subscribers 10 100 1000
+    python -m benchmarks.bench_sse --mode threaded --subscribers 10 100 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve(mode, port, interval):
+    """Child process: run the server and publish a timestamped line every interval seconds."""
+    from src.utils.logging import log_broadcaster
+
+    if mode == 'async':
+        from src.async_sse import AsyncSSEServer
+        AsyncSSEServer('127.0.0.1', port).start_in_thread()
+    else:
+        import threading
+        from werkzeug.serving import make_server
+        from src.flask_app import create_app
+        server = make_server('127.0.0.1', port, create_app(), threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    sys.__stdout__.write('READY\n')
+    sys.__stdout__.flush()
+    # Publish only when told to, so idle memory is measured without traffic
+    for command in sys.stdin:
+        if command.strip() == 'burst':
+            for _ in range(10):
+                log_broadcaster.publish(f"Agent: bench {time.time():.6f}")
+                time.sleep(interval)
+
+
+def process_stats(pid):
+    """Return the resident memory in KiB and the thread count of a process."""
+    stats = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                stats['rss_kib'] = int(line.split()[1])
+            elif line.startswith('Threads:'):
+                stats['threads'] = int(line.split()[1])
+    return stats
+
+
+async def subscribe(port, sink, ready):
+    """Open one SSE connection and record the latency of every bench line received."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET /api/logs HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nAccept: text/event-stream\r\n\r\n'.encode())
+    await writer.drain()
+    await reader.readuntil(b'\r\n\r\n')
+    ready.release()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b'data: Agent: bench '):
+                sink['latencies'].append(time.time() - float(line.split()[-1]))
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_level(port, pid, server, count, clients, sink):
+    """Grow the subscriber pool to count, then measure memory and delivery latency."""
+    ready = asyncio.Semaphore(0)
+    new_clients = count - len(clients)
+    for _ in range(new_clients):
+        clients.append(asyncio.ensure_future(subscribe(port, sink, ready)))
+    for _ in range(new_clients):
+        await asyncio.wait_for(ready.acquire(), timeout=60)
+    await asyncio.sleep(1)
+    idle = process_stats(pid)
+
+    latencies = sink['latencies'] = []
+    server.stdin.write('burst\n')
+    server.stdin.flush()
+    await asyncio.sleep(2)
+
+    return {
+        'subscribers': count,
+        'rss_kib': idle.get('rss_kib'),
+        'threads': idle.get('threads'),
+        'deliveries': len(latencies),
+        'latency_p50_ms': statistics.median(latencies) * 1000 if latencies else None,
+        'latency_max_ms': max(latencies) * 1000 if latencies else None,
+    }
+
+
+async def run(mode, port, levels):
+    """Start the server process and measure each subscriber level."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.bench_sse', '--serve', '--mode', mode, '--port', str(port)],
+        cwd=BACKEND_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        while server.stdout.readline().strip() != 'READY':
+            pass
+        base = process_stats(server.pid)
+        results = [{'subscribers': 0, **base, 'deliveries': 0, 'latency_p50_ms': None, 'latency_max_ms': None}]
+        clients = []
+        sink = {'latencies': []}
+        for count in sorted(levels):
+            results.append(await run_level(port, server.pid, server, count, clients, sink))
+        for client in clients:
+            client.cancel()
+        return results
+    finally:
+        server.kill()
+
+
+def free_port():
+    """Pick a free TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['threaded', 'async'], default='async')
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[10, 100, 500, 1000])
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.mode, args.port, interval=0.05)
+        return
+
+    # Each subscriber needs a socket on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, 2 * max(args.subscribers) + 256)), hard))
+
+    results = asyncio.run(run(args.mode, args.port or free_port(), args.subscribers))
+
+    print(f"SSE mode: {args.mode}")
+    print(f"{'subscribers':>11} {'RSS MiB':>8} {'KiB/sub':>8} {'threads':>7} {'deliveries':>10} {'p50 ms':>8} {'max ms':>8}")
+    base_rss = results[0]['rss_kib']
+    for row in results:
+        per_sub = (row['rss_kib'] - base_rss) / row['subscribers'] if row['subscribers'] else 0
+        p50 = f"{row['latency_p50_ms']:.1f}" if row['latency_p50_ms'] is not None else '-'
+        peak = f"{row['latency_max_ms']:.1f}" if row['latency_max_ms'] is not None else '-'
+        print(f"{row['subscribers']:>11} {row['rss_kib'] / 1024:>8.1f} {per_sub:>8.1f} {row['threads']:>7} "
+              f"{row['deliveries']:>10} {p50:>8} {peak:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'mode': args.mode, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
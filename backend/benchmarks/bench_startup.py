@@ -0,0 +1,209 @@
+"""
+Cold-start benchmark for the backend.
+
+For each run, starts the app built by create_app() in a fresh process and
+records the time from spawning it to the first successful response of
+/api/health/live, the time until /api/health/ready reports CrewAI loaded,
+and the server's resident memory at both points. A separate
+`python -X importtime` run breaks the import time down per module for
+src.flask_app, crew, crewai, dotenv and flask and lists the slowest
+imports.
+
+Results are written as JSON to benchmarks/results/startup-<commit>.json
+(or --output), so cold-start regressions show up when comparing commits.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.bench_sse import BACKEND_DIR, free_port, process_stats
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+
+# Modules whose cumulative import time is reported
+TRACKED_MODULES = ['src.flask_app', 'crew', 'crewai', 'dotenv', 'flask']
+
+# Imports measured by the import-time breakdown; crew (and crewai) load on the warm-up thread
+IMPORT_SCRIPT = (
+    "import dotenv\n"
+    "import src.flask_app\n"
+    "try:\n"
+    "    import crew\n"
+    "except ImportError:\n"
+    "    pass\n"
+    "import sys\n"
+    "print(' '.join(sys.modules))\n"
+)
+
+
+def serve(port):
+    """Child process: build the app and serve it."""
+    from werkzeug.serving import make_server
+    from src.flask_app import create_app
+    make_server('127.0.0.1', port, create_app(), threaded=True).serve_forever()
+
+
+def wait_for(url, deadline, accept=lambda status, body: status == 200):
+    """Poll a URL until accept(status, body) holds; return the time it did, or None."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.005)
+            continue
+        if accept(status, body):
+            return time.perf_counter()
+        time.sleep(0.005)
+    return None
+
+
+def measure_startup(timeout):
+    """Start the server once and measure time to first response, readiness and memory."""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--serve', '--port', str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        first_response = wait_for(f'{base_url}/api/health/live', deadline)
+        if first_response is None:
+            raise RuntimeError(f'Server did not answer within {timeout}s')
+        live_stats = process_stats(server.pid)
+
+        # Ready, or settled in a state that will never become ready (e.g. crewai not installed)
+        def settled(status, body):
+            state = json.loads(body).get('crewai', {}).get('state')
+            return status == 200 or state in ('unavailable', 'failed')
+        settled_at = wait_for(f'{base_url}/api/health/ready', deadline, settled)
+        with urllib.request.urlopen(f'{base_url}/api/health', timeout=5) as response:
+            crewai_status = json.loads(response.read()).get('crewai', {})
+        ready_stats = process_stats(server.pid)
+
+        return {
+            'first_response_ms': (first_response - started) * 1000,
+            'ready_ms': (settled_at - started) * 1000 if settled_at and crewai_status.get('state') == 'ready' else None,
+            'crewai_state': crewai_status.get('state'),
+            'rss_kib_at_first_response': live_stats.get('rss_kib'),
+            'rss_kib_when_settled': ready_stats.get('rss_kib'),
+            'threads_when_settled': ready_stats.get('threads'),
+        }
+    finally:
+        server.kill()
+        server.wait()
+
+
+def measure_imports(top):
+    """Run the imports under -X importtime and return tracked and slowest modules in ms."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_SCRIPT],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    cumulative, self_times = {}, {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        module = name.strip()
+        # A module is only reported the first time it is imported
+        cumulative.setdefault(module, int(cumulative_us) / 1000)
+        self_times.setdefault(module, int(self_us) / 1000)
+
+    # Failed imports are still timed but are not left in sys.modules
+    loaded = set(completed.stdout.split())
+    slowest = sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'tracked_ms': {module: cumulative.get(module) if module in loaded else None for module in TRACKED_MODULES},
+        'slowest_self_ms': [{'module': module, 'ms': ms} for module, ms in slowest],
+        'total_modules': len(cumulative),
+    }
+
+
+def git_commit():
+    """Return the short hash of the current commit, or 'unknown'."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def summarize(values):
+    """Median, min and max of the non-missing values."""
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Number of cold starts to measure')
+    parser.add_argument('--timeout', type=float, default=120, help='Seconds to wait for a server to start')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest imports to list')
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/startup-<commit>.json)')
+    parser.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    runs = [measure_startup(args.timeout) for _ in range(args.runs)]
+    imports = measure_imports(args.top)
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': runs,
+        'summary': {
+            key: summarize([run[key] for run in runs])
+            for key in ('first_response_ms', 'ready_ms', 'rss_kib_at_first_response', 'rss_kib_when_settled')
+        },
+        'imports': imports,
+    }
+
+    summary = results['summary']
+    print(f"Cold start ({args.runs} runs, commit {commit}, crewai {runs[-1]['crewai_state']})")
+    for key, label in (('first_response_ms', 'time to first response'), ('ready_ms', 'time to ready')):
+        stats = summary[key]
+        print(f"  {label:<24} " + (f"{stats['median']:8.1f} ms (min {stats['min']:.1f}, max {stats['max']:.1f})"
+                                   if stats else '       - (never ready)'))
+    for key, label in (('rss_kib_at_first_response', 'RSS at first response'), ('rss_kib_when_settled', 'RSS when settled')):
+        print(f"  {label:<24} {summary[key]['median'] / 1024:8.1f} MiB")
+
+    print("\nImport time (cumulative)")
+    for module, ms in imports['tracked_ms'].items():
+        print(f"  {module:<24} " + (f"{ms:8.1f} ms" if ms is not None else '       - (not imported)'))
+    print(f"\nSlowest imports (self time, of {imports['total_modules']} modules)")
+    for entry in imports['slowest_self_ms']:
+        print(f"  {entry['module']:<48} {entry['ms']:8.1f} ms")
+
+    output = args.output or os.path.join(RESULTS_DIR, f'startup-{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+"""
+Local OpenAI-compatible stand-in LLM server for offline benchmarks.
+
+Serves POST /v1/chat/completions (plain and streaming) with canned
+responses chosen by the task the prompt belongs to, so the whole crew
+runs end to end with no network and no provider costs. Latency, token
+rate, error rate and rate limiting (429) are configurable to mimic a
+real provider under load. GET /stats returns request counters.
+
+Point the backend at it with, keeping canned outputs out of the real caches:
+    LLM_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub \\
+    LLM_CACHE_ENABLED=False INCREMENTAL_REGENERATION=False \\
+    LITELLM_LOCAL_MODEL_COST_MAP=True CREWAI_DISABLE_TELEMETRY=true python app.py
+
+Usage:
+    python -m benchmarks.llm_stub_server --port 8001 --latency-ms 800 --latency-dist lognormal \\
+        --tokens-per-second 80 --error-rate 0.01 --rate-limit-rate 0.02 --max-concurrency 8
+    python -m benchmarks.llm_stub_server --responses my_responses.json
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Canned answers by task, matched against the prompt in order; the last entry is the fallback
+DEFAULT_RESPONSES = [
+    (r'unit tests|test_', (
+        "import unittest\n"
+        "from main import Application\n\n\n"
+        "class TestApplication(unittest.TestCase):\n"
+        "    def test_create(self):\n"
+        "        self.assertIsNotNone(Application())\n\n\n"
+        "if __name__ == '__main__':\n"
+        "    unittest.main()\n"
+    )),
+    (r'\bUI\b|frontend', (
+        "import React from 'react';\n\n"
+        "export default function App() {\n"
+        "  return <div><h1>Application demo</h1></div>;\n"
+        "}\n"
+    )),
+    (r'security', (
+        "# Security Audit\n\n"
+        "## Findings\n- Validate all user input before use.\n- Avoid storing secrets in code.\n\n"
+        "## Recommendations\n- Add input validation to every public method.\n"
+    )),
+    (r'performance', (
+        "# Performance Report\n\n"
+        "## Bottlenecks\n- Repeated linear scans over stored items.\n\n"
+        "## Optimizations\n- Index items by id in a dictionary for O(1) lookups.\n"
+    )),
+    (r'deploy|Docker|CI/CD', (
+        "#!/bin/sh\nset -e\n"
+        "pip install -r requirements.txt\n"
+        "python -m unittest\n"
+        "python main.py\n"
+    )),
+    (r'documentation|README', (
+        "# Application\n\n"
+        "## Setup\n\n    pip install -r requirements.txt\n\n"
+        "## Usage\n\n    from main import Application\n    app = Application()\n"
+    )),
+    (r'python module that implements', (
+        "class Application:\n"
+        "    \"\"\"Minimal implementation of the requested application.\"\"\"\n\n"
+        "    def __init__(self):\n"
+        "        self.items = {}\n\n"
+        "    def add(self, key, value):\n"
+        "        self.items[key] = value\n\n"
+        "    def get(self, key):\n"
+        "        return self.items.get(key)\n"
+    )),
+    (r'design', (
+        "# Design\n\n"
+        "## Module main.py\n\n"
+        "### class Application\n"
+        "- `__init__(self)`: set up storage.\n"
+        "- `add(self, key, value)`: store an item.\n"
+        "- `get(self, key)`: return a stored item.\n"
+    )),
+    (r'', "Done."),
+]
+
+
+def estimate_tokens(text):
+    """Rough token count, about four characters per token."""
+    return max(1, len(text) // 4)
+
+
+class StubBehavior:
+    """
+    Latency, throughput and failure settings of the stub, plus its counters.
+
+    Attributes:
+        latency_ms: Mean time to first token.
+        latency_jitter_ms: Spread of the latency distribution.
+        latency_dist: 'fixed', 'uniform', 'normal' or 'lognormal'.
+        tokens_per_second: Generation speed; 0 returns the whole answer at once.
+        error_rate: Probability of answering 500.
+        rate_limit_rate: Probability of answering 429.
+        max_concurrency: Requests served at once before answering 429, 0 for unlimited.
+        retry_after: Retry-After seconds sent with 429 responses.
+        responses: (pattern, answer) pairs tried in order against the prompt.
+    """
+
+    def __init__(self, args, responses):
+        self.latency_ms = args.latency_ms
+        self.latency_jitter_ms = args.latency_jitter_ms
+        self.latency_dist = args.latency_dist
+        self.tokens_per_second = args.tokens_per_second
+        self.error_rate = args.error_rate
+        self.rate_limit_rate = args.rate_limit_rate
+        self.max_concurrency = args.max_concurrency
+        self.retry_after = args.retry_after
+        self.responses = [(re.compile(pattern, re.IGNORECASE), answer) for pattern, answer in responses]
+        self.random = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.counters = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0,
+                         'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def sample_latency(self):
+        """Draw a time to first token in seconds from the configured distribution."""
+        mean, jitter = self.latency_ms, self.latency_jitter_ms
+        with self.lock:
+            if self.latency_dist == 'uniform':
+                value = self.random.uniform(mean - jitter, mean + jitter)
+            elif self.latency_dist == 'normal':
+                value = self.random.gauss(mean, jitter)
+            elif self.latency_dist == 'lognormal' and mean > 0:
+                # Parameterized so the distribution has the given mean and standard deviation
+                sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2))
+                value = self.random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+            else:
+                value = mean
+        return max(0.0, value) / 1000
+
+    def roll(self, probability):
+        """Return True with the given probability."""
+        with self.lock:
+            return self.random.random() < probability
+
+    def answer(self, messages):
+        """Pick the canned answer for a conversation, in the agents' Final Answer format."""
+        prompt = '\n'.join(str(message.get('content', '')) for message in messages)
+        body = next(answer for pattern, answer in self.responses if pattern.search(prompt))
+        return f"Thought: I now know the final answer\nFinal Answer: {body}"
+
+    def count(self, **amounts):
+        with self.lock:
+            for key, amount in amounts.items():
+                self.counters[key] += amount
+
+    def stats(self):
+        with self.lock:
+            return {**self.counters, 'in_flight': self.in_flight}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the chat-completions subset the agents use."""
+    protocol_version = 'HTTP/1.1'
+    behavior: StubBehavior = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/') in ('/stats', '/v1/stats'):
+            self._send_json(200, self.behavior.stats())
+        elif self.path.rstrip('/') in ('/models', '/v1/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'stub', 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON', 'type': 'invalid_request_error'}})
+            return
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+
+        behavior = self.behavior
+        behavior.count(requests=1)
+        with behavior.lock:
+            over_capacity = bool(behavior.max_concurrency) and behavior.in_flight >= behavior.max_concurrency
+            if not over_capacity:
+                behavior.in_flight += 1
+        if over_capacity or behavior.roll(behavior.rate_limit_rate):
+            behavior.count(rate_limited=1)
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}},
+                            {'Retry-After': str(behavior.retry_after)})
+            if not over_capacity:
+                with behavior.lock:
+                    behavior.in_flight -= 1
+            return
+
+        try:
+            time.sleep(behavior.sample_latency())
+            if behavior.roll(behavior.error_rate):
+                behavior.count(errors=1)
+                self._send_json(500, {'error': {'message': 'Stub server error', 'type': 'server_error'}})
+                return
+            self._complete(request)
+        finally:
+            with behavior.lock:
+                behavior.in_flight -= 1
+
+    def _complete(self, request):
+        """Answer a chat completion, pacing tokens at the configured rate."""
+        behavior = self.behavior
+        messages = request.get('messages') or []
+        model = request.get('model', 'stub')
+        content = behavior.answer(messages)
+        prompt_tokens = sum(estimate_tokens(str(message.get('content', ''))) for message in messages)
+        completion_tokens = estimate_tokens(content)
+        behavior.count(ok=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        completion_id = f'chatcmpl-{uuid.uuid4().hex}'
+        created = int(time.time())
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+
+        if not request.get('stream'):
+            if behavior.tokens_per_second:
+                time.sleep(completion_tokens / behavior.tokens_per_second)
+            self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                             'finish_reason': 'stop'}],
+                'usage': usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta, finish_reason=None, **extra):
+            data = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                    'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}], **extra}
+            self.wfile.write(f"data: {json.dumps(data)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        chunk({'role': 'assistant', 'content': ''})
+        # About one token per four characters
+        for start in range(0, len(content), 4):
+            chunk({'content': content[start:start + 4]})
+            if behavior.tokens_per_second:
+                time.sleep(1 / behavior.tokens_per_second)
+        chunk({}, 'stop', usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(host, port, behavior):
+    """Create a threaded stub server with the given behavior."""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'behavior': behavior})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency-ms', type=float, default=500, help='Mean time to first token')
+    parser.add_argument('--latency-jitter-ms', type=float, default=200, help='Spread of the latency distribution')
+    parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'normal', 'lognormal'], default='lognormal')
+    parser.add_argument('--tokens-per-second', type=float, default=0, help='Generation speed, 0 for instant')
+    parser.add_argument('--error-rate', type=float, default=0, help='Probability of a 500 response')
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help='Probability of a 429 response')
+    parser.add_argument('--max-concurrency', type=int, default=0, help='In-flight requests before 429, 0 for unlimited')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds of 429 responses')
+    parser.add_argument('--responses', help='JSON file with [pattern, answer] pairs replacing the canned answers')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    responses = DEFAULT_RESPONSES
+    if args.responses:
+        with open(args.responses) as f:
+            responses = [tuple(pair) for pair in json.load(f)] + [(r'', 'Done.')]
+
+    server = make_server(args.host, args.port, StubBehavior(args, responses))
+    print(f"🤖 Stub LLM server listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
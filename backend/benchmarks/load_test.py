@@ -0,0 +1,356 @@
+"""
+Concurrent end-to-end load test for the backend.
+
+Starts the stub LLM server (benchmarks.llm_stub_server) in this process
+and the app built by create_app() in a child process pointed at it, then
+for --duration seconds drives at the same time:
+
+- code generation: workers that submit /api/code-generation and follow
+  each job to completion through /api/jobs/<id>,
+- requirements: workers posting /api/requirements back to back,
+- live logs: idle subscribers connected to /api/logs.
+
+Every --sample-interval seconds the server's resident memory, thread count
+and job queue are sampled. The report gives, per scenario, throughput,
+p50/p95/p99 latency and the error rate, plus the samples over time. The LLM
+cache and incremental regeneration are turned off in the server so every
+job really runs its crew.
+
+Results are written as JSON to benchmarks/results/load-<commit>.json
+(or --output). With --url the test runs against an already running server
+instead (start it with LLM_BASE_URL pointing at a stub server).
+
+Usage:
+    python -m benchmarks.load_test --generate-workers 4 --requirements-workers 8 --subscribers 100 --duration 60
+    python -m benchmarks.load_test --llm-latency-ms 200 --llm-rate-limit-rate 0.05 --max-concurrent-jobs 4
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks import llm_stub_server
+from benchmarks.bench_sse import BACKEND_DIR, free_port, process_stats
+from benchmarks.bench_startup import RESULTS_DIR, git_commit, wait_for
+
+REQUIREMENTS = "Create a small inventory application with items that can be added, listed and removed."
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a list of numbers, or None if it is empty.
+
+    The same definition as src.services.planner.percentile, so the load test
+    and /api/plan report comparable p50/p95. It is not imported: importing
+    src builds the app's global services in this client process.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Recorder:
+    """
+    Thread-safe collection of request outcomes per scenario.
+
+    Methods:
+        record(scenario, seconds, ok, status) -> None: Add one request outcome.
+        summary(elapsed) -> Dict: Throughput, latency percentiles and error rate per scenario.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._outcomes = {}
+
+    def record(self, scenario, seconds, ok, status=None):
+        with self._lock:
+            outcomes = self._outcomes.setdefault(scenario, {'latencies': [], 'errors': 0, 'statuses': {}})
+            outcomes['latencies'].append(seconds)
+            if not ok:
+                outcomes['errors'] += 1
+            key = str(status)
+            outcomes['statuses'][key] = outcomes['statuses'].get(key, 0) + 1
+
+    def summary(self, elapsed):
+        with self._lock:
+            outcomes = {scenario: dict(values, latencies=list(values['latencies']))
+                        for scenario, values in self._outcomes.items()}
+        results = {}
+        for scenario, values in outcomes.items():
+            latencies = values['latencies']
+            results[scenario] = {
+                'requests': len(latencies),
+                'errors': values['errors'],
+                'error_rate': values['errors'] / len(latencies) if latencies else 0,
+                'throughput_per_second': (len(latencies) - values['errors']) / elapsed if elapsed else 0,
+                'p50_ms': _ms(percentile(latencies, 0.50)),
+                'p95_ms': _ms(percentile(latencies, 0.95)),
+                'p99_ms': _ms(percentile(latencies, 0.99)),
+                'max_ms': _ms(max(latencies) if latencies else None),
+                'mean_ms': _ms(statistics.mean(latencies) if latencies else None),
+                'statuses': values['statuses'],
+            }
+        return results
+
+
+def _ms(seconds):
+    return seconds * 1000 if seconds is not None else None
+
+
+def request(method, url, payload=None, timeout=30, session_id=None):
+    """Send a JSON request and return (status, parsed body); the status is None on connection errors."""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    headers = {'Content-Type': 'application/json'}
+    if session_id:
+        headers['X-Session-Id'] = session_id
+    req = urllib.request.Request(url, data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b'{}')
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read() or b'{}')
+        except ValueError:
+            return e.code, {}
+    except (urllib.error.URLError, ConnectionError, OSError, ValueError):
+        return None, {}
+
+
+def generate_worker(base_url, stop, recorder, job_timeout, poll_interval):
+    """Submit code generation jobs one after another and follow each to completion."""
+    submission = 0
+    while not stop.is_set():
+        submission += 1
+        # Distinct requirements per submission, so identical in-flight jobs are not coalesced
+        requirements = f"{REQUIREMENTS} (client {threading.get_ident()}, request {submission})"
+        started = time.perf_counter()
+        status, body = request('POST', f'{base_url}/api/code-generation', {'requirements': requirements})
+        recorder.record('generate_submit', time.perf_counter() - started, status == 202, status)
+        if status != 202:
+            # Back off on a full queue like a client honouring Retry-After
+            stop.wait(1 if status == 503 else 0.1)
+            continue
+
+        job_url = f"{base_url}{body['status_url']}"
+        deadline = started + job_timeout
+        state = None
+        while time.perf_counter() < deadline:
+            _, body = request('GET', job_url)
+            state = body.get('job', {}).get('state')
+            if state in ('succeeded', 'failed'):
+                break
+            time.sleep(poll_interval)
+        recorder.record('generate_job', time.perf_counter() - started, state == 'succeeded', state or 'timeout')
+
+
+def requirements_worker(base_url, stop, recorder):
+    """Post requirements back to back, each worker in its own session."""
+    session_id = f'load-{threading.get_ident()}'
+    while not stop.is_set():
+        started = time.perf_counter()
+        status, _ = request('POST', f'{base_url}/api/requirements', {'requirements': REQUIREMENTS},
+                            session_id=session_id)
+        recorder.record('requirements', time.perf_counter() - started, status == 200, status)
+
+
+def log_subscriber(base_url, stop, recorder, counts):
+    """Hold one /api/logs connection open, reconnecting on errors, and count received lines."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(f'{base_url}/api/logs', timeout=60) as response:
+                recorder.record('logs_connect', time.perf_counter() - started, True, response.status)
+                while not stop.is_set():
+                    line = response.readline()
+                    if not line:
+                        break
+                    if line.startswith(b'data:'):
+                        counts['lines'] += 1
+        except TimeoutError:
+            # A silent stream is not an error; reconnect
+            continue
+        except (urllib.error.URLError, ConnectionError, OSError) as e:
+            if stop.is_set():
+                break
+            status = e.code if isinstance(e, urllib.error.HTTPError) else None
+            recorder.record('logs_connect', time.perf_counter() - started, False, status)
+            stop.wait(0.5)
+
+
+def sampler(base_url, pid, stop, interval, started, samples):
+    """Record server memory, threads and job states every interval seconds."""
+    while not stop.wait(interval):
+        stats = process_stats(pid) if pid else {}
+        _, jobs = request('GET', f'{base_url}/api/jobs', timeout=5)
+        samples.append({
+            'elapsed_s': round(time.perf_counter() - started, 1),
+            'rss_kib': stats.get('rss_kib'),
+            'threads': stats.get('threads'),
+            'jobs': jobs.get('counts'),
+        })
+
+
+def start_server(args, llm_url, workdir):
+    """Start the backend in a child process configured for the load test."""
+    port = free_port()
+    env = dict(
+        os.environ,
+        LLM_BASE_URL=llm_url,
+        OPENAI_API_KEY=os.environ.get('OPENAI_API_KEY', 'stub'),
+        LITELLM_LOCAL_MODEL_COST_MAP='True',
+        CREWAI_DISABLE_TELEMETRY='true',
+        OTEL_SDK_DISABLED='true',
+        CREW_VERBOSE='False',
+        LLM_CACHE_ENABLED='False',
+        INCREMENTAL_REGENERATION='False',
+        CACHE_DIR=os.path.join(workdir, 'cache'),
+        WORKSPACE_ROOT=os.path.join(workdir, 'jobs'),
+        MAX_CONCURRENT_JOBS=str(args.max_concurrent_jobs),
+        MAX_PENDING_JOBS=str(args.max_pending_jobs),
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.bench_startup', '--serve', '--port', str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    if wait_for(f'{base_url}/api/health/live', time.perf_counter() + args.startup_timeout) is None:
+        server.kill()
+        raise RuntimeError(f'Server did not answer within {args.startup_timeout}s')
+    return server, base_url
+
+
+def start_llm_stub(args):
+    """Start the stub LLM server on a background thread and return it."""
+    stub_args = llm_stub_server.build_parser().parse_args([
+        '--port', '0',
+        '--latency-ms', str(args.llm_latency_ms),
+        '--latency-jitter-ms', str(args.llm_latency_jitter_ms),
+        '--tokens-per-second', str(args.llm_tokens_per_second),
+        '--error-rate', str(args.llm_error_rate),
+        '--rate-limit-rate', str(args.llm_rate_limit_rate),
+    ] + (['--seed', str(args.seed)] if args.seed is not None else []))
+    behavior = llm_stub_server.StubBehavior(stub_args, llm_stub_server.DEFAULT_RESPONSES)
+    stub = llm_stub_server.make_server('127.0.0.1', 0, behavior)
+    threading.Thread(target=stub.serve_forever, name='llm-stub', daemon=True).start()
+    return stub, behavior
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=60, help='Seconds of load')
+    parser.add_argument('--generate-workers', type=int, default=4, help='Concurrent code generation clients')
+    parser.add_argument('--requirements-workers', type=int, default=8, help='Concurrent requirements clients')
+    parser.add_argument('--subscribers', type=int, default=50, help='Idle /api/logs subscribers')
+    parser.add_argument('--sample-interval', type=float, default=2, help='Seconds between memory/thread samples')
+    parser.add_argument('--job-timeout', type=float, default=600, help='Seconds to wait for one job')
+    parser.add_argument('--poll-interval', type=float, default=0.5, help='Seconds between job status polls')
+    parser.add_argument('--max-concurrent-jobs', type=int, default=2, help='MAX_CONCURRENT_JOBS of the server')
+    parser.add_argument('--max-pending-jobs', type=int, default=20, help='MAX_PENDING_JOBS of the server')
+    parser.add_argument('--llm-latency-ms', type=float, default=300)
+    parser.add_argument('--llm-latency-jitter-ms', type=float, default=100)
+    parser.add_argument('--llm-tokens-per-second', type=float, default=0)
+    parser.add_argument('--llm-error-rate', type=float, default=0)
+    parser.add_argument('--llm-rate-limit-rate', type=float, default=0)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--startup-timeout', type=float, default=120)
+    parser.add_argument('--url', help='Test an already running server instead of starting one')
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/load-<commit>.json)')
+    args = parser.parse_args()
+
+    # Each subscriber holds a socket
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, 2 * args.subscribers + 256)), hard))
+
+    stub, behavior = start_llm_stub(args) if not args.url else (None, None)
+    workdir = tempfile.TemporaryDirectory(prefix='devteam-load-')
+    server = None
+    if args.url:
+        base_url, pid = args.url.rstrip('/'), None
+    else:
+        server, base_url = start_server(args, f'http://127.0.0.1:{stub.server_address[1]}/v1', workdir.name)
+        pid = server.pid
+
+    recorder = Recorder()
+    stop = threading.Event()
+    counts = {'lines': 0}
+    samples = []
+    started = time.perf_counter()
+    threads = [threading.Thread(target=sampler, args=(base_url, pid, stop, args.sample_interval, started, samples))]
+    threads += [threading.Thread(target=log_subscriber, args=(base_url, stop, recorder, counts))
+                for _ in range(args.subscribers)]
+    threads += [threading.Thread(target=requirements_worker, args=(base_url, stop, recorder))
+                for _ in range(args.requirements_workers)]
+    threads += [threading.Thread(target=generate_worker,
+                                 args=(base_url, stop, recorder, args.job_timeout, args.poll_interval))
+                for _ in range(args.generate_workers)]
+    try:
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        time.sleep(args.duration)
+    finally:
+        stop.set()
+        elapsed = time.perf_counter() - started
+        # Jobs in flight and idle subscribers are not waited for; the threads are daemons
+        join_deadline = time.perf_counter() + 5
+        for thread in threads:
+            thread.join(timeout=max(0, join_deadline - time.perf_counter()))
+        if server is not None:
+            server.kill()
+            server.wait()
+        if stub is not None:
+            stub.shutdown()
+        workdir.cleanup()
+
+    commit = git_commit()
+    scenarios = recorder.summary(elapsed)
+    results = {
+        'commit': commit,
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'elapsed_s': elapsed,
+        'scenarios': scenarios,
+        'log_lines_received': counts['lines'],
+        'llm_stub': behavior.stats() if behavior else None,
+        'samples': samples,
+    }
+
+    print(f"Load test ({elapsed:.0f}s, commit {commit}, {args.generate_workers} generate / "
+          f"{args.requirements_workers} requirements workers, {args.subscribers} log subscribers)")
+    print(f"  {'scenario':<16} {'requests':>8} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for scenario, row in sorted(scenarios.items()):
+        p50, p95, p99 = (f"{row[key]:.1f}" if row[key] is not None else '-' for key in ('p50_ms', 'p95_ms', 'p99_ms'))
+        print(f"  {scenario:<16} {row['requests']:>8} {row['throughput_per_second']:>8.2f} "
+              f"{row['error_rate']:>6.1%} {p50:>9} {p95:>9} {p99:>9}")
+    if samples:
+        rss = [sample['rss_kib'] for sample in samples if sample['rss_kib']]
+        threads_seen = [sample['threads'] for sample in samples if sample['threads']]
+        if rss:
+            print(f"  server RSS {rss[0] / 1024:.1f} -> {rss[-1] / 1024:.1f} MiB (peak {max(rss) / 1024:.1f}), "
+                  f"threads peak {max(threads_seen)}")
+    if behavior:
+        stats = behavior.stats()
+        print(f"  stub LLM: {stats['requests']} calls, {stats['errors']} errors, {stats['rate_limited']} rate limited")
+
+    output = args.output or os.path.join(RESULTS_DIR, f'load-{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,147 @@
-from crewai import Agent, Crew, Process, Task
+from crewai import Agent, Crew, LLM, Process, Task
+from crewai.crews.crew_output import CrewOutput
 from crewai.project import CrewBase, agent, crew, task
+from crewai.tasks.task_output import TaskOutput
 from src.config import Config
-import yaml
+from src.services.dag_executor import DagExecutor
+from src.services.config_snapshot import config_store
+from src.services.context_shaper import context_shaper
+from src.services.event_bus import (
+    CONTEXT_SHAPED,
+    CREW_FINISHED,
+    LLM_CALL_FINISHED,
+    LLM_CALL_STARTED,
+    TASK_FINISHED,
+    TASK_STARTED,
+    TOOL_CALL,
+    CrewEvent,
+    event_bus,
+)
+from src.services.llm_cache import llm_cache
+from src.services.model_router import model_router
+from src.services.task_output_store import task_output_store
+from src.services.workspace_service import Workspace
+from typing import Any, Callable, Dict, List, Optional
 import os
+import threading
+import time
+import uuid
+import yaml
+
+
+def _counted_tokens(callbacks) -> tuple:
+    """Prompt and completion tokens counted so far by crewai's token handlers among the callbacks"""
+    prompt_tokens = completion_tokens = 0
+    for callback in callbacks or []:
+        token_process = getattr(callback, 'token_cost_process', None)
+        if token_process is not None:
+            summary = token_process.get_summary()
+            prompt_tokens += summary.prompt_tokens
+            completion_tokens += summary.completion_tokens
+    return prompt_tokens, completion_tokens
+
+
+class InstrumentedLLM(LLM):
+    """
+    LLM that routes each call by its task's model policy, reports every call
+    on the event bus and answers repeated identical requests from the
+    on-disk LLM cache.
+    
+    The models to try come from the model router: the task's 'llm', its
+    fallback chain, and for report-style tasks optionally a downgrade model,
+    ordered by the latency target and recent failures. A failed call falls
+    through to the next model. Each attempt emits llm_call_started and
+    llm_call_finished events tagged with the task and the model actually
+    used, the latter with the call's duration and the prompt and completion
+    tokens that model used, so usage is charged to the model that actually
+    served the call, fallbacks and downgrades included. The cache key covers the
+    model, the provider endpoint (base URL), the rendered messages (which
+    include the upstream task context) and the sampling parameters, so any
+    change to the prompt or its inputs is a miss, and responses of one
+    endpoint (such as the benchmark stub) are never served for another. Calls that may invoke functions are never cached.
+    """
+    
+    task_key = None
+    # AGENT_CONFIG entry of the task from the team's pinned configuration snapshot
+    agent_config = None
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        models = model_router.route(self.task_key, self.agent_config) if self.task_key else [self.model]
+        for attempt, model in enumerate(models):
+            try:
+                return self._call_model(model, messages, tools, callbacks, available_functions, **kwargs)
+            except Exception as e:
+                model_router.record_failure(model)
+                if attempt == len(models) - 1:
+                    raise
+                print(f"⚠️ LLM {model} failed for task {self.task_key}, falling back: {e}")
+    
+    def _call_model(self, model, messages, tools, callbacks, available_functions, **kwargs):
+        """Call one model with event reporting and caching"""
+        cacheable = Config.LLM_CACHE_ENABLED and not (tools or available_functions)
+        event_bus.emit(LLM_CALL_STARTED, task_key=self.task_key, model=model)
+        started = time.perf_counter()
+        
+        tokens_before = _counted_tokens(callbacks)
+        
+        def finished(cached, error=None):
+            tokens_after = _counted_tokens(callbacks)
+            event_bus.emit(
+                LLM_CALL_FINISHED,
+                task_key=self.task_key,
+                model=model,
+                cached=cached,
+                duration_ms=(time.perf_counter() - started) * 1000,
+                error=error,
+                prompt_tokens=tokens_after[0] - tokens_before[0],
+                completion_tokens=tokens_after[1] - tokens_before[1],
+                run_id=event_bus.current('run_id'),
+            )
+        
+        llm = self if model == self.model else self._delegate(model)
+        if cacheable:
+            key = llm_cache.make_key(
+                model,
+                messages,
+                temperature=getattr(self, 'temperature', None),
+                stop=getattr(self, 'stop', None),
+                base_url=getattr(llm, 'base_url', None),
+                api_base=getattr(llm, 'api_base', None),
+            )
+            cached = llm_cache.get(key)
+            if cached is not None:
+                finished(cached=True)
+                return cached
+        
+        try:
+            if llm is self:
+                response = super().call(messages, tools=tools, callbacks=callbacks,
+                                        available_functions=available_functions, **kwargs)
+            else:
+                response = llm.call(messages, tools=tools, callbacks=callbacks,
+                                    available_functions=available_functions, **kwargs)
+        except Exception as e:
+            finished(cached=False, error=str(e))
+            raise
+        finished(cached=False)
+        
+        if cacheable and isinstance(response, str) and response:
+            llm_cache.set(key, response, model)
+        return response
+    
+    def _delegate(self, model):
+        """Plain LLM for another model of the chain, with the same endpoint and sampling parameters"""
+        delegates = self.__dict__.setdefault('_delegates', {})
+        if model not in delegates:
+            delegates[model] = LLM(
+                model=model,
+                temperature=getattr(self, 'temperature', None),
+                stop=getattr(self, 'stop', None),
+                base_url=Config.LLM_BASE_URL or None,
+                api_base=getattr(self, 'api_base', None),
+            )
+        return delegates[model]
+
 
 @CrewBase
 class EngineeringTeam():
@@ -19,10 +158,72 @@ class EngineeringTeam():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    # Shared prebuilt team, see template()
+    _template = None
+    _template_signature = None
+    _template_lock = threading.Lock()
+
     def __init__(self):
         super().__init__()
-        self.enabled_agents = Config.get_enabled_agents()
-        self.task_order = Config.get_task_order()
+        # Pin one configuration snapshot, so a reload never changes a built team
+        self.config = config_store.current()
+        self.enabled_agents = self.config.enabled_agents
+        self.task_order = list(self.config.task_order)
+
+    @classmethod
+    def template(cls) -> 'EngineeringTeam':
+        """
+        Return the shared, prebuilt team.
+        
+        Parsing the YAML configs and building the agents and tasks happens
+        once; the template is rebuilt only when config/agents.yaml,
+        config/tasks.yaml or the agent configuration snapshot change. Runs
+        never modify it: each one works on a copy made by new_run(), and runs
+        already in flight keep the team (and snapshot) they started with.
+        """
+        signature = cls._config_signature()
+        with cls._template_lock:
+            if cls._template is None or cls._template_signature != signature:
+                if cls._template is not None:
+                    print("🔄 Team configuration changed, rebuilding the crew template")
+                team = cls()
+                team.crew()
+                cls._template, cls._template_signature = team, signature
+            return cls._template
+
+    @classmethod
+    def _config_signature(cls) -> tuple:
+        """Modification times of the YAML configs and the signature of the agent configuration snapshot"""
+        base_directory = os.path.dirname(os.path.abspath(__file__))
+        mtimes = []
+        for path in (cls.agents_config, cls.tasks_config):
+            try:
+                mtimes.append(os.stat(os.path.join(base_directory, path)).st_mtime_ns)
+            except (OSError, TypeError):
+                mtimes.append(None)
+        return tuple(mtimes) + (config_store.current().signature,)
+
+    def new_run(self, workspace: Optional[Workspace] = None,
+                on_task_complete: Optional[Callable[[str, TaskOutput], None]] = None) -> 'CrewRun':
+        """Start a run on a private copy of the prebuilt crew; only the run's inputs are bound to it"""
+        return CrewRun(self, self.crew().copy(), workspace, on_task_complete)
+
+    def _llm(self, agent_key: str) -> LLM:
+        """
+        Builds the LLM for an agent from the routing policy of its AGENT_CONFIG entry.
+        
+        This takes precedence over any 'llm' set in config/agents.yaml. The
+        agent's model and the models each call is routed to both come from the
+        team's pinned configuration snapshot, so they never disagree.
+        """
+        agent_config = self.config.agents.get(agent_key, {})
+        llm = InstrumentedLLM(
+            model=model_router.chain(agent_key, agent_config)[0],
+            base_url=Config.LLM_BASE_URL or None,
+        )
+        llm.task_key = agent_key
+        llm.agent_config = agent_config
+        return llm
 
     # Core agents (always available)
     @agent
@@ -30,7 +231,8 @@ class EngineeringTeam():
         """Creates the engineering lead agent"""
         return Agent(
             config=self.agents_config['engineering_lead'],
-            verbose=True,
+            llm=self._llm('design'),
+            verbose=Config.CREW_VERBOSE,
         )
 
     @agent
@@ -38,7 +240,8 @@ class EngineeringTeam():
         """Creates the backend engineer agent"""
         return Agent(
             config=self.agents_config['backend_engineer'],
-            verbose=True,
+            llm=self._llm('backend_code'),
+            verbose=Config.CREW_VERBOSE,
         )
     
     @agent
@@ -46,7 +249,8 @@ class EngineeringTeam():
         """Creates the frontend engineer agent"""
         return Agent(
             config=self.agents_config['frontend_engineer'],
-            verbose=True,
+            llm=self._llm('frontend_code'),
+            verbose=Config.CREW_VERBOSE,
         )
     
     @agent
@@ -54,7 +258,8 @@ class EngineeringTeam():
         """Creates the test engineer agent"""
         return Agent(
             config=self.agents_config['test_engineer'],
-            verbose=True,
+            llm=self._llm('tests'),
+            verbose=Config.CREW_VERBOSE,
         )
 
     @agent
@@ -66,7 +271,8 @@ class EngineeringTeam():
                 'goal': 'Create documentation',
                 'backstory': 'Documentation specialist'
             }),
-            verbose=True,
+            llm=self._llm('documentation'),
+            verbose=Config.CREW_VERBOSE,
         )
 
     @agent
@@ -78,7 +284,8 @@ class EngineeringTeam():
                 'goal': 'Perform security analysis',
                 'backstory': 'Security specialist'
             }),
-            verbose=True,
+            llm=self._llm('security_audit'),
+            verbose=Config.CREW_VERBOSE,
         )
 
     @agent
@@ -90,7 +297,8 @@ class EngineeringTeam():
                 'goal': 'Optimize performance',
                 'backstory': 'Performance specialist'
             }),
-            verbose=True,
+            llm=self._llm('performance_optimizer'),
+            verbose=Config.CREW_VERBOSE,
         )
 
     @agent
@@ -102,7 +310,8 @@ class EngineeringTeam():
                 'goal': 'Handle deployment',
                 'backstory': 'DevOps specialist'
             }),
-            verbose=True,
+            llm=self._llm('deployment'),
+            verbose=Config.CREW_VERBOSE,
         )
 
     # Core tasks
@@ -210,15 +419,9 @@ class EngineeringTeam():
                 agent=self.devops_engineer(),
             )
 
-    @crew
-    def crew(self) -> Crew:
-        """Creates the engineering crew with only enabled agents and tasks"""
-        # Get all enabled agents and tasks
-        enabled_agents = []
-        enabled_tasks = []
-        
-        # Map of agent methods
-        agent_methods = {
+    def _agent_methods(self) -> Dict[str, Any]:
+        """Map of config keys to agent methods"""
+        return {
             'design': self.engineering_lead,
             'backend_code': self.backend_engineer,
             'frontend_code': self.frontend_engineer,
@@ -228,9 +431,10 @@ class EngineeringTeam():
             'performance_optimizer': self.performance_engineer,
             'deployment': self.devops_engineer,
         }
-        
-        # Map of task methods
-        task_methods = {
+
+    def _task_methods(self) -> Dict[str, Any]:
+        """Map of config keys to task methods"""
+        return {
             'design': self.design_task,
             'backend_code': self.code_task,
             'frontend_code': self.frontend_task,
@@ -240,21 +444,296 @@ class EngineeringTeam():
             'performance_optimizer': self.performance_task,
             'deployment': self.deployment_task,
         }
+
+    @crew
+    def crew(self) -> Crew:
+        """Creates the engineering crew with only enabled agents and tasks"""
+        # Get all enabled agents and tasks
+        enabled_agents = []
+        enabled_tasks = []
+        
+        agent_methods = self._agent_methods()
+        task_methods = self._task_methods()
         
         # Add enabled agents and tasks in dependency order
-        for agent_key in self.task_order:
-            # Check if the agent is enabled and exists in the agent methods
-            if agent_key in agent_methods and agent_key in self.enabled_agents:
-                # Create the agent and task if they are enabled
-                agent = agent_methods[agent_key]()
-                enabled_agents.append(agent)
-                
-                task = task_methods[agent_key]()
-                enabled_tasks.append(task)
+        for agent_key in self._crew_task_keys():
+            # Create the agent and task if they are enabled
+            agent = agent_methods[agent_key]()
+            enabled_agents.append(agent)
+            
+            task = task_methods[agent_key]()
+            enabled_tasks.append(task)
         
         return Crew(
             agents=enabled_agents,
             tasks=enabled_tasks,
             process=Process.sequential,
-            verbose=True,
-        )
\ No newline at end of file
+            verbose=Config.CREW_VERBOSE,
+        )
+
+    def _crew_task_keys(self) -> List[str]:
+        """Keys of the enabled tasks in the crew, in dependency order"""
+        agent_methods = self._agent_methods()
+        return [key for key in self.task_order if key in agent_methods and key in self.enabled_agents]
+
+
+class CrewRun:
+    """
+    One execution of the engineering crew, holding all per-run state.
+    
+    Runs are created by EngineeringTeam.new_run() on a copy of the team's
+    prebuilt crew, so concurrent jobs never share agents, tasks or callbacks.
+    
+    Attributes:
+        team: The team template the run was created from.
+        crew: The run's private copy of the crew.
+        task_keys: AGENT_CONFIG keys of the crew's tasks, in crew order.
+        workspace: Workspace receiving the task outputs, if any.
+        job_id: Id of the job the run belongs to, if any.
+        run_id: Unique id of the run, set in the event context of its threads to attribute LLM calls.
+        on_task_complete: Called as on_task_complete(key, output) when a task finishes.
+        reused_tasks: Keys of the tasks whose stored output was reused.
+        token_usage: Prompt and completion tokens of the run's LLM calls by the model that served them.
+    """
+
+    def __init__(self, team: EngineeringTeam, crew: Crew, workspace: Optional[Workspace] = None,
+                 on_task_complete: Optional[Callable[[str, TaskOutput], None]] = None):
+        self.team = team
+        self.crew = crew
+        self.task_keys = team._crew_task_keys()
+        self.workspace = workspace
+        self.job_id = workspace.job_id if workspace is not None else None
+        self.run_id = uuid.uuid4().hex
+        self.on_task_complete = on_task_complete
+        self.reused_tasks = []
+        self.token_usage: Dict[str, Dict[str, int]] = {}
+        self._usage_lock = threading.Lock()
+
+    def run(self, inputs: Dict[str, Any]) -> CrewOutput:
+        """
+        Run the crew with the given inputs.
+        
+        In 'parallel' execution mode the tasks are scheduled by their dependency
+        graph, so tasks that only depend on finished work run at the same time,
+        and tasks whose inputs did not change since a previous run reuse their
+        stored output, and each task's context is built from its upstream
+        outputs by the context shaper (e.g. module signatures instead of the
+        full code). In 'sequential' mode the crew is kicked off as a plain
+        sequential process and crewai passes the full upstream outputs.
+        
+        With a workspace, every task output is written atomically into the
+        job's own workspace instead of the shared output_file paths. The
+        on_task_complete callback receives each task's output as soon as that
+        task finishes, in either mode. Task starts and finishes, tool calls and
+        LLM calls are reported as structured events on the event bus.
+        """
+        crew = self.crew
+        task_keys = self.task_keys
+        for key, task in zip(task_keys, crew.tasks):
+            task.agent.step_callback = lambda step, key=key: self._on_step(key, step)
+            if self.workspace is not None:
+                task.output_file = None
+        
+        started = time.perf_counter()
+        usage_token = event_bus.subscribe(self._count_tokens, [LLM_CALL_FINISHED])
+        try:
+            if Config.EXECUTION_MODE == 'parallel':
+                result = self._run_parallel(crew, inputs)
+            else:
+                result = self._run_sequential(crew, inputs, task_keys)
+        except Exception as e:
+            event_bus.unsubscribe(usage_token)
+            self._crew_finished(started, error=str(e))
+            raise
+        event_bus.unsubscribe(usage_token)
+        self._crew_finished(started)
+        return result
+
+    def _run_sequential(self, crew: Crew, inputs: Dict[str, Any], task_keys: List[str]) -> CrewOutput:
+        """Kick off the crew as a sequential process, reporting each task as it finishes"""
+        # Sequential tasks run back to back, so each task finishing starts the next
+        started = {}
+        
+        def start_task(index):
+            if index < len(task_keys):
+                started[task_keys[index]] = time.perf_counter()
+                event_bus.emit(TASK_STARTED, task_key=task_keys[index], agent=crew.tasks[index].agent.role)
+        
+        def task_finished(index, output):
+            key = task_keys[index]
+            event_bus.emit(
+                TASK_FINISHED,
+                task_key=key,
+                agent=output.agent,
+                duration_ms=(time.perf_counter() - started[key]) * 1000,
+                size=len(output.raw or ''),
+                reused=False,
+            )
+            if self.workspace is not None:
+                self._write_artifact(key, inputs, output.raw, output.agent)
+            if self.on_task_complete:
+                self.on_task_complete(key, output)
+            start_task(index + 1)
+        
+        for index, task in enumerate(crew.tasks):
+            task.callback = lambda output, index=index: task_finished(index, output)
+        
+        with event_bus.context(job_id=self.job_id, run_id=self.run_id):
+            start_task(0)
+            return crew.kickoff(inputs=inputs)
+
+    def _run_parallel(self, crew: Crew, inputs: Dict[str, Any]) -> CrewOutput:
+        """Execute the crew's tasks concurrently following the dependency graph"""
+        tasks = dict(zip(self.task_keys, crew.tasks))
+        task_keys = {id(task): key for key, task in tasks.items()}
+        
+        # Prepare agents and tasks the same way Crew.kickoff does
+        for agent in crew.agents:
+            agent.crew = crew
+            agent.interpolate_inputs(inputs)
+        for task in crew.tasks:
+            task.interpolate_inputs_and_add_conversation_history(inputs)
+        
+        # Schedule on the configured dependencies plus any explicit task context
+        dependencies = {}
+        for key, task in tasks.items():
+            deps = list(self.team.enabled_agents[key].get('dependencies', []))
+            for context_task in task.context or []:
+                context_key = task_keys.get(id(context_task))
+                if context_key and context_key not in deps:
+                    deps.append(context_key)
+            dependencies[key] = deps
+        
+        def run_task(key, upstream):
+            with event_bus.context(job_id=self.job_id, task_key=key, run_id=self.run_id):
+                started = time.perf_counter()
+                event_bus.emit(TASK_STARTED, agent=tasks[key].agent.role)
+                output, reused = execute_task(key, upstream)
+                event_bus.emit(
+                    TASK_FINISHED,
+                    agent=output.agent,
+                    duration_ms=(time.perf_counter() - started) * 1000,
+                    size=len(output.raw or ''),
+                    reused=reused,
+                )
+                return output
+        
+        def execute_task(key, upstream):
+            task = tasks[key]
+            if isinstance(task.context, list):
+                sources = [task_keys[id(t)] for t in task.context if id(t) in task_keys]
+            else:
+                sources = list(upstream)
+            context, tokens = context_shaper.shape(
+                key, {source: upstream[source].raw for source in sources}, self.team.enabled_agents[key]
+            )
+            if tokens['tokens_saved']:
+                event_bus.emit(CONTEXT_SHAPED, sources=sources, **tokens)
+            
+            input_hash = task_output_store.input_hash(
+                key,
+                inputs,
+                self.team.enabled_agents[key],
+                {
+                    'description': task.description,
+                    'expected_output': task.expected_output,
+                    'role': task.agent.role,
+                    'goal': task.agent.goal,
+                    'backstory': task.agent.backstory,
+                },
+                {dep: task_output_store.output_hash(output.raw) for dep, output in upstream.items()},
+            )
+            
+            if Config.INCREMENTAL_REGENERATION:
+                stored = task_output_store.get(input_hash)
+                if stored is not None:
+                    print(f"♻️ Inputs of task {key} unchanged, reusing stored output")
+                    self.reused_tasks.append(key)
+                    self._write_artifact(key, inputs, stored['raw'], task.agent.role, task)
+                    return TaskOutput(
+                        description=task.description,
+                        expected_output=task.expected_output,
+                        raw=stored['raw'],
+                        agent=task.agent.role,
+                    ), True
+            
+            print(f"🚦 Starting task {key}")
+            output = task.execute_sync(agent=task.agent, context=context, tools=task.agent.tools)
+            task_output_store.put(input_hash, key, output.raw, task.agent.role)
+            if self.workspace is not None:
+                self._write_artifact(key, inputs, output.raw, task.agent.role)
+            return output, False
+        
+        executor = DagExecutor(max_workers=Config.MAX_PARALLEL_TASKS)
+        results = executor.run(dependencies, run_task, on_task_complete=self.on_task_complete)
+        
+        tasks_output = [results[key] for key in tasks]
+        return CrewOutput(
+            raw=tasks_output[-1].raw if tasks_output else '',
+            tasks_output=tasks_output,
+            token_usage=crew.calculate_usage_metrics(),
+        )
+
+    def _count_tokens(self, event: CrewEvent) -> None:
+        """Event bus subscriber adding the tokens of the run's LLM calls to the model that served them"""
+        # Filter by run rather than job, so concurrent runs without a job never count each other's calls
+        if event.data.get('run_id') != self.run_id or not event.data.get('model'):
+            return
+        with self._usage_lock:
+            usage = self.token_usage.setdefault(event.data['model'], {'prompt_tokens': 0, 'completion_tokens': 0})
+            usage['prompt_tokens'] += event.data.get('prompt_tokens', 0)
+            usage['completion_tokens'] += event.data.get('completion_tokens', 0)
+
+    def _crew_finished(self, started: float, error: Optional[str] = None) -> None:
+        """Report the crew's runtime and token usage by model on the event bus"""
+        with self._usage_lock:
+            token_usage = {model: dict(usage) for model, usage in self.token_usage.items()}
+        
+        event_bus.emit(
+            CREW_FINISHED,
+            job_id=self.job_id,
+            duration_ms=(time.perf_counter() - started) * 1000,
+            token_usage=token_usage,
+            error=error,
+        )
+
+    @staticmethod
+    def _on_step(key: str, step: Any) -> None:
+        """Agent step callback; reports tool calls on the event bus"""
+        tool = getattr(step, 'tool', None)
+        if not tool:
+            return
+        result = getattr(step, 'result', None)
+        event_bus.emit(
+            TOOL_CALL,
+            task_key=key,
+            tool=tool,
+            tool_input=str(getattr(step, 'tool_input', ''))[:200],
+            result_size=len(str(result)) if result is not None else 0,
+        )
+
+    def _write_artifact(self, key: str, inputs: Dict[str, Any], raw: str, agent: str,
+                        task: Optional[Task] = None) -> None:
+        """
+        Write a task output to the job workspace, named after its configured output_file.
+        
+        Without a workspace, crewai writes the output files of executed tasks
+        itself, so only reused outputs (passed with their task) are written here.
+        """
+        if self.workspace is None:
+            if task is not None and task.output_file:
+                directory = os.path.dirname(task.output_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(task.output_file, 'w', encoding='utf-8') as f:
+                    f.write(raw)
+            return
+        
+        output_file = self.team.enabled_agents[key].get('output_file') or f'{key}.txt'
+        try:
+            output_file = output_file.format(**inputs)
+        except (KeyError, IndexError):
+            pass
+        if output_file.startswith('output/'):
+            output_file = output_file[len('output/'):]
+        self.workspace.write_artifact(key, output_file, raw, agent)
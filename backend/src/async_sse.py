@@ -0,0 +1,202 @@
+"""
+Asyncio-based Server-Sent Events server for the streaming endpoints.
+"""
+import asyncio
+import threading
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .config import Config
+from .utils.logging import LogBroadcaster, get_log_broadcaster
+
+# Seconds without new lines before a heartbeat is sent
+HEARTBEAT_INTERVAL = 30
+
+# Maximum size of a request head we accept
+MAX_REQUEST_HEAD = 16 * 1024
+
+SSE_HEADERS = (
+    'HTTP/1.1 200 OK\r\n'
+    'Content-Type: text/event-stream\r\n'
+    'Cache-Control: no-cache\r\n'
+    'Connection: keep-alive\r\n'
+)
+
+
+def cors_headers(origin: Optional[str]) -> str:
+    """
+    CORS response headers for a request from origin, following Config.CORS_ORIGINS
+    like the Flask app does: '*' allows every origin, otherwise the request's
+    Origin is echoed only if it is one of the (comma-separated) allowed origins.
+    """
+    allowed = Config.get_cors_origins()
+    if '*' in allowed:
+        return 'Access-Control-Allow-Origin: *\r\n'
+    if origin and origin in allowed:
+        return f'Access-Control-Allow-Origin: {origin}\r\nVary: Origin\r\n'
+    return 'Vary: Origin\r\n'
+
+
+class AsyncSSEServer:
+    """
+    Serves /api/logs from a single asyncio event loop.
+
+    Every subscriber is a coroutine waiting on a shared asyncio.Event instead
+    of a thread blocked on the broadcaster, so an idle subscriber costs only
+    its socket buffers and a small coroutine frame. Publishing wakes the loop
+    at most once per batch of lines; each subscriber then reads everything
+    after its own cursor from the broadcaster's ring buffer. The URL, the
+    'id:'/'data:' event format, Last-Event-ID resume and the heartbeat are
+    the same as the Flask endpoint.
+
+    Attributes:
+        host: Interface to listen on.
+        port: Port to listen on (0 picks a free port once started).
+        broadcaster: Source of log lines.
+    Methods:
+        serve_forever() -> None: Run the server on the current event loop (coroutine).
+        start_in_thread() -> threading.Thread: Run the server on a background thread.
+    Usage:
+        server = AsyncSSEServer('0.0.0.0', 5002)
+        server.start_in_thread()
+    """
+
+    def __init__(self, host: str, port: int, broadcaster: Optional[LogBroadcaster] = None):
+        self.host = host
+        self.port = port
+        self.broadcaster = broadcaster or get_log_broadcaster()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._new_lines: Optional[asyncio.Event] = None
+        self._wakeup_scheduled = False
+        self._started = threading.Event()
+
+    async def serve_forever(self) -> None:
+        """Start listening and serve connections until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._new_lines = asyncio.Event()
+        self.broadcaster.add_listener(self._on_publish)
+
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        print(f"📡 Async SSE server listening on {self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    def start_in_thread(self) -> threading.Thread:
+        """Run the server on its own event loop in a daemon thread and wait until it listens."""
+        thread = threading.Thread(target=lambda: asyncio.run(self.serve_forever()), name='async-sse', daemon=True)
+        thread.start()
+        self._started.wait(timeout=10)
+        return thread
+
+    def _on_publish(self, seq: int) -> None:
+        """Broadcaster listener; schedules one wakeup of the loop per batch of lines."""
+        if self._wakeup_scheduled or self._loop is None:
+            return
+        self._wakeup_scheduled = True
+        try:
+            self._loop.call_soon_threadsafe(self._wake_subscribers)
+        except RuntimeError:
+            # Event loop already closed
+            pass
+
+    def _wake_subscribers(self) -> None:
+        """Wake every waiting subscriber and arm a fresh event for the next batch."""
+        self._wakeup_scheduled = False
+        event, self._new_lines = self._new_lines, asyncio.Event()
+        event.set()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Parse one request and dispatch it."""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        if len(head) > MAX_REQUEST_HEAD:
+            await self._respond(writer, '431 Request Header Fields Too Large')
+            return
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            await self._respond(writer, '400 Bad Request')
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        cors = cors_headers(headers.get('origin'))
+        if method == 'OPTIONS':
+            await self._respond(writer, '204 No Content', extra=(
+                cors +
+                'Access-Control-Allow-Methods: GET, OPTIONS\r\n'
+                'Access-Control-Allow-Headers: Last-Event-ID, Cache-Control\r\n'
+            ))
+        elif method == 'GET' and url.path == '/api/logs':
+            last_event_id = headers.get('last-event-id') or parse_qs(url.query).get('lastEventId', [None])[0]
+            await self._stream_logs(writer, last_event_id, cors)
+        else:
+            await self._respond(writer, '404 Not Found')
+
+    async def _stream_logs(self, writer: asyncio.StreamWriter, last_event_id: Optional[str],
+                           cors: str = '') -> None:
+        """Stream log lines to one subscriber until it disconnects, with the given CORS headers."""
+        cursor = self.broadcaster.subscribe()
+        if last_event_id and last_event_id.isdigit():
+            cursor = min(int(last_event_id), cursor)
+
+        try:
+            writer.write((SSE_HEADERS + cors + '\r\n').encode('latin-1'))
+            await writer.drain()
+            while True:
+                # Take the event before reading so a publish in between is not missed
+                new_lines = self._new_lines
+                entries = self.broadcaster.read_nowait(cursor)
+                if entries:
+                    writer.write(''.join(
+                        f"id: {seq}\ndata: {log_entry}\n\n" for seq, log_entry in entries
+                    ).encode('utf-8'))
+                    cursor = entries[-1][0]
+                    await writer.drain()
+                    continue
+
+                try:
+                    await asyncio.wait_for(new_lines.wait(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Send heartbeat to keep connection alive
+                    writer.write(b"data: [HEARTBEAT] Connection alive\n\n")
+                    await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.broadcaster.unsubscribe()
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: str, extra: str = '') -> None:
+        """Send an empty response and close the connection."""
+        writer.write(f'HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n{extra}\r\n'.encode('latin-1'))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+
+# Server instance when running in async SSE mode
+async_sse_server: Optional[AsyncSSEServer] = None
+
+
+def start_async_sse_server() -> AsyncSSEServer:
+    """Start the async SSE server on a background thread, once."""
+    global async_sse_server
+    if async_sse_server is None:
+        async_sse_server = AsyncSSEServer(Config.HOST, Config.ASYNC_SSE_PORT)
+        async_sse_server.start_in_thread()
+    return async_sse_server
@@ -8,6 +8,9 @@ from typing import Dict, List, Any
 # Load environment variables
 load_dotenv()
 
+# Backend directory, used to resolve default data paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Config:
     """
     This class manages the configuration for the Flask application.
@@ -20,16 +23,64 @@ class Config:
         HOST (str): Host address for the Flask application.
         PORT (int): Port number for the Flask application.
         LOG_LEVEL (str): Logging level for the application.
+        LOG_BUFFER_SIZE (int): Number of live log lines kept for streaming clients.
+        LOG_DEDUP_WINDOW (int): Number of recent distinct log lines never repeated.
+        LOG_MAX_REPETITIONS (int): Times the same log line may be streamed, 0 for unlimited.
+        LOG_SKETCH_WIDTH (int): Counters per row of the log repetition sketch.
+        LOG_SKETCH_DEPTH (int): Rows of the log repetition sketch.
+        LOG_RATE_WINDOW_SECONDS (int): Interval at which repetition counts reset, 0 for never.
+        LOG_HANDOFF_MAX_CHUNKS (int): Raw output chunks queued for log processing before dropping.
+        LOG_FLUSH_INTERVAL (float): Seconds between coalesced flushes of captured streams.
+        LOG_CAPTURE_ENABLED (bool): Scrape stdout/stderr for live logs in addition to crew events.
+        SSE_MODE (str): 'threaded' to stream logs from Flask, or 'async' to use the asyncio SSE server.
+        ASYNC_SSE_PORT (int): Port of the asyncio SSE server.
+        ASYNC_SSE_PUBLIC_URL (str): Public base URL of the asyncio SSE server, if behind a proxy.
         CREWAI_TIMEOUT (int): Timeout for CrewAI operations.
+        CREWAI_WARMUP (bool): Load CrewAI on a background thread at startup instead of on the first job.
         MAX_REQUIREMENTS_LENGTH (int): Maximum length for requirements.
-        CORS_ORIGINS (str): Allowed origins for CORS requests.
-        AGENT_CONFIG (Dict[str, Dict[str, Any]]): Configuration for agents.
+        REQUIREMENTS_MAX_SESSIONS (int): Sessions whose requirements are kept before evicting the least recent.
+        REQUIREMENTS_HISTORY_SIZE (int): Requirements versions kept per session.
+        REQUIREMENTS_MAX_BYTES (int): Memory cap on the stored requirements of all sessions.
+        CORS_ORIGINS (str): Allowed origins for CORS requests, comma-separated, or '*'.
+        MAX_CONCURRENT_JOBS (int): Number of code generation jobs run at the same time.
+        MAX_PENDING_JOBS (int): Maximum number of jobs waiting for a worker.
+        JOB_HISTORY_LIMIT (int): Number of finished jobs kept for status lookups.
+        JOB_COALESCING (bool): Attach submissions identical to a queued or running job to that job.
+        IDEMPOTENCY_KEY_TTL_SECONDS (int): How long an Idempotency-Key returns the job it first created.
+        EXECUTION_MODE (str): 'parallel' to schedule tasks by dependencies, or 'sequential'.
+        MAX_PARALLEL_TASKS (int): Maximum number of tasks of one crew run at the same time.
+        CREW_VERBOSE (bool): Let agents and the crew print their verbose output; turn off in production.
+        CACHE_DIR (str): Directory for on-disk caches.
+        LLM_CACHE_ENABLED (bool): Serve repeated identical LLM calls from the cache.
+        LLM_CACHE_DIR (str): Directory of the LLM response cache.
+        LLM_CACHE_MAX_BYTES (int): Maximum size of the LLM response cache.
+        LLM_CACHE_MAX_AGE_SECONDS (int): Age after which cached LLM responses expire.
+        INCREMENTAL_REGENERATION (bool): Reuse outputs of tasks whose inputs did not change.
+        CONTEXT_SHAPING_ENABLED (bool): Pass downstream tasks the upstream outputs shaped per their 'context_shaping'.
+        LLM_FALLBACK_MODELS (List[str]): Models tried after a task's 'llm' unless it sets 'llm_fallbacks'.
+        LLM_MAX_LATENCY_MS (int): Latency target for routing unless a task sets 'max_latency_ms', 0 for none.
+        LLM_DOWNGRADE_ENABLED (bool): Route tasks marked 'downgrade' to LLM_DOWNGRADE_MODEL first.
+        LLM_DOWNGRADE_MODEL (str): Fast, cheap model used for downgraded report-style tasks.
+        LLM_FAILURE_COOLDOWN_SECONDS (int): How long a failed model is tried last.
+        LLM_BASE_URL (str): Base URL of an OpenAI-compatible endpoint for all models, empty for the providers' own.
+        TASK_STORE_DIR (str): Directory of stored task outputs.
+        TASK_STORE_MAX_ENTRIES (int): Maximum number of stored task outputs.
+        WORKSPACE_ROOT (str): Directory holding the per-job output workspaces.
+        WORKSPACE_MAX_COUNT (int): Maximum number of job workspaces kept on disk; at least JOB_HISTORY_LIMIT.
+        WORKSPACE_MAX_AGE_SECONDS (int): Age after which a job workspace is removed.
+        ARTIFACT_COMPRESS_MIN_BYTES (int): Size from which artifacts are also stored precompressed.
+        TEAM_CONFIG_FILE (str): Optional YAML file of per-agent overrides of AGENT_CONFIG, reloaded when it changes.
+        CONFIG_RELOAD_INTERVAL (float): Seconds between checks of TEAM_CONFIG_FILE, 0 to never reload.
+        PLAN_HISTORY_SIZE (int): Recent durations kept per task to estimate run times.
+        PLAN_TIMINGS_FILE (str): JSON file the task durations are persisted to across restarts.
+        AGENT_CONFIG (Dict[str, Dict[str, Any]]): Built-in configuration for agents.
     
-        get_enabled_agents (classmethod): Returns only the enabled agents.
-        get_task_order (classmethod): Returns the order of tasks based on dependencies.
+        get_enabled_agents (classmethod): Returns only the enabled agents of the current configuration snapshot.
+        get_task_order (classmethod): Returns the precomputed order of tasks based on dependencies.
         validate (classmethod): Validates configuration values.
         get_agent_config (classmethod): Returns configuration for a specific agent.
         get_all_agents (classmethod): Returns all agent configurations.
+        get_cors_origins (classmethod): Returns the allowed CORS origins as a list.
     """
     
     # Flask configuration
@@ -40,16 +91,75 @@ class Config:
     
     # Logging configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'WARNING')
+    LOG_BUFFER_SIZE = int(os.getenv('LOG_BUFFER_SIZE', 1000))
+    LOG_DEDUP_WINDOW = int(os.getenv('LOG_DEDUP_WINDOW', 100))
+    LOG_MAX_REPETITIONS = int(os.getenv('LOG_MAX_REPETITIONS', 3))
+    LOG_SKETCH_WIDTH = int(os.getenv('LOG_SKETCH_WIDTH', 2048))
+    LOG_SKETCH_DEPTH = int(os.getenv('LOG_SKETCH_DEPTH', 4))
+    LOG_RATE_WINDOW_SECONDS = int(os.getenv('LOG_RATE_WINDOW_SECONDS', 0))
+    LOG_HANDOFF_MAX_CHUNKS = int(os.getenv('LOG_HANDOFF_MAX_CHUNKS', 10000))
+    LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', 0.05))
+    LOG_CAPTURE_ENABLED = os.getenv('LOG_CAPTURE_ENABLED', 'True').lower() == 'true'
+    
+    # Log streaming configuration
+    SSE_MODE = os.getenv('SSE_MODE', 'threaded').lower()
+    ASYNC_SSE_PORT = int(os.getenv('ASYNC_SSE_PORT', 5002))
+    ASYNC_SSE_PUBLIC_URL = os.getenv('ASYNC_SSE_PUBLIC_URL', '')
     
     # CrewAI configuration
     CREWAI_TIMEOUT = int(os.getenv('CREWAI_TIMEOUT', 30))
+    CREWAI_WARMUP = os.getenv('CREWAI_WARMUP', 'True').lower() == 'true'
+    EXECUTION_MODE = os.getenv('EXECUTION_MODE', 'parallel').lower()
+    MAX_PARALLEL_TASKS = int(os.getenv('MAX_PARALLEL_TASKS', 4))
+    CREW_VERBOSE = os.getenv('CREW_VERBOSE', 'True').lower() == 'true'
+    
+    # Cache configuration
+    CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(BASE_DIR, '.cache'))
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'True').lower() == 'true'
+    LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', os.path.join(CACHE_DIR, 'llm'))
+    LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    LLM_CACHE_MAX_AGE_SECONDS = int(os.getenv('LLM_CACHE_MAX_AGE_SECONDS', 7 * 24 * 3600))
+    INCREMENTAL_REGENERATION = os.getenv('INCREMENTAL_REGENERATION', 'True').lower() == 'true'
+    CONTEXT_SHAPING_ENABLED = os.getenv('CONTEXT_SHAPING_ENABLED', 'True').lower() == 'true'
+    
+    # Model routing configuration
+    LLM_FALLBACK_MODELS = [model.strip() for model in os.getenv('LLM_FALLBACK_MODELS', '').split(',') if model.strip()]
+    LLM_MAX_LATENCY_MS = int(os.getenv('LLM_MAX_LATENCY_MS', 0))
+    LLM_DOWNGRADE_ENABLED = os.getenv('LLM_DOWNGRADE_ENABLED', 'False').lower() == 'true'
+    LLM_DOWNGRADE_MODEL = os.getenv('LLM_DOWNGRADE_MODEL', 'openai/gpt-4o-mini')
+    LLM_FAILURE_COOLDOWN_SECONDS = int(os.getenv('LLM_FAILURE_COOLDOWN_SECONDS', 60))
+    LLM_BASE_URL = os.getenv('LLM_BASE_URL', '')
+    TASK_STORE_DIR = os.getenv('TASK_STORE_DIR', os.path.join(CACHE_DIR, 'tasks'))
+    TASK_STORE_MAX_ENTRIES = int(os.getenv('TASK_STORE_MAX_ENTRIES', 500))
+    
+    # Output workspace configuration
+    WORKSPACE_ROOT = os.getenv('WORKSPACE_ROOT', os.path.join(BASE_DIR, 'output', 'jobs'))
+    WORKSPACE_MAX_COUNT = int(os.getenv('WORKSPACE_MAX_COUNT', 100))
+    WORKSPACE_MAX_AGE_SECONDS = int(os.getenv('WORKSPACE_MAX_AGE_SECONDS', 7 * 24 * 3600))
+    ARTIFACT_COMPRESS_MIN_BYTES = int(os.getenv('ARTIFACT_COMPRESS_MIN_BYTES', 1024))
     
     # Requirements configuration
     MAX_REQUIREMENTS_LENGTH = int(os.getenv('MAX_REQUIREMENTS_LENGTH', 10000))
+    REQUIREMENTS_MAX_SESSIONS = int(os.getenv('REQUIREMENTS_MAX_SESSIONS', 1000))
+    REQUIREMENTS_HISTORY_SIZE = int(os.getenv('REQUIREMENTS_HISTORY_SIZE', 10))
+    REQUIREMENTS_MAX_BYTES = int(os.getenv('REQUIREMENTS_MAX_BYTES', 16 * 1024 * 1024))
     
     # CORS configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
     
+    # Job queue configuration
+    MAX_CONCURRENT_JOBS = int(os.getenv('MAX_CONCURRENT_JOBS', 2))
+    MAX_PENDING_JOBS = int(os.getenv('MAX_PENDING_JOBS', 20))
+    JOB_HISTORY_LIMIT = int(os.getenv('JOB_HISTORY_LIMIT', 100))
+    JOB_COALESCING = os.getenv('JOB_COALESCING', 'True').lower() == 'true'
+    IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_KEY_TTL_SECONDS', 3600))
+    
+    # Team configuration reloading
+    TEAM_CONFIG_FILE = os.getenv('TEAM_CONFIG_FILE', os.path.join(BASE_DIR, 'config', 'team.yaml'))
+    CONFIG_RELOAD_INTERVAL = float(os.getenv('CONFIG_RELOAD_INTERVAL', 5))
+    PLAN_HISTORY_SIZE = int(os.getenv('PLAN_HISTORY_SIZE', 50))
+    PLAN_TIMINGS_FILE = os.getenv('PLAN_TIMINGS_FILE', os.path.join(CACHE_DIR, 'task_timings.json'))
+    
     # ENHANCED AGENT CONFIGURATION - Single Source of Truth!
     AGENT_CONFIG = {
         'design': {
@@ -121,8 +231,10 @@ class Config:
             'role': 'documentation_engineer',
             'description': 'Creates comprehensive project documentation. Memorized the Miriam Webster dictionary.',
             'llm': 'openai/gpt-4o-mini',
+            'downgrade': True,
             'enabled': True,  # Set to True to activate
             'dependencies': ['backend_code', 'frontend_code'],
+            'context_shaping': {'backend_code': 'signatures', 'frontend_code': 'signatures'},
             'output_file': 'output/README.md',
             'backstory': "You're a technical writer who creates clear, comprehensive documentation that developers actually want to read.",
             'goal_template': "Create comprehensive documentation for the project including setup instructions, API documentation, and usage examples.",
@@ -136,6 +248,7 @@ class Config:
             'role': 'security_engineer',
             'description': 'Performs security audits and suggests improvements. Paranoid about everything.',
             'llm': 'openai/gpt-4o-mini',
+            'downgrade': True,
             'enabled': True,
             'dependencies': ['backend_code'],
             'output_file': 'output/security_report.md',
@@ -151,6 +264,7 @@ class Config:
             'role': 'performance_engineer',
             'description': 'Optimizes code for speed and efficiency. Hates slow queries.',
             'llm': 'openai/gpt-4o-mini',
+            'downgrade': True,
             'enabled': True,
             'dependencies': ['backend_code'],
             'output_file': 'output/performance_report.md',
@@ -168,6 +282,7 @@ class Config:
             'llm': 'openai/gpt-4o-mini',
             'enabled': True,
             'dependencies': ['backend_code', 'frontend_code', 'tests'],
+            'context_shaping': {'backend_code': 'signatures', 'frontend_code': 'signatures', 'tests': 'test_summary'},
             'output_file': 'output/deploy.sh',
             'backstory': "You're a DevOps engineer who creates reliable deployment scripts and CI/CD pipelines.",
             'goal_template': "Create deployment scripts and configuration for the application.",
@@ -179,29 +294,14 @@ class Config:
     @classmethod
     def get_enabled_agents(cls) -> Dict[str, Dict[str, Any]]:
         """Get only the enabled agent configurations."""
-        return {key: config for key, config in cls.AGENT_CONFIG.items() if config.get('enabled', True)}
+        from .services.config_snapshot import config_store
+        return config_store.current().enabled_agents
     
     @classmethod
     def get_task_order(cls) -> List[str]:
         """Get the order in which tasks should be executed based on dependencies."""
-        enabled_agents = cls.get_enabled_agents()
-        ordered = []
-        
-        def add_agent(agent_key):
-            if agent_key in ordered or agent_key not in enabled_agents:
-                return
-            
-            # Add dependencies first
-            for dep in enabled_agents[agent_key].get('dependencies', []):
-                add_agent(dep)
-            
-            ordered.append(agent_key)
-        
-        # Add all enabled agents in dependency order
-        for agent_key in enabled_agents.keys():
-            add_agent(agent_key)
-        
-        return ordered
+        from .services.config_snapshot import config_store
+        return list(config_store.current().task_order)
     
     @classmethod
     def validate(cls):
@@ -212,15 +312,44 @@ class Config:
         if cls.CREWAI_TIMEOUT < 1:
             raise ValueError(f"Invalid CrewAI timeout: {cls.CREWAI_TIMEOUT}")
         
+        if cls.SSE_MODE not in ('threaded', 'async'):
+            raise ValueError(f"Invalid SSE mode: {cls.SSE_MODE}")
+        
+        if cls.EXECUTION_MODE not in ('parallel', 'sequential'):
+            raise ValueError(f"Invalid execution mode: {cls.EXECUTION_MODE}")
+        
+        if cls.MAX_PARALLEL_TASKS < 1:
+            raise ValueError(f"Invalid max parallel tasks: {cls.MAX_PARALLEL_TASKS}")
+        
         if cls.MAX_REQUIREMENTS_LENGTH < 1:
             raise ValueError(f"Invalid max requirements length: {cls.MAX_REQUIREMENTS_LENGTH}")
+        
+        if cls.MAX_CONCURRENT_JOBS < 1:
+            raise ValueError(f"Invalid max concurrent jobs: {cls.MAX_CONCURRENT_JOBS}")
+        
+        if cls.MAX_PENDING_JOBS < 0:
+            raise ValueError(f"Invalid max pending jobs: {cls.MAX_PENDING_JOBS}")
+        
+        # Every finished job still listed must keep the workspace its artifact URLs point to
+        if cls.WORKSPACE_MAX_COUNT < cls.JOB_HISTORY_LIMIT:
+            raise ValueError(
+                f"WORKSPACE_MAX_COUNT ({cls.WORKSPACE_MAX_COUNT}) must be at least "
+                f"JOB_HISTORY_LIMIT ({cls.JOB_HISTORY_LIMIT})"
+            )
+    
+    @classmethod
+    def get_cors_origins(cls) -> List[str]:
+        """Get the allowed CORS origins, shared by the Flask app and the async SSE server."""
+        return [origin.strip() for origin in cls.CORS_ORIGINS.split(',') if origin.strip()]
     
     @classmethod
     def get_agent_config(cls, agent_key: str) -> Dict[str, Any]:
         """Get configuration for a specific agent."""
-        return cls.AGENT_CONFIG.get(agent_key, {})
+        from .services.config_snapshot import config_store
+        return config_store.current().agents.get(agent_key, {})
     
     @classmethod
     def get_all_agents(cls) -> Dict[str, Dict[str, Any]]:
         """Get all agent configurations."""
-        return cls.AGENT_CONFIG
+        from .services.config_snapshot import config_store
+        return config_store.current().agents
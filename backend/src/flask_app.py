@@ -3,16 +3,23 @@ Flask application factory and configuration.
 """
 import sys
 import os
-from flask import Flask
+from flask import Flask, request
 from flask_cors import CORS
 
 from .config import Config
-from .utils.logging import setup_logging, setup_crewai_log_capture
+from .utils.logging import setup_logging, setup_crewai_log_capture, setup_crew_event_logging
+from .services.event_bus import event_bus
+from .services.crewai_service import crewai_service
 from .routes.logs import logs_bp
 from .routes.requirements import requirements_bp
 from .routes.generate import generate_bp
 from .routes.health import health_bp
 from .routes.team import team_bp
+from .routes.jobs import jobs_bp
+from .routes.metrics import metrics_bp
+from .routes.artifacts import artifacts_bp
+from .routes.plan import plan_bp
+from .services.metrics import record_request
 
 def create_app() -> Flask:
     """Create and configure the Flask application."""
@@ -22,14 +29,16 @@ def create_app() -> Flask:
     # Set up logging
     setup_logging(Config.LOG_LEVEL)
     
-    # Set up CrewAI log capture
-    setup_crewai_log_capture()
+    # Stream structured crew events, and scrape stdout/stderr only if enabled
+    setup_crew_event_logging(event_bus)
+    if Config.LOG_CAPTURE_ENABLED:
+        setup_crewai_log_capture()
     
     # Create Flask app
     app = Flask(__name__)
     
     # Enable CORS
-    CORS(app, origins=Config.CORS_ORIGINS)
+    CORS(app, origins=Config.get_cors_origins())
     
     # Register blueprints
     app.register_blueprint(logs_bp)
@@ -37,20 +46,33 @@ def create_app() -> Flask:
     app.register_blueprint(generate_bp)
     app.register_blueprint(health_bp)
     app.register_blueprint(team_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(artifacts_bp)
+    app.register_blueprint(plan_bp)
+    
+    @app.after_request
+    def count_response(response):
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        record_request(request.method, route, response.status_code)
+        return response
+    
+    # Load CrewAI in the background so the API serves immediately
+    if Config.CREWAI_WARMUP:
+        crewai_service.warm_up()
     
     return app
 
 def run_app() -> None:
     """Run the Flask application."""
-    from .services.crewai_service import crewai_service
-    
-    if not crewai_service.is_available:
-        print("⚠️  CrewAI is not installed. Please run: pip install crewai")
-    
     print(f"🚀 Starting Flask app on {Config.HOST}:{Config.PORT}...")
     
     app = create_app()
     
+    if Config.SSE_MODE == 'async':
+        from .async_sse import start_async_sse_server
+        start_async_sse_server()
+    
     # Start Flask with minimal logging
     app.run(
         debug=Config.DEBUG, 
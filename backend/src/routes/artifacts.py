@@ -0,0 +1,96 @@
+"""
+Routes for serving generated artifacts from job workspaces.
+"""
+import mimetypes
+import os
+
+from flask import Blueprint, jsonify, request, send_file
+from ..services.job_service import job_service
+from ..services.workspace_service import artifact_url, workspace_manager
+
+artifacts_bp = Blueprint('artifacts', __name__)
+
+# Artifacts are source code and reports; unknown extensions are served as text
+mimetypes.add_type('text/javascript', '.jsx')
+mimetypes.add_type('text/markdown', '.md')
+
+
+def _collected(job_id):
+    """
+    Return a 410 response if the job is still listed but its workspace was
+    already collected, or None.
+    """
+    job = job_service.get_job(job_id)
+    if job is None or not job.is_finished:
+        return None
+    return jsonify({
+        'status': 'error',
+        'message': f'Artifacts of job {job_id} were removed from disk and are no longer available'
+    }), 410
+
+
+@artifacts_bp.route('/api/jobs/<job_id>/artifacts', methods=['GET'])
+def list_artifacts(job_id):
+    """Get the manifest of a job's artifacts, with the URL of each."""
+    workspace = workspace_manager.get(job_id)
+    gone = _collected(job_id) if workspace is None else None
+    if gone:
+        return gone
+    if workspace is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'No artifacts for job {job_id}'
+        }), 404
+
+    return jsonify({
+        'status': 'success',
+        'job_id': job_id,
+        'artifacts': {
+            task_key: {**entry, 'url': artifact_url(job_id, task_key)}
+            for task_key, entry in workspace.manifest['artifacts'].items()
+        }
+    })
+
+
+@artifacts_bp.route('/api/jobs/<job_id>/artifacts/<task_key>', methods=['GET'])
+def get_artifact(job_id, task_key):
+    """
+    Stream a task's artifact from disk.
+
+    The ETag is the artifact's SHA-256, so If-None-Match revalidates without
+    a body. Clients accepting br or gzip get the precompressed variant; Range
+    requests get the plain file, so byte ranges always refer to its content.
+    """
+    workspace = workspace_manager.get(job_id)
+    gone = _collected(job_id) if workspace is None else None
+    if gone:
+        return gone
+    entry = workspace.manifest['artifacts'].get(task_key) if workspace is not None else None
+    if entry is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Artifact {task_key} not found for job {job_id}'
+        }), 404
+
+    mimetype = mimetypes.guess_type(entry['path'])[0] or 'text/plain'
+    path, encoding = workspace.artifact_path(task_key), None
+    if 'Range' not in request.headers:
+        encoding = request.accept_encodings.best_match(list(entry.get('encodings', {})))
+        encoded_path = workspace.encoded_path(task_key, encoding) if encoding else None
+        if encoded_path and os.path.exists(encoded_path):
+            path = encoded_path
+        else:
+            encoding = None
+
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        conditional=True,
+        etag=f"{entry['sha256']}-{encoding}" if encoding else entry['sha256'],
+        download_name=os.path.basename(entry['path']),
+        max_age=0,
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
@@ -3,7 +3,9 @@ Routes for code generation.
 """
 from flask import Blueprint, request, jsonify
 from ..services.crewai_service import crewai_service
+from ..services.job_service import job_service, IdempotencyKeyConflictError, JobQueueFullError
 from ..services.requirements_service import requirements_service
+from .requirements import request_session_id
 
 generate_bp = Blueprint('generate', __name__)
 
@@ -11,19 +13,25 @@ generate_bp = Blueprint('generate', __name__)
 @generate_bp.route('/api/code-generation', methods=['POST'])
 def generate_code():
     """
-    This endpoint generates code based on provided requirements.
+    This endpoint queues a code generation job based on provided requirements.
     It first checks if CrewAI is available, then validates the requirements.
-    If requirements are not provided in the request, it retrieves them from storage.
+    If requirements are not provided in the request, it retrieves the ones stored for
+    the caller's session (X-Session-Id).
     If no requirements are found, it returns an error.
     
+    The crew runs in the background; poll the returned status URL for the result.
+    A request identical to a queued or running job, or repeating an Idempotency-Key
+    header, gets that job back ('coalesced': true) instead of starting another run.
+    
     Returns:
-        JSON response with the generated code or an error message.
-        500 if CrewAI is not available, 400 if no requirements are provided.
-        200 with the generated code on success.
+        JSON response with the job id or an error message.
+        500 if CrewAI is not available, 400 if no requirements are provided,
+        422 if the Idempotency-Key was used for other requirements, 503 if the job queue is full.
+        202 with the job id and status URL on success.
     """
     try:
-        # Check if CrewAI service is available
-        if not crewai_service.is_available:
+        # Check if CrewAI service is available (jobs wait for a warm-up still in progress)
+        if not crewai_service.may_become_available:
             error_msg = 'CrewAI not available. Please install with: pip install crewai[tools]'
             print(f"❌ {error_msg}")
             return jsonify({
@@ -35,9 +43,10 @@ def generate_code():
         data = request.get_json() or {}
         requirements = data.get('requirements')
         
-        # If no requirements in request, use stored requirements
+        # If no requirements in request, use the session's stored requirements
+        session_id = request_session_id()
         if not requirements:
-            requirements = requirements_service.get_requirements()
+            requirements = requirements_service.get_requirements(session_id)
         
         # Validate requirements
         if not requirements or not requirements.strip():
@@ -47,10 +56,29 @@ def generate_code():
                 'message': 'No requirements provided. Please save your requirements first.'
             }), 400
         
-        # Generate code using the service
-        result = crewai_service.generate_code(requirements)
-        return jsonify(result)
+        # Queue the generation job, or attach to the one already running it
+        # Idempotency keys are scoped to the caller's session
+        job, created = job_service.submit(requirements, request.headers.get('Idempotency-Key'), session_id)
+        return jsonify({
+            'status': 'accepted',
+            'coalesced': not created,
+            'job_id': job.id,
+            'job': job.to_dict(include_result=False),
+            'status_url': f'/api/jobs/{job.id}'
+        }), 202
         
+    except IdempotencyKeyConflictError as e:
+        print(f"❌ Idempotency key conflict: {e}")
+        return jsonify({
+            'status': 'error', 
+            'message': str(e)
+        }), 422
+    except JobQueueFullError as e:
+        print(f"❌ Job queue full: {e}")
+        return jsonify({
+            'status': 'error', 
+            'message': str(e)
+        }), 503, {'Retry-After': '30'}
     except ValueError as e:
         print(f"❌ Validation error: {e}")
         return jsonify({
@@ -2,15 +2,46 @@
 Routes for health checks.
 """
 from flask import Blueprint, jsonify
+from ..services.config_snapshot import config_store
 from ..services.crewai_service import crewai_service
+from ..services.llm_cache import llm_cache
+from ..services.model_router import model_router
+from ..utils.logging import get_log_capture_stats
 
 health_bp = Blueprint('health', __name__)
 
 @health_bp.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
+    """
+    Health check endpoint.
+    
+    Always answers once the process serves requests (liveness); 'ready'
+    tells whether CrewAI has finished loading and jobs start right away.
+    """
     return jsonify({
         'status': 'healthy', 
         'message': 'Backend is running',
-        'crewai_available': crewai_service.is_available
+        'live': True,
+        'ready': crewai_service.is_available,
+        'crewai_available': crewai_service.is_available,
+        'crewai': crewai_service.status(),
+        'llm_cache': llm_cache.stats(),
+        'model_router': model_router.stats(),
+        'config': config_store.stats(),
+        'log_capture': get_log_capture_stats()
     })
+
+
+@health_bp.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving requests."""
+    return jsonify({'status': 'live'})
+
+
+@health_bp.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once CrewAI is loaded, 503 while loading or if it failed."""
+    status = crewai_service.status()
+    if not crewai_service.is_available:
+        return jsonify({'status': 'not_ready', 'crewai': status}), 503
+    return jsonify({'status': 'ready', 'crewai': status})
@@ -0,0 +1,88 @@
+"""
+Routes for code generation job status and results.
+"""
+import json
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from ..services.job_service import job_service
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+@jobs_bp.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """List known code generation jobs, newest first, without their results."""
+    try:
+        return jsonify({
+            'status': 'success',
+            'jobs': [job.to_dict(include_result=False) for job in job_service.list_jobs()],
+            'counts': job_service.stats()
+        })
+    except Exception as e:
+        print(f"❌ Error listing jobs: {e}")
+        return jsonify({
+            'status': 'error', 
+            'message': str(e)
+        }), 500
+
+
+@jobs_bp.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status and, once finished, the result of a code generation job."""
+    job = job_service.get_job(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error', 
+            'message': f'Job {job_id} not found'
+        }), 404
+    
+    return jsonify({
+        'status': 'success',
+        'job': job.to_dict()
+    })
+
+
+@jobs_bp.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Server-Sent Events stream of a job's progress.
+    
+    Emits a 'task_completed' event with the task key, agent name, size in
+    bytes and artifact URL of each task as soon as that task finishes, and
+    'job_state' events when the job starts and finishes. The stream ends
+    after the final state. Reconnecting clients resume after Last-Event-ID
+    (or the lastEventId query parameter); new clients get the full history.
+    """
+    job = job_service.get_job(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error', 
+            'message': f'Job {job_id} not found'
+        }), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    cursor = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    
+    def generate():
+        nonlocal cursor
+        while True:
+            events = job.read_events(cursor, timeout=30)
+            if not events:
+                if job.is_finished:
+                    break
+                # Send heartbeat to keep connection alive
+                yield ": heartbeat\n\n"
+                continue
+            
+            for event_id, event in events:
+                yield f"id: {event_id}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            cursor = events[-1][0]
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive',
+            'Access-Control-Allow-Origin': '*'
+        }
+    )
@@ -1,33 +1,58 @@
 """
 Routes for live log streaming.
 """
-import queue
-from flask import Blueprint, Response, stream_with_context
-from ..utils.logging import get_log_queue
+from flask import Blueprint, Response, redirect, request, stream_with_context
+from ..config import Config
+from ..utils.logging import get_log_broadcaster
 
 logs_bp = Blueprint('logs', __name__)
 
 @logs_bp.route('/api/logs')
 def stream_logs():
-    """Server-Sent Events endpoint for streaming live logs."""
+    """
+    Server-Sent Events endpoint for streaming live logs.
+    
+    Every event carries its sequence number as the SSE id. A reconnecting
+    client sends it back as Last-Event-ID (or the lastEventId query parameter)
+    and resumes right after it; new clients start at the newest line.
+    
+    In async SSE mode the request is redirected to the asyncio SSE server,
+    which serves the same path and event format without holding a thread.
+    """
+    if Config.SSE_MODE == 'async':
+        base_url = Config.ASYNC_SSE_PUBLIC_URL or f"{request.scheme}://{request.host.split(':')[0]}:{Config.ASYNC_SSE_PORT}"
+        query = request.query_string.decode()
+        return redirect(f"{base_url.rstrip('/')}/api/logs" + (f"?{query}" if query else ''), code=307)
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    
     def generate():
         print("🔌 Client connected to live agent logs")
-        log_queue = get_log_queue()
+        broadcaster = get_log_broadcaster()
+        cursor = broadcaster.subscribe()
+        if last_event_id and last_event_id.isdigit():
+            cursor = min(int(last_event_id), cursor)
         
         try:
             while True:
                 try:
-                    # Get log from queue with timeout
-                    log_entry = log_queue.get(timeout=30)
-                    yield f"data: {log_entry}\n\n"
-                except queue.Empty:
-                    # Send heartbeat to keep connection alive
-                    yield f"data: [HEARTBEAT] Connection alive\n\n"
+                    # Wait for lines after our cursor
+                    entries = broadcaster.read(cursor, timeout=30)
+                    if not entries:
+                        # Send heartbeat to keep connection alive
+                        yield f"data: [HEARTBEAT] Connection alive\n\n"
+                        continue
+                    
+                    for seq, log_entry in entries:
+                        yield f"id: {seq}\ndata: {log_entry}\n\n"
+                    cursor = entries[-1][0]
                 except Exception as e:
                     print(f"❌ Error in log stream: {e}")
                     break
         except GeneratorExit:
             print("🔌 Client disconnected from live agent logs")
+        finally:
+            broadcaster.unsubscribe()
     
     return Response(
         stream_with_context(generate()),
@@ -0,0 +1,12 @@
+"""
+Routes for Prometheus metrics.
+"""
+from flask import Blueprint, Response
+from ..services.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Expose pipeline metrics in the Prometheus text exposition format."""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
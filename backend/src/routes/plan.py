@@ -0,0 +1,24 @@
+"""
+Routes for the execution plan of the engineering team.
+"""
+from flask import Blueprint, jsonify
+from ..config import Config
+from ..services.config_snapshot import config_store
+from ..services.planner import build_plan, task_timings
+
+plan_bp = Blueprint('plan', __name__)
+
+@plan_bp.route('/api/plan', methods=['GET'])
+def get_plan():
+    """
+    Get the plan of a crew run with the current configuration.
+
+    Lists the tasks by level with their historical p50/p95 durations, the
+    critical path and the expected job duration.
+    """
+    snapshot = config_store.current()
+    return jsonify({
+        'status': 'success',
+        'config_version': snapshot.version,
+        **build_plan(snapshot.enabled_agents, task_timings, Config.EXECUTION_MODE)
+    })
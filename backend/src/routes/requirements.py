@@ -7,60 +7,92 @@ from ..config import Config
 
 requirements_bp = Blueprint('requirements', __name__)
 
+
+def request_session_id() -> str:
+    """Session of the current request, from the X-Session-Id header or session_id query parameter."""
+    return requirements_service.validate_session_id(
+        request.headers.get('X-Session-Id') or request.args.get('session_id')
+    )
+
+
 @requirements_bp.route('/api/requirements', methods=['POST'])
 def set_requirements():
-    """Set user requirements."""
+    """Set user requirements for the caller's session."""
     try:
         data = request.get_json()
         if not data or 'requirements' not in data:
             return jsonify({
-                'status': 'error', 
+                'status': 'error',
                 'message': 'Missing requirements data'
             }), 400
-        
+
         user_requirements = data['requirements']
-        
-        # Validate requirements
+
+        # Validate requirements and session
         try:
+            session_id = request_session_id()
             requirements_service.validate_requirements(
-                user_requirements, 
+                user_requirements,
                 Config.MAX_REQUIREMENTS_LENGTH
             )
         except ValueError as e:
             return jsonify({
-                'status': 'error', 
+                'status': 'error',
                 'message': str(e)
             }), 400
-        
-        # Store requirements
-        requirements_service.set_requirements(user_requirements)
+
+        # Store requirements as the session's newest version
+        version = requirements_service.set_requirements(user_requirements, session_id)
         print("📝 Requirements stored successfully")
-        
+
         return jsonify({
-            'status': 'success', 
-            'requirements': user_requirements
+            'status': 'success',
+            'requirements': user_requirements,
+            'version': version
         })
-        
+
     except Exception as e:
         print(f"❌ Error setting requirements: {e}")
         return jsonify({
-            'status': 'error', 
+            'status': 'error',
             'message': str(e)
         }), 500
 
 @requirements_bp.route('/requirements', methods=['GET'])
+@requirements_bp.route('/api/requirements', methods=['GET'])
 def get_requirements():
-    """Get stored requirements."""
+    """Get the caller's stored requirements, the latest or ?version=N."""
     try:
-        stored = requirements_service.get_requirements()
+        session_id = request_session_id()
+        version = request.args.get('version', type=int)
+        stored = requirements_service.get_requirements(session_id, version)
         return jsonify({
             'status': 'success',
             'requirements': stored,
-            'has_requirements': requirements_service.has_requirements()
+            'has_requirements': requirements_service.has_requirements(session_id)
         })
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
     except Exception as e:
         print(f"❌ Error getting requirements: {e}")
         return jsonify({
-            'status': 'error', 
+            'status': 'error',
             'message': str(e)
         }), 500
+
+@requirements_bp.route('/api/requirements/history', methods=['GET'])
+def get_requirements_history():
+    """List the kept requirements versions of the caller's session, newest first."""
+    try:
+        return jsonify({
+            'status': 'success',
+            'versions': requirements_service.get_history(request_session_id())
+        })
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
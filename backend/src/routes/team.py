@@ -1,8 +1,8 @@
 """
 Routes for team configuration.
 """
-from flask import Blueprint, jsonify
-from ..config import Config
+from flask import Blueprint, Response, jsonify, request
+from ..services.config_snapshot import config_store
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,23 +11,18 @@ team_bp = Blueprint('team', __name__)
 
 @team_bp.route('/api/teams/config', methods=['GET'])
 def get_team_config():
-    """Get the team configuration for the frontend."""
+    """
+    Get the team configuration for the frontend.
+
+    The body is serialized once per configuration snapshot; its ETag lets
+    clients revalidate with If-None-Match and get a 304 until it changes.
+    """
     try:
-        # Get all agent configurations with enabled status
-        all_agents = Config.get_all_agents()
-        
-        # Format the data for frontend consumption
-        team_config = {}
-        for key, agent in all_agents.items():
-            team_config[key] = {
-                'name': agent.get('name', 'Unknown'),
-                'title': agent.get('title', key.title()),
-                'icon': agent.get('icon', '📄'),
-                'description': agent.get('description', 'No description available'),
-                'enabled': agent.get('enabled', False)
-            }
-        
-        return jsonify(team_config)
+        snapshot = config_store.current()
+        response = Response(snapshot.team_json, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Error getting team config: {e}")
         return jsonify({
@@ -0,0 +1,186 @@
+"""
+Immutable, hot-reloadable snapshots of the agent configuration.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+from ..config import Config
+from .planner import topological_order
+
+
+def _team_config(agents: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Format the agent configurations for frontend consumption."""
+    return {
+        key: {
+            'name': agent.get('name', 'Unknown'),
+            'title': agent.get('title', key.title()),
+            'icon': agent.get('icon', '📄'),
+            'description': agent.get('description', 'No description available'),
+            'enabled': agent.get('enabled', False)
+        }
+        for key, agent in agents.items()
+    }
+
+
+class ConfigSnapshot:
+    """
+    One immutable version of the agent configuration, with everything derived from it precomputed.
+
+    Snapshots are never modified after they are built; a configuration change
+    produces a new snapshot, so code holding a snapshot (such as a running
+    crew) keeps a consistent view. Treat the dictionaries as read-only.
+
+    Attributes:
+        version: Sequence number, increasing with every reload.
+        agents: All agent configurations by key.
+        enabled_agents: The enabled agent configurations by key.
+        task_order: Enabled agent keys ordered so dependencies come first.
+        signature: SHA-256 of the agent configurations.
+        team_json: Serialized team configuration served to the frontend.
+        etag: ETag of team_json.
+        loaded_at: Time the snapshot was built as a UNIX timestamp.
+    """
+
+    __slots__ = ('version', 'agents', 'enabled_agents', 'task_order', 'signature', 'team_json', 'etag', 'loaded_at')
+
+    def __init__(self, version: int, agents: Dict[str, Dict[str, Any]]):
+        self.version = version
+        self.agents = agents
+        self.enabled_agents = {key: config for key, config in agents.items() if config.get('enabled', True)}
+        self.task_order: Tuple[str, ...] = tuple(topological_order(self.enabled_agents))
+        self.signature = hashlib.sha256(
+            json.dumps(agents, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        self.team_json = json.dumps(_team_config(agents), ensure_ascii=False).encode('utf-8')
+        self.etag = hashlib.sha256(self.team_json).hexdigest()[:32]
+        self.loaded_at = time.time()
+
+
+class ConfigStore:
+    """
+    Holds the current ConfigSnapshot and swaps in a new one when the team overrides change.
+
+    The snapshot is Config.AGENT_CONFIG with the optional YAML overrides file
+    applied on top: a mapping of agent keys to the fields to change, for
+    example {'security_audit': {'enabled': False}}. The file is checked at
+    most once per interval when the snapshot is read; a changed file is
+    loaded, validated (known agents and dependencies, no dependency cycles)
+    and swapped in atomically, and an invalid file is
+    reported and ignored, keeping the previous snapshot.
+
+    Attributes:
+        path: Path of the YAML overrides file (it may not exist).
+        interval: Minimum seconds between checks of the file.
+    Methods:
+        current() -> ConfigSnapshot: Return the current snapshot, reloading it if the file changed.
+        reload() -> bool: Rebuild the snapshot from the file; return whether it was swapped.
+        reload_if_changed() -> bool: Reload if the file changed since it was last loaded.
+        stats() -> Dict[str, Any]: Return the version, signature and source of the current snapshot.
+    Usage:
+        snapshot = config_store.current()
+        for key in snapshot.task_order:
+            run(snapshot.enabled_agents[key])
+    """
+
+    def __init__(self, path: str, interval: float = 5.0):
+        self.path = path
+        self.interval = interval
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._snapshot = ConfigSnapshot(1, copy.deepcopy(Config.AGENT_CONFIG))
+        self.reload()
+
+    def current(self) -> ConfigSnapshot:
+        """Return the current snapshot, picking up changes to the overrides file."""
+        if self.interval > 0:
+            self.reload_if_changed()
+        return self._snapshot
+
+    def reload(self) -> bool:
+        """Load the overrides file and swap in a new snapshot if the configuration changed."""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                overrides = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            mtime, overrides = None, {}
+        except (OSError, yaml.YAMLError) as e:
+            print(f"⚠️ Could not load team configuration from {self.path}: {e}")
+            return False
+
+        try:
+            agents = self._apply_overrides(overrides)
+        except ValueError as e:
+            print(f"⚠️ Ignoring invalid team configuration in {self.path}: {e}")
+            self._mtime = mtime
+            return False
+
+        with self._lock:
+            self._mtime = mtime
+            previous = self._snapshot
+            snapshot = ConfigSnapshot(previous.version + 1, agents)
+            if snapshot.signature == previous.signature:
+                return False
+            self._snapshot = snapshot
+        print(f"🔄 Team configuration reloaded (version {snapshot.version})")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload if the overrides file changed; checks the file at most once per interval."""
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+
+        return self.reload()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the version, signature and source of the current snapshot."""
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version,
+            'signature': snapshot.signature[:12],
+            'loaded_at': snapshot.loaded_at,
+            'overrides_file': self.path if self._mtime is not None else None,
+        }
+
+    @staticmethod
+    def _apply_overrides(overrides: Any) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of Config.AGENT_CONFIG with validated overrides applied."""
+        if not isinstance(overrides, dict):
+            raise ValueError("expected a mapping of agent keys to settings")
+
+        agents = copy.deepcopy(Config.AGENT_CONFIG)
+        for key, fields in overrides.items():
+            if key not in agents:
+                raise ValueError(f"unknown agent '{key}'")
+            if not isinstance(fields, dict):
+                raise ValueError(f"settings of agent '{key}' must be a mapping")
+            agents[key].update(copy.deepcopy(fields))
+
+        for key, config in agents.items():
+            unknown = [dep for dep in config.get('dependencies', []) if dep not in agents]
+            if unknown:
+                raise ValueError(f"agent '{key}' depends on unknown agents {unknown}")
+        # Reject cycles even among disabled agents, so enabling one later cannot break the plan
+        topological_order(agents)
+        return agents
+
+
+# Global instance for the application
+config_store = ConfigStore(Config.TEAM_CONFIG_FILE, Config.CONFIG_RELOAD_INTERVAL)
@@ -0,0 +1,197 @@
+"""
+Service for shaping upstream task outputs into the context of downstream tasks.
+"""
+import ast
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import Config
+
+# Top-level lines kept by the outline of non-Python sources (imports, exports, declarations)
+_OUTLINE_PATTERN = re.compile(
+    r'^\s*(import |export |from |class |def |async def |function |async function |'
+    r'(const|let|var) \w+\s*=\s*(\(|async|function|React\.|use\w*\())'
+)
+_FENCE_PATTERN = re.compile(r'^```[\w+-]*\n(.*?)\n```\s*$', re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, about four characters per token."""
+    return len(text) // 4
+
+
+def _strip_fences(text: str) -> str:
+    """Remove a markdown code fence around the whole output, if any."""
+    match = _FENCE_PATTERN.match(text.strip())
+    return match.group(1) if match else text
+
+
+def _first_line(docstring: str) -> str:
+    return docstring.strip().splitlines()[0] if docstring and docstring.strip() else ''
+
+
+def _signature(node: ast.AST, indent: str) -> List[str]:
+    """Render a function or class header with the first line of its docstring."""
+    lines = [f"{indent}@{ast.unparse(decorator)}" for decorator in node.decorator_list]
+    if isinstance(node, ast.ClassDef):
+        bases = ', '.join(ast.unparse(base) for base in node.bases + node.keywords)
+        lines.append(f"{indent}class {node.name}({bases}):" if bases else f"{indent}class {node.name}:")
+    else:
+        prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ''
+        lines.append(f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}:")
+    doc = _first_line(ast.get_docstring(node) or '')
+    if doc:
+        lines.append(f'{indent}    """{doc}"""')
+    return lines
+
+
+def python_signatures(source: str) -> str:
+    """
+    Public interface of a Python module: imports, module constants and the
+    signatures of public classes, methods and functions, with bodies elided.
+    """
+    tree = ast.parse(source)
+    lines = []
+    doc = _first_line(ast.get_docstring(tree) or '')
+    if doc:
+        lines.append(f'"""{doc}"""')
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.unparse(node))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and len(ast.unparse(node)) <= 120:
+            lines.append(ast.unparse(node))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith('_'):
+            lines += _signature(node, '') + ['    ...']
+        elif isinstance(node, ast.ClassDef) and not node.name.startswith('_'):
+            lines += _signature(node, '')
+            methods = [
+                child for child in node.body
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+                and (not child.name.startswith('_') or child.name == '__init__')
+            ]
+            for method in methods:
+                lines += _signature(method, '    ') + ['        ...']
+            if not methods:
+                lines.append('    ...')
+    return '\n'.join(lines)
+
+
+def outline(source: str) -> str:
+    """Declarations and imports of a non-Python source, one line each."""
+    return '\n'.join(line.rstrip() for line in source.splitlines() if _OUTLINE_PATTERN.match(line))
+
+
+def signatures(source: str) -> str:
+    """Public signatures of Python code, or the declaration outline of other code."""
+    source = _strip_fences(source)
+    try:
+        return python_signatures(source)
+    except SyntaxError:
+        return outline(source)
+
+
+def test_summary(source: str) -> str:
+    """Summary of a test module: what it imports and the names of its test cases."""
+    source = _strip_fences(source)
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        names = re.findall(r'^\s*(?:async\s+)?def (test\w*)', source, re.MULTILINE)
+        return f"Test module with {len(names)} tests: " + ', '.join(names)
+
+    imports = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    lines = imports[:]
+    count = 0
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            tests = [child for child in node.body
+                     if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and child.name.startswith('test')]
+            if tests:
+                lines.append(f"class {node.name}: " + ', '.join(test.name for test in tests))
+                count += len(tests)
+    functions = [node.name for node in tree.body
+                 if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith('test')]
+    if functions:
+        lines.append('functions: ' + ', '.join(functions))
+        count += len(functions)
+    return '\n'.join([f"Test module with {count} tests."] + lines)
+
+
+# Shaping modes usable in an AGENT_CONFIG 'context_shaping' mapping
+SHAPERS: Dict[str, Callable[[str], str]] = {
+    'full': lambda source: source,
+    'signatures': signatures,
+    'test_summary': test_summary,
+}
+
+
+class ContextShaper:
+    """
+    Builds the context of a downstream task from its upstream outputs.
+
+    A task's AGENT_CONFIG entry may map upstream task keys to a shaping mode
+    in 'context_shaping', for example {'backend_code': 'signatures',
+    'tests': 'test_summary'}; upstream outputs without a mode, or whose
+    shaping fails or would not be shorter, are passed in full. The tokens
+    saved are estimated per task and kept as running totals.
+
+    Attributes:
+        enabled: Whether shaping is applied at all.
+    Methods:
+        shape(task_key: str, upstream: Dict[str, str], config: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, int]]:
+            Return the joined context and the estimated tokens before and after shaping.
+        stats() -> Dict[str, int]: Return the estimated tokens saved by task.
+    Usage:
+        context, saved = context_shaper.shape('deployment', {'backend_code': code, 'tests': tests})
+    """
+
+    separator = "\n\n----------\n\n"
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._saved: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def shape(self, task_key: str, upstream: Dict[str, str],
+              config: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        Join the upstream outputs of a task into its context, shaped per its
+        configuration (the given AGENT_CONFIG entry, or the current one).
+        """
+        config = config if config is not None else Config.get_agent_config(task_key)
+        modes = config.get('context_shaping', {}) if self.enabled else {}
+        parts = []
+        for source, raw in upstream.items():
+            mode = modes.get(source, 'full')
+            shaped = raw
+            if mode != 'full':
+                try:
+                    shaped = SHAPERS[mode](raw)
+                except Exception as e:
+                    # Shaping only saves tokens; passing the full output is always safe
+                    print(f"⚠️ Could not shape {source} context for task {task_key} ({mode}): {e!r}")
+                if not shaped.strip() or len(shaped) >= len(raw):
+                    shaped = raw
+            parts.append(shaped)
+
+        context = self.separator.join(parts)
+        tokens = {
+            'tokens_before': estimate_tokens(self.separator.join(upstream.values())),
+            'tokens_after': estimate_tokens(context),
+        }
+        tokens['tokens_saved'] = tokens['tokens_before'] - tokens['tokens_after']
+        if tokens['tokens_saved']:
+            with self._lock:
+                self._saved[task_key] = self._saved.get(task_key, 0) + tokens['tokens_saved']
+        return context, tokens
+
+    def stats(self) -> Dict[str, int]:
+        """Return the estimated tokens saved so far by task."""
+        with self._lock:
+            return dict(self._saved)
+
+
+# Global instance for the application
+context_shaper = ContextShaper(enabled=Config.CONTEXT_SHAPING_ENABLED)
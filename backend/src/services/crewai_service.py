@@ -3,9 +3,12 @@ Service for CrewAI operations and code generation.
 """
 import os
 import sys
-from typing import Dict, Any, Optional
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
 import traceback
-from ..config import Config
+from .workspace_service import Workspace, artifact_url, workspace_manager
 
 class CrewAIService:
     """
@@ -13,48 +16,121 @@ class CrewAIService:
     
     This service provides functionality to generate code based on user requirements
     using the CrewAI engineering team. It initializes the CrewAI modules and provides
-    methods to generate code, extract outputs, and check availability.
+    methods to generate code, describe its artifacts, and check availability.
+    
+    Importing crewai is slow, so it happens lazily: warm_up() starts the
+    import (and builds the team template) on a background thread, and
+    generation waits for it only if it has not finished yet. Until then
+    the rest of the API serves normally and readiness reports 'loading'.
     
     Attributes:
-        _crew_available: A boolean indicating if CrewAI is available.
-        _engineering_team: The CrewAI engineering team class.
+        state: 'pending', 'loading', 'ready', 'unavailable' (crewai not installed) or 'failed'.
+        error: Error message if loading failed.
+        load_seconds: Time the import and warm-up took.
+        _engineering_team: The CrewAI engineering team class, once loaded.
     Methods:
-        is_available() -> bool: Check if CrewAI is available.
-        generate_code(requirements: str) -> Dict[str, Any]: Generate code based on requirements
-        _extract_outputs(result) -> Dict[str, Dict[str, str]]: Extract structured outputs from CrewAI result.
+        is_available() -> bool: Check if CrewAI is loaded and usable.
+        may_become_available() -> bool: Check if CrewAI is usable or still loading.
+        warm_up() -> None: Start loading CrewAI on a background thread.
+        ensure_loaded(timeout: Optional[float]) -> bool: Load CrewAI if needed and wait for it.
+        status() -> Dict[str, Any]: Return the loading state for health checks.
+        generate_code(requirements: str, job_id: Optional[str], on_task_output: Optional[Callable]) -> Dict[str, Any]:
+            Generate code based on requirements, reporting each task output as it finishes.
+        _artifact_entry(workspace, task_key) -> Optional[Dict[str, Any]]: Describe the artifact of one task.
+        _manifest_outputs(workspace) -> Dict[str, Dict[str, Any]]: Describe the artifacts of all tasks.
     Usage:
         This service can be used to generate code based on user requirements in applications
         where automated code generation is needed, such as in development tools or AI-assisted coding environments.        
     """
     
+    PENDING = 'pending'
+    LOADING = 'loading'
+    READY = 'ready'
+    UNAVAILABLE = 'unavailable'
+    FAILED = 'failed'
+    
     def __init__(self):
-        self._crew_available = False
+        self.state = CrewAIService.PENDING
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
         self._engineering_team = None
-        self._initialize_crew()
+        self._loaded = threading.Event()
+        self._lock = threading.Lock()
+    
+    def warm_up(self) -> None:
+        """Start importing CrewAI and building the team template on a background thread."""
+        with self._lock:
+            if self.state != CrewAIService.PENDING:
+                return
+            self.state = CrewAIService.LOADING
+        threading.Thread(target=self._initialize_crew, name='crewai-warmup', daemon=True).start()
+    
+    def ensure_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Start loading CrewAI if needed, wait for it and return whether it is available."""
+        self.warm_up()
+        self._loaded.wait(timeout)
+        return self.is_available
     
     def _initialize_crew(self) -> None:
         """Initialize the CrewAI engineering team."""
+        started = time.perf_counter()
         try:
             # Import from the existing crew.py file in the backend directory
             sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
             from crew import EngineeringTeam
             self._engineering_team = EngineeringTeam
-            self._crew_available = True
+            # Build the shared team so the first job does not pay for it
+            EngineeringTeam.template()
+            self.state = CrewAIService.READY
             print("✅ CrewAI modules loaded successfully")
         except ImportError as e:
             print(f"❌ Failed to import EngineeringTeam: {e}")
             print("Please install CrewAI with: pip install crewai[tools]")
-            self._crew_available = False
+            self.error = str(e)
+            self.state = CrewAIService.UNAVAILABLE
+        except Exception as e:
+            print(f"❌ Failed to initialize the engineering team: {e}")
+            self.error = str(e)
+            self.state = CrewAIService.FAILED
+        finally:
+            self.load_seconds = time.perf_counter() - started
+            self._loaded.set()
     
     @property
     def is_available(self) -> bool:
-        """Check if CrewAI is available."""
-        return self._crew_available
+        """Check if CrewAI is loaded and usable."""
+        return self.state == CrewAIService.READY
+    
+    @property
+    def may_become_available(self) -> bool:
+        """Check if CrewAI is usable or still loading."""
+        return self.state in (CrewAIService.PENDING, CrewAIService.LOADING, CrewAIService.READY)
+    
+    def status(self) -> Dict[str, Any]:
+        """Return the loading state, error and load time."""
+        return {
+            'state': self.state,
+            'error': self.error,
+            'load_seconds': round(self.load_seconds, 3) if self.load_seconds is not None else None,
+        }
     
-    def generate_code(self, requirements: str) -> Dict[str, Any]:
-        """Generate code using the engineering team."""
-        if not self._crew_available:
-            raise RuntimeError('CrewAI not available. Please install with: pip install crewai')
+    def generate_code(
+        self,
+        requirements: str,
+        job_id: Optional[str] = None,
+        on_task_output: Optional[Callable[[str, Dict[str, str]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Generate code using the engineering team, writing outputs to the job's own workspace.
+        
+        The result is a manifest, not the outputs themselves: each task's entry
+        has its agent, artifact path, size, SHA-256 and the URL serving the
+        artifact from disk. If on_task_output is given, it is called as
+        on_task_output(task_key, entry) as soon as each task finishes, with the
+        same entry the final result carries for that task.
+        """
+        if not self.ensure_loaded():
+            raise RuntimeError(f'CrewAI not available: {self.error}. Please install with: pip install crewai')
         
         if not requirements or not requirements.strip():
             raise ValueError('No requirements provided')
@@ -62,12 +138,21 @@ class CrewAIService:
         print("🚀 Starting code generation...")
         print(f"📋 Requirements: {requirements[:200]}...")
         
+        job_id = job_id or uuid.uuid4().hex
+        workspace = workspace_manager.create(job_id)
+        
         try:
-            # Create and configure the engineering team
-            engineering_team = self._engineering_team()
+            def task_completed(task_key, task_output):
+                # The run writes each artifact before reporting its task as complete
+                entry = self._artifact_entry(workspace, task_key, crew_run.team.config.agents)
+                if on_task_output and entry is not None:
+                    on_task_output(task_key, entry)
             
-            # Update the crew's requirements data before running
-            engineering_team.requirements_data = requirements
+            # Start a run on the prebuilt engineering team; only the inputs are per run
+            crew_run = self._engineering_team.template().new_run(
+                workspace=workspace,
+                on_task_complete=task_completed,
+            )
             
             # Run the crew with requirements
             inputs = {
@@ -79,104 +164,59 @@ class CrewAIService:
             print(f"⚙️ Running crew with inputs: {list(inputs.keys())}")
             print("🎬 Starting CrewAI execution - watch the live logs below!")
             
-            result = engineering_team.crew().kickoff(inputs=inputs)
+            crew_run.run(inputs)
             
-            # Extract structured outputs from all tasks using config
-            outputs = self._extract_outputs(result)
+            # Describe the artifacts written to the workspace; clients fetch them by URL
+            outputs = self._manifest_outputs(workspace, crew_run.team.config.agents)
             
             print("🎉 Code generation completed successfully!")
             print(f"📦 Generated {len(outputs)} outputs")
             
             return {
                 'status': 'success',
-                'requirements': requirements,
-                'outputs': outputs
+                'outputs': outputs,
+                'reused_tasks': crew_run.reused_tasks,
+                'job_id': job_id,
             }
             
         except Exception as e:
             print(f"❌ Error generating code: {e}")
             print(traceback.format_exc())
             raise RuntimeError(f"Code generation failed: {str(e)}")
+        finally:
+            workspace_manager.release(job_id)
+    
+    def _artifact_entry(self, workspace: Workspace, task_key: str,
+                        agents: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the agent name and artifact metadata of a task, or None if it
+        wrote nothing. Names come from the agent configurations the run pinned.
+        """
+        entry = workspace.manifest['artifacts'].get(task_key)
+        if entry is None:
+            return None
+        return {
+            'agent': agents.get(task_key, {}).get('name') or entry.get('agent') or f'Agent_{task_key}',
+            'path': entry['path'],
+            'size': entry['size'],
+            'sha256': entry['sha256'],
+            'url': artifact_url(workspace.job_id, task_key),
+        }
     
-    def _extract_outputs(self, result) -> Dict[str, Dict[str, str]]:
-        """Extract structured outputs from CrewAI result using configuration."""
+    def _manifest_outputs(self, workspace: Workspace,
+                          agents: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Return the artifact entries of all tasks that produced meaningful output."""
         outputs = {}
-        task_order = Config.get_task_order()
-        agent_config = Config.get_all_agents()
-        
-        if hasattr(result, 'tasks_output') and result.tasks_output:
-            print(f"📊 Found {len(result.tasks_output)} task outputs")
-            
-            for i, task_output in enumerate(result.tasks_output):
-                print(f"🔍 Processing task {i+1}: {type(task_output)}")
-                
-                # Use config to determine task name and agent info
-                task_key = task_order[i] if i < len(task_order) else f'task_{i+1}'
-                config = agent_config.get(task_key, {})
-                agent_name = config.get('name', 'Unknown')
-                
-                # Try to get agent name from task output if not in config
-                if agent_name == 'Unknown':
-                    try:
-                        if hasattr(task_output, 'agent') and task_output.agent:
-                            agent_name = str(task_output.agent)
-                        elif (hasattr(task_output, 'task') and 
-                              hasattr(task_output.task, 'agent') and 
-                              task_output.task.agent and
-                              hasattr(task_output.task.agent, 'role')):
-                            agent_name = str(task_output.task.agent.role)
-                    except (AttributeError, TypeError) as e:
-                        print(f"⚠️ Could not extract agent name from task output: {e}")
-                        agent_name = f'Agent_{i+1}'
-                
-                # Try multiple ways to extract output text
-                output_text = ""
-                try:
-                    # Try different attributes that might contain the output
-                    if hasattr(task_output, 'raw') and task_output.raw:
-                        output_text = str(task_output.raw)
-                    elif hasattr(task_output, 'result') and task_output.result:
-                        output_text = str(task_output.result)
-                    elif hasattr(task_output, 'output') and task_output.output:
-                        output_text = str(task_output.output)
-                    elif hasattr(task_output, 'content') and task_output.content:
-                        output_text = str(task_output.content)
-                    else:
-                        # Fallback to string representation
-                        output_text = str(task_output)
-                        
-                    # Clean up the output text
-                    if output_text:
-                        # Remove common prefixes that might be added by CrewAI
-                        output_text = output_text.strip()
-                        if output_text.startswith('Output:'):
-                            output_text = output_text[7:].strip()
-                        if output_text.startswith('Result:'):
-                            output_text = output_text[7:].strip()
-                            
-                except (AttributeError, TypeError) as e:
-                    print(f"⚠️ Could not extract output text from task: {e}")
-                    output_text = f"Error extracting output from {agent_name}"
-                
-                # Only add to outputs if we have meaningful content
-                if output_text and len(output_text.strip()) > 10:
-                    outputs[task_key] = {
-                        'agent': agent_name,
-                        'output': output_text
-                    }
-                    print(f"✅ Task {i+1} ({task_key}): {len(output_text)} characters from {agent_name}")
-                else:
-                    print(f"⚠️ Task {i+1} ({task_key}): No meaningful output from {agent_name}")
-        
-        # Also check for any additional outputs in the result
-        if hasattr(result, 'output') and result.output:
-            print(f"📦 Found additional result output: {len(str(result.output))} characters")
-            if not outputs:
-                outputs['result'] = {
-                    'agent': 'CrewAI',
-                    'output': str(result.output)
-                }
-        
+        for task_key in workspace.manifest['artifacts']:
+            entry = self._artifact_entry(workspace, task_key, agents)
+            if entry is None:
+                continue
+            # Only add to outputs if we have meaningful content
+            if entry['size'] > 10:
+                outputs[task_key] = entry
+                print(f"✅ Task {task_key}: {entry['size']} bytes from {entry['agent']}")
+            else:
+                print(f"⚠️ Task {task_key}: No meaningful output from {entry['agent']}")
         return outputs
 
 
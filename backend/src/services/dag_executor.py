@@ -0,0 +1,92 @@
+"""
+Dependency-graph scheduler for running crew tasks in parallel.
+"""
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional
+
+
+class DagExecutor:
+    """
+    Runs a set of dependent tasks, starting each one as soon as all of its
+    dependencies have finished.
+
+    Independent tasks run at the same time, up to max_workers, so the wall-clock
+    time of a run follows the critical path of the graph rather than the sum of
+    all task durations. Dependencies that are not part of the graph (for example
+    disabled agents) are ignored, matching Config.get_task_order.
+
+    Attributes:
+        max_workers: Maximum number of tasks running at the same time.
+    Methods:
+        run(dependencies, run_task, on_task_complete) -> Dict[str, Any]:
+            Execute every task in the graph and return their results by key.
+    Usage:
+        executor = DagExecutor(max_workers=4)
+        results = executor.run(
+            {'design': [], 'backend_code': ['design']},
+            lambda key, upstream: do_work(key, upstream),
+        )
+    """
+
+    def __init__(self, max_workers: int = 4):
+        if max_workers < 1:
+            raise ValueError(f"Invalid max workers: {max_workers}")
+        self.max_workers = max_workers
+
+    def run(
+        self,
+        dependencies: Dict[str, List[str]],
+        run_task: Callable[[str, Dict[str, Any]], Any],
+        on_task_complete: Optional[Callable[[str, Any], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute all tasks in dependency order.
+
+        Args:
+            dependencies: Mapping of task key to the keys it depends on. The
+                mapping order is used as the tie-breaker when several tasks
+                become ready at once.
+            run_task: Called as run_task(key, upstream_results) on a worker thread,
+                where upstream_results maps each dependency key to its result.
+            on_task_complete: Optional callback invoked as on_task_complete(key, result)
+                as soon as each task finishes.
+        Returns:
+            Mapping of task key to the value returned by run_task.
+        Raises:
+            ValueError: If the graph contains a cycle.
+            Exception: The first error raised by a task; tasks that have not
+                started yet are cancelled.
+        """
+        pending = {
+            key: [dep for dep in deps if dep in dependencies and dep != key]
+            for key, deps in dependencies.items()
+        }
+        results: Dict[str, Any] = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='crew-task') as pool:
+            while pending or running:
+                # Start every task whose dependencies are done, up to the worker limit
+                for key in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    if all(dep in results for dep in pending[key]):
+                        upstream = {dep: results[dep] for dep in pending.pop(key)}
+                        running[pool.submit(run_task, key, upstream)] = key
+
+                if not running:
+                    raise ValueError(f"Dependency cycle detected between tasks: {sorted(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    try:
+                        results[key] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    if on_task_complete:
+                        on_task_complete(key, results[key])
+
+        return results
@@ -0,0 +1,129 @@
+"""
+In-process event bus for structured crew execution events.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+# Event types emitted by the engineering team
+TASK_STARTED = 'task_started'
+TASK_FINISHED = 'task_finished'
+TOOL_CALL = 'tool_call'
+LLM_CALL_STARTED = 'llm_call_started'
+LLM_CALL_FINISHED = 'llm_call_finished'
+CREW_FINISHED = 'crew_finished'
+CONTEXT_SHAPED = 'context_shaped'
+
+
+class CrewEvent:
+    """
+    A single structured event from a crew run.
+
+    Attributes:
+        type: Event type, one of the module-level constants.
+        job_id: Id of the job the event belongs to, if known.
+        task_key: AGENT_CONFIG key of the task the event belongs to, if known.
+        data: Event-specific fields (agent, tool, model, duration_ms, ...).
+        time: Emission time as a UNIX timestamp.
+    Methods:
+        to_dict() -> Dict[str, Any]: Serialize the event for API responses.
+    """
+
+    __slots__ = ('type', 'job_id', 'task_key', 'data', 'time')
+
+    def __init__(self, event_type: str, job_id: Optional[str], task_key: Optional[str], data: Dict[str, Any]):
+        self.type = event_type
+        self.job_id = job_id
+        self.task_key = task_key
+        self.data = data
+        self.time = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the event for API responses."""
+        return {
+            'type': self.type,
+            'job_id': self.job_id,
+            'task_key': self.task_key,
+            'time': self.time,
+            **self.data,
+        }
+
+
+class EventBus:
+    """
+    Synchronous publish/subscribe bus for crew events.
+
+    Events are delivered to subscribers on the publishing thread, so
+    subscribers must be quick and must not block; a failing subscriber is
+    reported and skipped without affecting the crew run. The job and task a
+    thread is working on are kept in a thread-local context, so deep call
+    sites such as LLM calls can emit events without being told which task
+    they belong to.
+
+    Methods:
+        subscribe(callback, event_types) -> int: Register a subscriber and return its token.
+        unsubscribe(token: int) -> None: Remove a subscriber.
+        emit(event_type: str, **data) -> CrewEvent: Publish an event in the current context.
+        context(job_id, task_key) -> ContextManager: Set the job and task of the current thread.
+        current(name: str) -> Optional[str]: Return a field of the current thread's context.
+    Usage:
+        token = event_bus.subscribe(print, [TASK_FINISHED])
+        with event_bus.context(job_id=job.id, task_key='design'):
+            event_bus.emit(TASK_STARTED, agent='Engineering Lead')
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, tuple] = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def subscribe(self, callback: Callable[[CrewEvent], None], event_types: Optional[Iterable[str]] = None) -> int:
+        """Register a callback for the given event types (all types if None)."""
+        with self._lock:
+            self._next_token += 1
+            self._subscribers[self._next_token] = (callback, frozenset(event_types) if event_types else None)
+            return self._next_token
+
+    def unsubscribe(self, token: int) -> None:
+        """Remove a subscriber by its token."""
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def emit(self, event_type: str, **data) -> CrewEvent:
+        """Publish an event tagged with the current thread's job and task."""
+        event = CrewEvent(
+            event_type,
+            data.pop('job_id', None) or self.current('job_id'),
+            data.pop('task_key', None) or self.current('task_key'),
+            data,
+        )
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for callback, event_types in subscribers:
+            if event_types is not None and event_type not in event_types:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"⚠️ Event subscriber failed on {event_type}: {e}")
+        return event
+
+    @contextmanager
+    def context(self, **fields: Optional[str]) -> Iterator[None]:
+        """Set job_id and/or task_key for events emitted by this thread (and other fields, such as run_id, for current())."""
+        previous = dict(getattr(self._local, 'fields', {}))
+        self._local.fields = {**previous, **{k: v for k, v in fields.items() if v is not None}}
+        try:
+            yield
+        finally:
+            self._local.fields = previous
+
+    def current(self, name: str) -> Optional[str]:
+        """Return a field of the current thread's context, or None."""
+        return getattr(self._local, 'fields', {}).get(name)
+
+
+# Global instance for the application
+event_bus = EventBus()
@@ -0,0 +1,301 @@
+"""
+Service for running code generation jobs on a bounded worker pool.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import Config
+from .config_snapshot import config_store
+from .crewai_service import crewai_service
+from .event_bus import CrewEvent, event_bus
+from .requirements_service import DEFAULT_SESSION
+
+# Idempotency keys remembered at most, whatever their window
+MAX_IDEMPOTENCY_KEYS = 10000
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when a job is submitted while the pending queue is full."""
+
+
+class IdempotencyKeyConflictError(RuntimeError):
+    """Raised when an idempotency key is reused for different requirements."""
+
+
+def request_fingerprint(requirements: str) -> str:
+    """
+    Hash of what a generation depends on: the requirements with whitespace
+    normalized, and the agent configuration.
+    """
+    normalized = ' '.join(requirements.split())
+    config = f"{config_store.current().signature}\0{Config.EXECUTION_MODE}"
+    return hashlib.sha256(f"{normalized}\0{config}".encode('utf-8')).hexdigest()
+
+
+class Job:
+    """
+    A single code generation job and its lifecycle state.
+
+    Jobs move from queued to running and finish as either succeeded or failed.
+    The result of a succeeded job is the same dictionary that
+    CrewAIService.generate_code returns. While the job runs it records an
+    event log (state changes, crew events from the event bus and each task's
+    artifact as soon as that task finishes) that clients can follow with read_events.
+
+    Attributes:
+        id: Unique identifier of the job.
+        requirements: The requirements the job generates code for.
+        fingerprint: request_fingerprint of the requirements, used to coalesce duplicates.
+        state: Current lifecycle state (queued, running, succeeded, failed).
+        created_at: Submission time as a UNIX timestamp.
+        started_at: Time a worker picked up the job, or None.
+        finished_at: Time the job finished, or None.
+        result: Generation result once the job succeeded.
+        error: Error message once the job failed.
+        events: Ordered event log; an event's id is its position plus one.
+    Methods:
+        add_event(event_type: str, data: Dict[str, Any]) -> int: Append an event and wake readers.
+        finish(state: str, result, error) -> None: Move the job to a final state.
+        read_events(cursor: int, timeout: float) -> List[Tuple[int, Dict[str, Any]]]:
+            Wait for events after the cursor.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    def __init__(self, requirements: str, fingerprint: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.requirements = requirements
+        self.fingerprint = fingerprint or request_fingerprint(requirements)
+        self.state = Job.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self._events_changed = threading.Condition(threading.RLock())
+
+    @property
+    def is_finished(self) -> bool:
+        """Check if the job has reached a final state."""
+        return self.state in (Job.SUCCEEDED, Job.FAILED)
+
+    def add_event(self, event_type: str, data: Dict[str, Any]) -> int:
+        """Append an event to the job's log, wake waiting readers and return its id."""
+        with self._events_changed:
+            self.events.append({'type': event_type, 'time': time.time(), **data})
+            self._events_changed.notify_all()
+            return len(self.events)
+
+    def finish(self, state: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        """Move the job to a final state and record it as the last event."""
+        with self._events_changed:
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self.state = state
+            self.add_event('job_state', {'state': state, 'error': error})
+
+    def read_events(self, cursor: int, timeout: float) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return the events after cursor, waiting up to timeout seconds for one."""
+        with self._events_changed:
+            if len(self.events) <= cursor and not self.is_finished:
+                self._events_changed.wait(timeout)
+            return [(event_id, self.events[event_id - 1]) for event_id in range(cursor + 1, len(self.events) + 1)]
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """Serialize the job for API responses."""
+        data = {
+            'id': self.id,
+            'state': self.state,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobService:
+    """
+    Service for queueing code generation jobs and tracking their results.
+
+    Submissions return immediately with a Job; the crew run happens on a
+    fixed-size thread pool so the number of concurrent crews stays bounded
+    no matter how many requests the API receives.
+
+    Duplicate submissions never start a second crew run: a submission whose
+    request_fingerprint matches a queued or running job attaches to that job
+    (singleflight), and a submission repeating an Idempotency-Key seen within
+    the idempotency window gets the job of the first one, even if finished.
+    Idempotency keys are scoped to the client session, so one client's key
+    never returns another client's job.
+
+    Attributes:
+        _executor: Thread pool that runs the jobs.
+        _jobs: Known jobs in submission order.
+        _in_flight: Queued or running jobs by fingerprint.
+        _idempotency_keys: (session id, idempotency key) -> (job id, fingerprint, expiry), oldest first.
+        _max_pending: Maximum number of queued jobs before submissions are rejected.
+        _history_limit: Number of finished jobs kept for lookups.
+        _idempotency_ttl: Seconds an idempotency key is honored.
+        _coalesce: Whether identical in-flight submissions share a job.
+        coalesced: Number of submissions that reused a job, by reason.
+        _lock: Lock protecting the job table.
+    Methods:
+        submit(requirements: str, idempotency_key: Optional[str], session_id: str) -> Tuple[Job, bool]:
+            Queue a new generation job, or return the job a duplicate attaches to.
+        get_job(job_id: str) -> Optional[Job]: Look up a job by id.
+        list_jobs() -> List[Job]: Return all known jobs, newest first.
+        stats() -> Dict[str, int]: Return queued/running/finished counts.
+    Usage:
+        job, created = job_service.submit(requirements, request.headers.get('Idempotency-Key'), session_id)
+        # Later...
+        job_service.get_job(job.id).state
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, history_limit: int,
+                 idempotency_ttl: float = 3600, coalesce: bool = True):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crew-job')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._in_flight: Dict[str, Job] = {}
+        self._idempotency_keys: 'OrderedDict[Tuple[str, str], Tuple[str, str, float]]' = OrderedDict()
+        self._max_pending = max_pending
+        self._history_limit = history_limit
+        self._idempotency_ttl = idempotency_ttl
+        self._coalesce = coalesce
+        self.coalesced = {'singleflight': 0, 'idempotency_key': 0}
+        self._lock = threading.Lock()
+        event_bus.subscribe(self._on_crew_event)
+
+    def submit(self, requirements: str, idempotency_key: Optional[str] = None,
+               session_id: str = DEFAULT_SESSION) -> Tuple[Job, bool]:
+        """
+        Queue a new code generation job and return it with True, or return
+        the existing job a duplicate submission attaches to with False.
+        """
+        fingerprint = request_fingerprint(requirements)
+        scoped_key = (session_id, idempotency_key) if idempotency_key else None
+        with self._lock:
+            self._expire_idempotency_keys()
+            if scoped_key and scoped_key in self._idempotency_keys:
+                job_id, key_fingerprint, _ = self._idempotency_keys[scoped_key]
+                if key_fingerprint != fingerprint:
+                    raise IdempotencyKeyConflictError(
+                        'Idempotency-Key was already used for different requirements.'
+                    )
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    self.coalesced['idempotency_key'] += 1
+                    print(f"🔁 Idempotency-Key matched job {job.id}")
+                    return job, False
+
+            job = self._in_flight.get(fingerprint) if self._coalesce else None
+            created = job is None
+            if not created:
+                self.coalesced['singleflight'] += 1
+                print(f"🔗 Attached duplicate submission to in-flight job {job.id}")
+            else:
+                queued = sum(1 for queued_job in self._jobs.values() if queued_job.state == Job.QUEUED)
+                if queued >= self._max_pending:
+                    raise JobQueueFullError('Too many pending code generation jobs. Please try again later.')
+
+                # Same fingerprint as the _in_flight key, even if the configuration reloaded since
+                job = Job(requirements, fingerprint)
+                self._jobs[job.id] = job
+                self._in_flight[fingerprint] = job
+                self._evict_finished()
+
+            if scoped_key:
+                self._idempotency_keys[scoped_key] = (
+                    job.id, fingerprint, time.monotonic() + self._idempotency_ttl
+                )
+                self._idempotency_keys.move_to_end(scoped_key)
+                if len(self._idempotency_keys) > MAX_IDEMPOTENCY_KEYS:
+                    self._idempotency_keys.popitem(last=False)
+            if not created:
+                return job, False
+
+        self._executor.submit(self._run, job)
+        print(f"📥 Queued code generation job {job.id}")
+        return job, True
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        """Return all known jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        with self._lock:
+            counts = {Job.QUEUED: 0, Job.RUNNING: 0, Job.SUCCEEDED: 0, Job.FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.state] += 1
+            return counts
+
+    def _run(self, job: Job) -> None:
+        """Execute a job on a worker thread."""
+        job.state = Job.RUNNING
+        job.started_at = time.time()
+        job.add_event('job_state', {'state': job.state})
+        print(f"🏃 Running code generation job {job.id}")
+
+        def task_output(task_key, entry):
+            job.add_event('task_completed', {'task_key': task_key, **entry})
+
+        try:
+            result = crewai_service.generate_code(job.requirements, job_id=job.id, on_task_output=task_output)
+            job.finish(Job.SUCCEEDED, result=result)
+            print(f"🎉 Job {job.id} finished")
+        except Exception as e:
+            print(f"❌ Job {job.id} failed: {e}")
+            job.finish(Job.FAILED, error=str(e))
+        finally:
+            with self._lock:
+                if self._in_flight.get(job.fingerprint) is job:
+                    del self._in_flight[job.fingerprint]
+
+    def _on_crew_event(self, event: CrewEvent) -> None:
+        """Append crew events of a running job to that job's event log."""
+        if event.job_id is None or event.type == 'llm_call_started':
+            return
+        job = self.get_job(event.job_id)
+        if job is not None and not job.is_finished:
+            job.add_event(event.type, {'task_key': event.task_key, **event.data})
+
+    def _expire_idempotency_keys(self) -> None:
+        """Drop idempotency keys past their window. Caller holds the lock."""
+        # Keys share one TTL, so insertion order is expiry order
+        now = time.monotonic()
+        while self._idempotency_keys and next(iter(self._idempotency_keys.values()))[2] <= now:
+            self._idempotency_keys.popitem(last=False)
+
+    def _evict_finished(self) -> None:
+        """Drop the oldest finished jobs beyond the history limit. Caller holds the lock."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self._history_limit)]:
+            del self._jobs[job_id]
+
+
+# Global instance for the application
+job_service = JobService(
+    max_workers=Config.MAX_CONCURRENT_JOBS,
+    max_pending=Config.MAX_PENDING_JOBS,
+    history_limit=Config.JOB_HISTORY_LIMIT,
+    idempotency_ttl=Config.IDEMPOTENCY_KEY_TTL_SECONDS,
+    coalesce=Config.JOB_COALESCING,
+)
@@ -0,0 +1,189 @@
+"""
+Content-addressed on-disk cache for LLM responses.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..config import Config
+
+
+class LLMCache:
+    """
+    Disk-backed cache of LLM completions keyed by the hash of the request.
+
+    Each entry is stored as a small JSON file named after the SHA-256 of the
+    model, the rendered messages (which already contain the upstream task
+    context) and the sampling parameters. Entries older than max_age_seconds
+    are treated as misses and removed; when the total size exceeds max_bytes
+    the least recently used entries are evicted.
+
+    Attributes:
+        directory: Directory holding the cache entries.
+        max_bytes: Maximum total size of all entries on disk.
+        max_age_seconds: Maximum age of an entry before it expires.
+        hits: Number of lookups served from the cache.
+        misses: Number of lookups that had to call the LLM.
+        evictions: Number of entries removed for size or age.
+    Methods:
+        make_key(model: str, messages: Any, **params) -> str: Hash a request.
+        get(key: str) -> Optional[str]: Return a cached response or None.
+        set(key: str, response: str, model: str) -> None: Store a response.
+        clear() -> None: Remove every entry.
+        stats() -> Dict[str, Any]: Return hit/miss counters and size.
+    Usage:
+        key = llm_cache.make_key('openai/gpt-4o-mini', messages)
+        response = llm_cache.get(key)
+        if response is None:
+            response = call_llm(messages)
+            llm_cache.set(key, response, 'openai/gpt-4o-mini')
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age_seconds: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(model: str, messages: Any, **params) -> str:
+        """Hash a request into a cache key."""
+        payload = json.dumps(
+            {'model': model, 'messages': messages, 'params': params},
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+
+            try:
+                if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                    self._remove(key)
+                    self.misses += 1
+                    return None
+
+                with open(path, 'r', encoding='utf-8') as f:
+                    response = json.load(f)['response']
+            except (OSError, ValueError, KeyError):
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._index.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: str, model: str) -> None:
+        """Store a response, evicting old entries if the cache is over its size limit."""
+        data = json.dumps({
+            'model': model,
+            'created_at': time.time(),
+            'response': response,
+        }, ensure_ascii=False).encode('utf-8')
+        path = self._path(key)
+
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"⚠️ Could not write LLM cache entry: {e}")
+                return
+
+            self._total_bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                oldest = next(iter(self._index))
+                self._remove(oldest)
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current cache size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._index),
+                'bytes': self._total_bytes,
+            }
+
+    def _path(self, key: str) -> str:
+        """Return the file path for a key, sharded by its first two characters."""
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def _remove(self, key: str) -> None:
+        """Delete an entry from disk and the index. Caller holds the lock."""
+        self._total_bytes -= self._index.pop(key, 0)
+        self.evictions += 1
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _load_index(self) -> None:
+        """Scan the cache directory, oldest entries first, and drop expired ones."""
+        if not os.path.isdir(self.directory):
+            return
+
+        entries = []
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+
+# Global instance for the application
+llm_cache = LLMCache(
+    directory=Config.LLM_CACHE_DIR,
+    max_bytes=Config.LLM_CACHE_MAX_BYTES,
+    max_age_seconds=Config.LLM_CACHE_MAX_AGE_SECONDS,
+)
@@ -0,0 +1,301 @@
+"""
+Service for Prometheus-format metrics of the generation pipeline.
+"""
+import math
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..utils.logging import get_log_broadcaster, get_log_capture_stats
+from .event_bus import CREW_FINISHED, LLM_CALL_FINISHED, TASK_FINISHED, CrewEvent, event_bus
+from .context_shaper import context_shaper
+from .job_service import job_service
+from .requirements_service import requirements_service
+
+# Bucket upper bounds in seconds
+CREW_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 900, 1800, 3600)
+TASK_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """Render a label set in the exposition format."""
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value in the exposition format."""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    Base class for a named metric family with a fixed set of label names.
+
+    Attributes:
+        name: Metric name.
+        documentation: Help text.
+        labelnames: Names of the labels every sample carries.
+    Methods:
+        render() -> List[str]: Return the exposition lines of the family.
+    """
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Return the label values in label name order."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        """Return the HELP/TYPE header and sample lines of the family."""
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _ValueMetric(Metric):
+    """
+    Metric holding one value per label set.
+
+    Values are either updated by the application, or read at scrape time
+    from a function returning a number (no labels) or a mapping of label
+    value tuples to numbers.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable[[], object]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            values = self._function()
+            items = sorted(values.items()) if isinstance(values, dict) else [((), values)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Counter(_ValueMetric):
+    """Monotonically increasing count, optionally split by labels."""
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter of a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_ValueMetric):
+    """Value that goes up and down, optionally split by labels."""
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the value of a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets, optionally split by labels."""
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = TASK_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: bucket counts, sum and count
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, [[0] * len(self.buckets), 0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key][1] = total + value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(counts), total) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="{}"'.format(_format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metric families rendered together for a scrape.
+
+    Methods:
+        counter(name, documentation, labelnames, function) -> Counter: Register a counter.
+        gauge(name, documentation, labelnames, function) -> Gauge: Register a gauge.
+        histogram(name, documentation, labelnames, buckets) -> Histogram: Register a histogram.
+        render() -> str: Return all metrics in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                function: Optional[Callable[[], object]] = None) -> Counter:
+        """Register and return a counter."""
+        return self._register(Counter(name, documentation, labelnames, function))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              function: Optional[Callable[[], object]] = None) -> Gauge:
+        """Register and return a gauge."""
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = TASK_BUCKETS) -> Histogram:
+        """Register and return a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                print(f"⚠️ Could not collect metric {metric.name}: {e}")
+        return '\n'.join(lines) + '\n'
+
+
+def _process_stats() -> Dict[str, float]:
+    """Return the resident memory in bytes and the thread count of this process."""
+    stats = {'rss_bytes': 0.0, 'threads': float(threading.active_count())}
+    try:
+        with open(f'/proc/{os.getpid()}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    stats['rss_bytes'] = float(line.split()[1]) * 1024
+                elif line.startswith('Threads:'):
+                    stats['threads'] = float(line.split()[1])
+    except OSError:
+        pass
+    return stats
+
+
+# Global registry for the application
+registry = MetricsRegistry()
+
+crew_runtime = registry.histogram(
+    'devteam_crew_runtime_seconds', 'Runtime of a whole crew run.', ['outcome'], CREW_BUCKETS)
+task_runtime = registry.histogram(
+    'devteam_task_runtime_seconds', 'Runtime of a task by AGENT_CONFIG key.', ['task', 'reused'], TASK_BUCKETS)
+llm_latency = registry.histogram(
+    'devteam_llm_call_seconds', 'Latency of LLM calls by model.', ['model', 'cached'], LLM_BUCKETS)
+llm_errors = registry.counter(
+    'devteam_llm_call_errors_total', 'Failed LLM calls by model.', ['model'])
+llm_tokens = registry.counter(
+    'devteam_llm_tokens_total', 'Tokens used by model and kind (prompt or completion).', ['model', 'kind'])
+crew_runs = registry.counter(
+    'devteam_crew_runs_total', 'Finished crew runs by outcome.', ['outcome'])
+http_requests = registry.counter(
+    'devteam_http_requests_total', 'HTTP responses by route and status code.', ['method', 'route', 'status'])
+registry.counter(
+    'devteam_context_tokens_saved_total', 'Estimated prompt tokens saved by context shaping, by task.', ['task'],
+    function=lambda: {(task,): tokens for task, tokens in context_shaper.stats().items()})
+registry.gauge(
+    'devteam_jobs', 'Code generation jobs by state; queued is the queue depth.', ['state'],
+    function=lambda: {(state,): count for state, count in job_service.stats().items()})
+registry.counter(
+    'devteam_jobs_coalesced_total', 'Code generation submissions that reused an existing job, by reason.', ['reason'],
+    function=lambda: {(reason,): count for reason, count in job_service.coalesced.items()})
+registry.gauge(
+    'devteam_sse_subscribers', 'Clients connected to the live log stream.',
+    function=lambda: get_log_broadcaster().subscribers)
+registry.counter(
+    'devteam_log_capture_lines_total', 'Captured output lines processed (use rate() for lines per second).', ['stream'],
+    function=lambda: {(name,): stats['lines_processed'] for name, stats in get_log_capture_stats().items()})
+registry.counter(
+    'devteam_log_capture_published_lines_total', 'Captured lines published to live log clients.', ['stream'],
+    function=lambda: {(name,): stats['lines_published'] for name, stats in get_log_capture_stats().items()})
+registry.counter(
+    'devteam_log_capture_dropped_chunks_total', 'Captured output chunks dropped because the handoff queue was full.',
+    ['stream'],
+    function=lambda: {(name,): stats['chunks_dropped'] for name, stats in get_log_capture_stats().items()})
+registry.gauge(
+    'devteam_requirements_sessions', 'Sessions with stored requirements.',
+    function=lambda: requirements_service.stats()['sessions'])
+registry.gauge(
+    'devteam_requirements_bytes', 'Approximate memory of stored requirements drafts.',
+    function=lambda: requirements_service.stats()['bytes'])
+registry.gauge(
+    'devteam_process_resident_memory_bytes', 'Resident memory of the backend process.',
+    function=lambda: _process_stats()['rss_bytes'])
+registry.gauge(
+    'devteam_process_threads', 'Threads of the backend process.',
+    function=lambda: _process_stats()['threads'])
+
+
+def _on_crew_event(event: CrewEvent) -> None:
+    """Event bus subscriber that records crew, task and LLM timings."""
+    data = event.data
+    seconds = data.get('duration_ms', 0) / 1000
+    if event.type == TASK_FINISHED:
+        task_runtime.observe(seconds, task=event.task_key or 'unknown', reused=str(bool(data.get('reused'))).lower())
+    elif event.type == LLM_CALL_FINISHED:
+        model = data.get('model') or 'unknown'
+        llm_latency.observe(seconds, model=model, cached=str(bool(data.get('cached'))).lower())
+        if data.get('error'):
+            llm_errors.inc(model=model)
+    elif event.type == CREW_FINISHED:
+        outcome = 'error' if data.get('error') else 'success'
+        crew_runtime.observe(seconds, outcome=outcome)
+        crew_runs.inc(outcome=outcome)
+        for model, usage in (data.get('token_usage') or {}).items():
+            llm_tokens.inc(usage.get('prompt_tokens', 0), model=model, kind='prompt')
+            llm_tokens.inc(usage.get('completion_tokens', 0), model=model, kind='completion')
+
+
+event_bus.subscribe(_on_crew_event, [TASK_FINISHED, LLM_CALL_FINISHED, CREW_FINISHED])
+
+
+def record_request(method: str, route: str, status: int) -> None:
+    """Count a finished HTTP response."""
+    http_requests.inc(method=method, route=route, status=str(status))
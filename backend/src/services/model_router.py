@@ -0,0 +1,106 @@
+"""
+Service for choosing the LLM of each task from its routing policy.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import Config
+from .event_bus import LLM_CALL_FINISHED, CrewEvent, event_bus
+
+
+class ModelRouter:
+    """
+    Orders the candidate models of a task by its routing policy and observed latency.
+
+    A task's chain is its 'llm' followed by its 'llm_fallbacks' (or the
+    global LLM_FALLBACK_MODELS). With downgrades enabled, tasks marked
+    'downgrade' in AGENT_CONFIG (report-style stages) try LLM_DOWNGRADE_MODEL
+    first. Models whose average latency exceeds the task's latency target
+    move behind those that meet it, and models that failed recently move to
+    the end for a cooldown period; the chain order decides everything else.
+    Callers holding a configuration snapshot pass the task's entry, so a
+    configuration reload never changes the models of a run in progress.
+
+    Attributes:
+        alpha: Weight of the newest sample in the latency moving average.
+        cooldown_seconds: How long a failed model is tried last.
+    Methods:
+        chain(task_key: str, config: Optional[Dict[str, Any]]) -> List[str]:
+            Configured models of a task, in policy order.
+        route(task_key: str, config: Optional[Dict[str, Any]]) -> List[str]: Models to try for a call, best first.
+        record_latency(model: str, seconds: float) -> None: Update a model's latency average.
+        record_failure(model: str) -> None: Put a model into cooldown.
+        stats() -> Dict[str, Any]: Return latency averages and cooldowns.
+    Usage:
+        for model in model_router.route('security_audit'):
+            try:
+                return call(model)
+            except Exception:
+                model_router.record_failure(model)
+    """
+
+    def __init__(self, alpha: float = 0.3, cooldown_seconds: float = 60):
+        self.alpha = alpha
+        self.cooldown_seconds = cooldown_seconds
+        self._latency: Dict[str, float] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def chain(self, task_key: str, config: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Return the configured models of a task in policy order, without
+        duplicates, from the given AGENT_CONFIG entry or the current one.
+        """
+        config = config if config is not None else Config.get_agent_config(task_key)
+        models = [config.get('llm', 'openai/gpt-4o-mini')]
+        models += config.get('llm_fallbacks', Config.LLM_FALLBACK_MODELS)
+        if Config.LLM_DOWNGRADE_ENABLED and config.get('downgrade'):
+            models.insert(0, Config.LLM_DOWNGRADE_MODEL)
+        return list(dict.fromkeys(model for model in models if model))
+
+    def route(self, task_key: str, config: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Return the models to try for a call of the task, best first."""
+        config = config if config is not None else Config.get_agent_config(task_key)
+        models = self.chain(task_key, config)
+        target = config.get('max_latency_ms', Config.LLM_MAX_LATENCY_MS) / 1000
+        now = time.monotonic()
+        with self._lock:
+            def rank(model):
+                cooling_down = self._failed_until.get(model, 0) > now
+                too_slow = bool(target) and self._latency.get(model, 0) > target
+                return (cooling_down, too_slow)
+            return sorted(models, key=rank)
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        """Fold a successful call's latency into the model's moving average."""
+        with self._lock:
+            previous = self._latency.get(model)
+            self._latency[model] = seconds if previous is None else self.alpha * seconds + (1 - self.alpha) * previous
+            self._failed_until.pop(model, None)
+
+    def record_failure(self, model: str) -> None:
+        """Try a failed model last until its cooldown expires."""
+        with self._lock:
+            self._failed_until[model] = time.monotonic() + self.cooldown_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the latency averages and remaining cooldowns by model."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'latency_ms': {model: round(seconds * 1000, 1) for model, seconds in self._latency.items()},
+                'cooldown_seconds': {
+                    model: round(until - now, 1) for model, until in self._failed_until.items() if until > now
+                },
+            }
+
+    def _on_llm_call(self, event: CrewEvent) -> None:
+        """Event bus subscriber that learns latencies from uncached, successful calls."""
+        if not event.data.get('cached') and not event.data.get('error') and event.data.get('model'):
+            self.record_latency(event.data['model'], event.data.get('duration_ms', 0) / 1000)
+
+
+# Global instance for the application
+model_router = ModelRouter(cooldown_seconds=Config.LLM_FAILURE_COOLDOWN_SECONDS)
+event_bus.subscribe(model_router._on_llm_call, [LLM_CALL_FINISHED])
@@ -0,0 +1,231 @@
+"""
+Service for planning crew runs: dependency validation, levels, critical path and expected durations.
+"""
+import json
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config import Config
+from .event_bus import TASK_FINISHED, CrewEvent, event_bus
+from .workspace_service import atomic_write
+
+
+def _dependencies(agents: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Dependencies of each agent, limited to the given agents; disabled dependencies are skipped."""
+    return {
+        key: [dep for dep in config.get('dependencies', []) if dep in agents]
+        for key, config in agents.items()
+    }
+
+
+def _find_cycle(dependencies: Dict[str, List[str]], nodes: List[str]) -> List[str]:
+    """Return one dependency cycle among the given nodes, first node repeated at the end."""
+    remaining = set(nodes)
+    path: List[str] = []
+    node = nodes[0]
+    # Every node left by Kahn's algorithm has a dependency that is also left, so walking them must loop
+    while node not in path:
+        path.append(node)
+        node = next(dep for dep in dependencies[node] if dep in remaining)
+    cycle = path[path.index(node):]
+    return cycle + [cycle[0]]
+
+
+def topological_order(agents: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Order the agents so every agent comes after its dependencies.
+
+    Uses Kahn's algorithm, keeping the configuration order among agents that
+    are ready at the same time.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle.
+    """
+    dependencies = _dependencies(agents)
+    waiting = {key: len(deps) for key, deps in dependencies.items()}
+    dependents: Dict[str, List[str]] = {key: [] for key in agents}
+    for key, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(key)
+
+    position = {key: index for index, key in enumerate(agents)}
+    ready = [key for key in agents if waiting[key] == 0]
+    ordered = []
+    while ready:
+        key = ready.pop(0)
+        ordered.append(key)
+        for dependent in dependents[key]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+                ready.sort(key=position.__getitem__)
+
+    if len(ordered) < len(agents):
+        left = [key for key in agents if waiting[key] > 0]
+        raise ValueError(f"dependency cycle: {' -> '.join(_find_cycle(dependencies, left))}")
+    return ordered
+
+
+def levels(agents: Dict[str, Dict[str, Any]], order: List[str]) -> Dict[str, int]:
+    """Level of each agent: 0 without dependencies, else one more than its deepest dependency."""
+    dependencies = _dependencies(agents)
+    result: Dict[str, int] = {}
+    for key in order:
+        result[key] = max((result[dep] + 1 for dep in dependencies[key]), default=0)
+    return result
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers, or None if it is empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class TaskTimings:
+    """
+    Recent durations of each task, fed from TASK_FINISHED events.
+
+    Only tasks that actually ran count; reused outputs finish almost instantly
+    and would hide the real cost of a task. Each task keeps its latest
+    history_size durations, so estimates follow changes in models or prompts.
+    The durations are saved to a JSON file after every change and loaded
+    again at startup, so estimates survive restarts.
+
+    Attributes:
+        history_size: Durations kept per task.
+        path: JSON file the durations are persisted to, or None to keep them in memory only.
+    Methods:
+        record(task_key: str, duration_ms: float) -> None: Add a duration of a task.
+        estimate(task_key: str) -> Dict[str, Any]: Return the p50/p95 durations and sample count of a task.
+    Usage:
+        task_timings.estimate('backend_code')['p95_ms']
+    """
+
+    def __init__(self, history_size: int = 50, path: Optional[str] = None):
+        self.history_size = history_size
+        self.path = path
+        self._durations: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._load()
+        event_bus.subscribe(self._on_task_finished, [TASK_FINISHED])
+
+    def record(self, task_key: str, duration_ms: float) -> None:
+        """Add a duration of a task, dropping its oldest one beyond the history size."""
+        with self._lock:
+            durations = self._durations.get(task_key)
+            if durations is None:
+                durations = self._durations[task_key] = deque(maxlen=self.history_size)
+            durations.append(duration_ms)
+            self._save()
+
+    def estimate(self, task_key: str) -> Dict[str, Any]:
+        """Return the p50 and p95 durations of a task in milliseconds (None without history)."""
+        with self._lock:
+            durations = list(self._durations.get(task_key, ()))
+        return {
+            'p50_ms': percentile(durations, 0.50),
+            'p95_ms': percentile(durations, 0.95),
+            'samples': len(durations),
+        }
+
+    def _load(self) -> None:
+        """Load the durations saved by previous runs, if any."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self._durations = {
+                task_key: deque((float(duration) for duration in durations), maxlen=self.history_size)
+                for task_key, durations in saved.items()
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"⚠️ Could not load task timings from {self.path}: {e}")
+
+    def _save(self) -> None:
+        """Write the durations to the timings file atomically. Caller holds the lock."""
+        if not self.path:
+            return
+        data = {task_key: list(durations) for task_key, durations in self._durations.items()}
+        try:
+            atomic_write(self.path, json.dumps(data).encode('utf-8'))
+        except OSError as e:
+            print(f"⚠️ Could not save task timings to {self.path}: {e}")
+
+    def _on_task_finished(self, event: CrewEvent) -> None:
+        """Event bus subscriber recording the duration of tasks that ran."""
+        if event.task_key and not event.data.get('reused') and 'duration_ms' in event.data:
+            self.record(event.task_key, event.data['duration_ms'])
+
+
+def build_plan(agents: Dict[str, Dict[str, Any]], timings: TaskTimings,
+               execution_mode: str = 'parallel') -> Dict[str, Any]:
+    """
+    Plan a crew run of the given (enabled) agents.
+
+    Every task is annotated with its level and historical durations. The
+    critical path is the chain of dependencies with the largest total p50
+    duration; in parallel mode it bounds the job duration, in sequential mode
+    the durations of all tasks add up. Tasks without history count as zero,
+    and 'complete' tells whether every task had history.
+    """
+    order = topological_order(agents)
+    dependencies = _dependencies(agents)
+    task_levels = levels(agents, order)
+    estimates = {key: timings.estimate(key) for key in order}
+
+    # Longest path by p50, walking the tasks in dependency order
+    finish: Dict[str, Dict[str, float]] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for key in order:
+        slowest = max(dependencies[key], key=lambda dep: finish[dep]['p50_ms'], default=None)
+        start = finish[slowest] if slowest else {'p50_ms': 0.0, 'p95_ms': 0.0}
+        previous[key] = slowest
+        finish[key] = {
+            metric: start[metric] + (estimates[key][metric] or 0.0) for metric in ('p50_ms', 'p95_ms')
+        }
+
+    critical_path: List[str] = []
+    node = max(order, key=lambda key: finish[key]['p50_ms'], default=None)
+    while node is not None:
+        critical_path.insert(0, node)
+        node = previous[node]
+
+    if execution_mode == 'sequential':
+        expected = {
+            metric: sum(estimates[key][metric] or 0.0 for key in order) for metric in ('p50_ms', 'p95_ms')
+        }
+    else:
+        expected = finish[critical_path[-1]] if critical_path else {'p50_ms': 0.0, 'p95_ms': 0.0}
+
+    return {
+        'execution_mode': execution_mode,
+        'order': order,
+        'levels': [
+            [key for key in order if task_levels[key] == level]
+            for level in range(max(task_levels.values(), default=-1) + 1)
+        ],
+        'tasks': {
+            key: {
+                'name': agents[key].get('name'),
+                'dependencies': dependencies[key],
+                'level': task_levels[key],
+                'critical': key in critical_path,
+                **estimates[key],
+            }
+            for key in order
+        },
+        'critical_path': critical_path,
+        'expected_duration_ms': expected,
+        'complete': all(estimates[key]['samples'] for key in order),
+    }
+
+
+# Global instance for the application
+task_timings = TaskTimings(history_size=Config.PLAN_HISTORY_SIZE, path=Config.PLAN_TIMINGS_FILE)
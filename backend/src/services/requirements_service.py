@@ -1,58 +1,169 @@
 """
 Service for managing user requirements storage.
 """
-from typing import Optional
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..config import Config
+
+# Session of clients that do not send a session id
+DEFAULT_SESSION = 'default'
+
+_SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,128}$')
+
+
+def _size_of(text: str) -> int:
+    """Approximate memory of a draft; non-ASCII strings take up to four bytes per character."""
+    return len(text) if text.isascii() else len(text) * 4
+
+
+class _Session:
+    """Versioned requirements drafts of one session, newest last."""
+
+    __slots__ = ('versions', 'next_version', 'size')
+
+    def __init__(self, history_size: int):
+        # (version, requirements, saved_at)
+        self.versions: Deque[Tuple[int, str, float]] = deque(maxlen=history_size)
+        self.next_version = 1
+        self.size = 0
+
 
 class RequirementsService:
     """
     Service for storing and retrieving user requirements.
     This service allows setting, getting, checking existence, and clearing requirements.
 
+    Requirements are kept per session (the client's X-Session-Id), so
+    concurrent users never see or overwrite each other's drafts. Each session
+    keeps its last few versions; sessions are evicted least recently used
+    first once there are too many or their drafts exceed the memory cap. All
+    operations take one lock and cost O(1) apart from copying the history.
+
     It also provides validation for the requirements string to ensure it meets certain criteria.
     Attributes:
-        _stored_requirements: A string to hold the user requirements.
+        max_sessions: Maximum number of sessions kept.
+        history_size: Versions kept per session.
+        max_bytes: Memory cap on the stored drafts of all sessions.
     Methods:
-        set_requirements(requirements: str) -> None: Store user requirements.
-        get_requirements() -> str: Retrieve stored requirements.
-        has_requirements() -> bool: Check if requirements are stored.
-        clear_requirements() -> None: Clear stored requirements.
+        set_requirements(requirements: str, session_id: str) -> int: Store a new version and return its number.
+        get_requirements(session_id: str, version: Optional[int]) -> str: Retrieve the latest or a given version.
+        get_history(session_id: str) -> List[Dict[str, Any]]: List the kept versions of a session.
+        has_requirements(session_id: str) -> bool: Check if requirements are stored.
+        clear_requirements(session_id: str) -> None: Forget a session's requirements.
+        stats() -> Dict[str, int]: Return session count and stored bytes.
         validate_requirements(requirements: str, max_length: int = 10000) -> None:
             Validate the requirements string to ensure it is not empty and does not exceed max length.
+        validate_session_id(session_id: Optional[str]) -> str: Return a usable session id.
     Usage:
-        This service can be used to manage user requirements in applications where
-        requirements need to be stored and validated, such as in task management or project planning tools.
+        session_id = requirements_service.validate_session_id(request.headers.get('X-Session-Id'))
+        version = requirements_service.set_requirements(text, session_id)
+        requirements = requirements_service.get_requirements(session_id)
     """
-    
-    def __init__(self):
-        self._stored_requirements: str = ""
-    
-    def set_requirements(self, requirements: str) -> None:
-        """Store user requirements."""
+
+    def __init__(self, max_sessions: int = 1000, history_size: int = 10, max_bytes: int = 16 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.history_size = history_size
+        self.max_bytes = max_bytes
+        self._sessions: 'OrderedDict[str, _Session]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def set_requirements(self, requirements: str, session_id: str = DEFAULT_SESSION) -> int:
+        """Store user requirements as the session's newest version and return its number."""
         if not isinstance(requirements, str):
             raise ValueError("Requirements must be a string")
-        
-        self._stored_requirements = requirements.strip()
-    
-    def get_requirements(self) -> str:
-        """Get stored requirements."""
-        return self._stored_requirements
-    
-    def has_requirements(self) -> bool:
+
+        requirements = requirements.strip()
+        size = _size_of(requirements)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(self.history_size)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            if len(session.versions) == session.versions.maxlen:
+                dropped_size = _size_of(session.versions[0][1])
+                session.size -= dropped_size
+                self._size -= dropped_size
+            version = session.next_version
+            session.versions.append((version, requirements, time.time()))
+            session.next_version += 1
+            session.size += size
+            self._size += size
+            self._evict()
+            return version
+
+    def get_requirements(self, session_id: str = DEFAULT_SESSION, version: Optional[int] = None) -> str:
+        """Get the session's latest requirements, or a given kept version ('' if unknown)."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or not session.versions:
+                return ""
+            self._sessions.move_to_end(session_id)
+            if version is None:
+                return session.versions[-1][1]
+            # Versions are consecutive, so the position follows from the oldest kept one
+            index = version - session.versions[0][0]
+            return session.versions[index][1] if 0 <= index < len(session.versions) else ""
+
+    def get_history(self, session_id: str = DEFAULT_SESSION) -> List[Dict[str, Any]]:
+        """List the kept versions of a session, newest first."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            versions = list(session.versions) if session else []
+        return [
+            {'version': version, 'saved_at': saved_at, 'length': len(requirements)}
+            for version, requirements, saved_at in reversed(versions)
+        ]
+
+    def has_requirements(self, session_id: str = DEFAULT_SESSION) -> bool:
         """Check if requirements are stored."""
-        return bool(self._stored_requirements.strip())
-    
-    def clear_requirements(self) -> None:
+        return bool(self.get_requirements(session_id))
+
+    def clear_requirements(self, session_id: str = DEFAULT_SESSION) -> None:
         """Clear stored requirements."""
-        self._stored_requirements = ""
-    
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._size -= session.size
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of sessions and the approximate bytes of stored drafts."""
+        with self._lock:
+            return {'sessions': len(self._sessions), 'bytes': self._size}
+
+    def _evict(self) -> None:
+        """Drop least recently used sessions until within the limits; the caller holds the lock."""
+        # The most recently used session is always kept, even if it alone exceeds the cap
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self._size > self.max_bytes):
+            _, session = self._sessions.popitem(last=False)
+            self._size -= session.size
+
     def validate_requirements(self, requirements: str, max_length: int = 10000) -> None:
         """Validate requirements string."""
         if not requirements or not requirements.strip():
             raise ValueError("Requirements cannot be empty")
-        
+
         if len(requirements) > max_length:
             raise ValueError(f"Requirements too long (max {max_length} characters)")
 
+    def validate_session_id(self, session_id: Optional[str]) -> str:
+        """Return the session id, or the default session if none was given."""
+        if not session_id:
+            return DEFAULT_SESSION
+        if not _SESSION_ID_PATTERN.match(session_id):
+            raise ValueError("Invalid session id (1-128 letters, digits, '_', '-', '.' or ':')")
+        return session_id
+
 
 # Global instance for the application
-requirements_service = RequirementsService()
+requirements_service = RequirementsService(
+    max_sessions=Config.REQUIREMENTS_MAX_SESSIONS,
+    history_size=Config.REQUIREMENTS_HISTORY_SIZE,
+    max_bytes=Config.REQUIREMENTS_MAX_BYTES,
+)
@@ -0,0 +1,132 @@
+"""
+Store of task outputs keyed by a hash of each task's inputs.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..config import Config
+
+
+class TaskOutputStore:
+    """
+    Persists task outputs so unchanged tasks can be skipped on the next run.
+
+    A task's input hash covers the run inputs (requirements, module and class
+    name), its AGENT_CONFIG entry, its rendered prompt, the LLM endpoint
+    (LLM_BASE_URL) and the hashes of the outputs of its upstream tasks. If any of those change the hash changes,
+    and so does the hash of every task downstream of it, so only the affected
+    part of the pipeline runs again.
+
+    Attributes:
+        directory: Directory holding one JSON file per stored output.
+        max_entries: Maximum number of outputs kept; the oldest are removed first.
+    Methods:
+        input_hash(task_key, inputs, config_entry, prompt, upstream_hashes) -> str:
+            Hash everything a task's output depends on.
+        output_hash(raw: str) -> str: Hash a task's output text.
+        get(input_hash: str) -> Optional[Dict[str, Any]]: Look up a stored output.
+        put(input_hash: str, task_key: str, raw: str, agent: str) -> None: Store an output.
+    Usage:
+        key = task_output_store.input_hash('design', inputs, entry, prompt, {})
+        stored = task_output_store.get(key)
+        if stored is None:
+            raw = run_task()
+            task_output_store.put(key, 'design', raw, agent_role)
+    """
+
+    def __init__(self, directory: str, max_entries: int):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def input_hash(
+        task_key: str,
+        inputs: Dict[str, Any],
+        config_entry: Dict[str, Any],
+        prompt: Dict[str, Any],
+        upstream_hashes: Dict[str, str],
+    ) -> str:
+        """Hash everything a task's output depends on."""
+        payload = json.dumps({
+            'task': task_key,
+            'inputs': inputs,
+            'config': config_entry,
+            'prompt': prompt,
+            'upstream': upstream_hashes,
+            # Outputs of another endpoint (such as the benchmark stub) are never reused
+            'llm_base_url': Config.LLM_BASE_URL,
+        }, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def output_hash(raw: str) -> str:
+        """Hash a task's output text."""
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, input_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the stored output for an input hash, or None."""
+        path = self._path(input_hash)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            # Mark as recently used so pruning keeps it
+            os.utime(path)
+            return stored
+        except (OSError, ValueError):
+            return None
+
+    def put(self, input_hash: str, task_key: str, raw: str, agent: str) -> None:
+        """Store a task output under its input hash."""
+        data = json.dumps({
+            'task': task_key,
+            'input_hash': input_hash,
+            'output_hash': self.output_hash(raw),
+            'agent': agent,
+            'raw': raw,
+            'created_at': time.time(),
+        }, ensure_ascii=False)
+
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(input_hash))
+                self._prune()
+            except OSError as e:
+                print(f"⚠️ Could not store output of task {task_key}: {e}")
+
+    def _path(self, input_hash: str) -> str:
+        """Return the file path for an input hash."""
+        return os.path.join(self.directory, f'{input_hash}.json')
+
+    def _prune(self) -> None:
+        """Remove the oldest outputs beyond max_entries. Caller holds the lock."""
+        entries = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith('.json')
+        ]
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Global instance for the application
+task_output_store = TaskOutputStore(
+    directory=Config.TASK_STORE_DIR,
+    max_entries=Config.TASK_STORE_MAX_ENTRIES,
+)
@@ -0,0 +1,237 @@
+"""
+Service for per-job output workspaces with atomic artifact writes.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Name of the manifest file inside every workspace
+MANIFEST_FILE = 'manifest.json'
+
+# Directory inside every workspace holding precompressed copies of the artifacts
+ENCODED_DIR = '.encoded'
+
+# Precompressed variants by Content-Encoding, with the suffix of their files
+ENCODINGS = {'gzip': '.gz'}
+if brotli is not None:
+    ENCODINGS['br'] = '.br'
+
+
+def artifact_url(job_id: str, task_key: str) -> str:
+    """Return the API URL serving a task's artifact."""
+    return f'/api/jobs/{job_id}/artifacts/{task_key}'
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write data to path so readers only ever see the old or the complete new file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class Workspace:
+    """
+    Output directory of a single generation job.
+
+    Artifacts are written with write-then-rename, so a concurrent reader never
+    sees a partial file, and every write is recorded in manifest.json with
+    the artifact's path, size and SHA-256. Artifacts of at least
+    ARTIFACT_COMPRESS_MIN_BYTES are also stored gzip (and, with the brotli
+    package installed, brotli) compressed, so they can be served encoded
+    without compressing them per request.
+
+    Attributes:
+        job_id: Id of the job owning the workspace.
+        path: Absolute path of the workspace directory.
+        manifest: Manifest contents, with artifacts keyed by task key.
+    Methods:
+        write_artifact(task_key, relative_path, content, agent) -> Dict[str, Any]:
+            Atomically write an artifact and record it in the manifest.
+        artifact_path(task_key: str) -> Optional[str]: Absolute path of a recorded artifact.
+        encoded_path(task_key: str, encoding: str) -> Optional[str]: Path of a precompressed artifact.
+    """
+
+    def __init__(self, job_id: str, path: str):
+        self.job_id = job_id
+        self.path = path
+        self._lock = threading.Lock()
+        self.manifest: Dict[str, Any] = self._load_manifest() or {
+            'job_id': job_id,
+            'created_at': time.time(),
+            'updated_at': time.time(),
+            'artifacts': {},
+        }
+
+    def write_artifact(self, task_key: str, relative_path: str, content: str, agent: str = '') -> Dict[str, Any]:
+        """Atomically write an artifact and record it in the manifest."""
+        path = os.path.normpath(os.path.join(self.path, relative_path))
+        if os.path.commonpath([self.path, path]) != self.path or path == self.path:
+            raise ValueError(f"Artifact path escapes the workspace: {relative_path}")
+
+        data = content.encode('utf-8')
+        atomic_write(path, data)
+        relative_path = os.path.relpath(path, self.path)
+
+        encodings = {}
+        if len(data) >= Config.ARTIFACT_COMPRESS_MIN_BYTES:
+            for encoding, suffix in ENCODINGS.items():
+                encoded = gzip.compress(data, 6, mtime=0) if encoding == 'gzip' else brotli.compress(data)
+                if len(encoded) < len(data):
+                    atomic_write(os.path.join(self.path, ENCODED_DIR, relative_path + suffix), encoded)
+                    encodings[encoding] = len(encoded)
+
+        entry = {
+            'path': relative_path,
+            'agent': agent,
+            'size': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'encodings': encodings,
+            'written_at': time.time(),
+        }
+        with self._lock:
+            self.manifest['artifacts'][task_key] = entry
+            self.manifest['updated_at'] = entry['written_at']
+            atomic_write(
+                os.path.join(self.path, MANIFEST_FILE),
+                json.dumps(self.manifest, indent=2, ensure_ascii=False).encode('utf-8'),
+            )
+        return entry
+
+    def artifact_path(self, task_key: str) -> Optional[str]:
+        """Return the absolute path of a recorded artifact, or None."""
+        entry = self.manifest['artifacts'].get(task_key)
+        return os.path.join(self.path, entry['path']) if entry else None
+
+    def encoded_path(self, task_key: str, encoding: str) -> Optional[str]:
+        """Return the path of an artifact's precompressed variant, or None if there is none."""
+        entry = self.manifest['artifacts'].get(task_key)
+        if not entry or encoding not in entry.get('encodings', {}):
+            return None
+        return os.path.join(self.path, ENCODED_DIR, entry['path'] + ENCODINGS[encoding])
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        """Load an existing manifest from disk, if any."""
+        try:
+            with open(os.path.join(self.path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+class WorkspaceManager:
+    """
+    Creates per-job workspaces and garbage-collects old ones.
+
+    Every job writes into its own directory under root, so concurrent
+    generations never overwrite each other's files. Workspaces older than
+    max_age_seconds, and the oldest ones beyond max_workspaces, are removed
+    whenever a new workspace is created; workspaces of running jobs are kept.
+
+    Attributes:
+        root: Directory holding all workspaces.
+        max_workspaces: Maximum number of workspaces kept on disk.
+        max_age_seconds: Age after which a workspace is removed.
+    Methods:
+        create(job_id: str) -> Workspace: Create a workspace for a job.
+        get(job_id: str) -> Optional[Workspace]: Open an existing workspace.
+        release(job_id: str) -> None: Mark a job's workspace as no longer in use.
+        collect_garbage() -> List[str]: Remove expired workspaces.
+    Usage:
+        workspace = workspace_manager.create(job_id)
+        workspace.write_artifact('design', 'design.md', text)
+        workspace_manager.release(job_id)
+    """
+
+    def __init__(self, root: str, max_workspaces: int, max_age_seconds: int):
+        self.root = os.path.abspath(root)
+        self.max_workspaces = max_workspaces
+        self.max_age_seconds = max_age_seconds
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str) -> Workspace:
+        """Create the workspace of a job and collect old workspaces."""
+        if not job_id or os.path.basename(job_id) != job_id or job_id.startswith('.'):
+            raise ValueError(f"Invalid job id: {job_id}")
+
+        path = os.path.join(self.root, job_id)
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            self._active.add(job_id)
+        self.collect_garbage()
+        return Workspace(job_id, path)
+
+    def get(self, job_id: str) -> Optional[Workspace]:
+        """Open an existing workspace, or return None if it does not exist."""
+        if not job_id or os.path.basename(job_id) != job_id or job_id.startswith('.'):
+            return None
+        path = os.path.join(self.root, job_id)
+        if not os.path.isdir(path):
+            return None
+        return Workspace(job_id, path)
+
+    def release(self, job_id: str) -> None:
+        """Mark a job's workspace as finished so it can be collected."""
+        with self._lock:
+            self._active.discard(job_id)
+
+    def collect_garbage(self) -> List[str]:
+        """Remove workspaces past the age limit and the oldest beyond the count limit."""
+        try:
+            names = [name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name))]
+        except OSError:
+            return []
+
+        with self._lock:
+            candidates = []
+            for name in names:
+                if name in self._active:
+                    continue
+                try:
+                    candidates.append((os.path.getmtime(os.path.join(self.root, name)), name))
+                except OSError:
+                    continue
+
+            candidates.sort()
+            now = time.time()
+            excess = len(names) - self.max_workspaces
+            removed = []
+            for mtime, name in candidates:
+                if now - mtime > self.max_age_seconds or len(removed) < excess:
+                    shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                    removed.append(name)
+
+        if removed:
+            print(f"🧹 Removed {len(removed)} old output workspaces")
+        return removed
+
+
+# Global instance for the application
+workspace_manager = WorkspaceManager(
+    root=Config.WORKSPACE_ROOT,
+    max_workspaces=Config.WORKSPACE_MAX_COUNT,
+    max_age_seconds=Config.WORKSPACE_MAX_AGE_SECONDS,
+)
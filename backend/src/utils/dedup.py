@@ -0,0 +1,165 @@
+"""
+Fixed-memory deduplication and rate limiting for captured log lines.
+"""
+import hashlib
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counter with a fixed memory footprint.
+
+    Counts are kept in depth rows of width counters; an item increments one
+    counter per row and its estimate is the minimum of those counters. The
+    estimate never undercounts and overcounts only on hash collisions, so it
+    is a safe basis for "seen too often" decisions.
+
+    Attributes:
+        width: Number of counters per row.
+        depth: Number of rows (independent hash functions).
+    Methods:
+        add(item: str) -> int: Count an item and return its new estimate.
+        estimate(item: str) -> int: Return the estimated count of an item.
+        reset() -> None: Set all counters back to zero.
+        memory_bytes() -> int: Return the size of the counter tables.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        if width < 1 or depth < 1:
+            raise ValueError(f"Invalid sketch size: {width}x{depth}")
+        self.width = width
+        self.depth = depth
+        self._tables = [array('I', [0]) * width for _ in range(depth)]
+        self._unpack = struct.Struct(f'<{depth}I').unpack
+
+    def _indexes(self, item: str):
+        """Return the counter index of the item in each row."""
+        digest = hashlib.blake2b(item.encode('utf-8', 'replace'), digest_size=4 * self.depth).digest()
+        return [value % self.width for value in self._unpack(digest)]
+
+    def add(self, item: str) -> int:
+        """Count an item and return its new estimated count."""
+        counts = []
+        for table, index in zip(self._tables, self._indexes(item)):
+            if table[index] < 0xFFFFFFFF:
+                table[index] += 1
+            counts.append(table[index])
+        return min(counts)
+
+    def estimate(self, item: str) -> int:
+        """Return the estimated number of times an item was added."""
+        return min(table[index] for table, index in zip(self._tables, self._indexes(item)))
+
+    def reset(self) -> None:
+        """Set all counters back to zero."""
+        self._tables = [array('I', [0]) * self.width for _ in range(self.depth)]
+
+    def memory_bytes(self) -> int:
+        """Return the size of the counter tables in bytes."""
+        return sum(table.itemsize * len(table) for table in self._tables)
+
+
+class LogDeduplicator:
+    """
+    Decides whether a log line should be published, in bounded memory.
+
+    A line is suppressed if it is one of the last window distinct lines
+    published (an LRU, so the oldest line is evicted first), or if it has
+    already been published max_repetitions times according to a count-min
+    sketch. With rate_window_seconds set, the sketch is cleared at that
+    interval, turning the repetition cap into a per-window rate limit;
+    otherwise it applies for the lifetime of the process.
+
+    Attributes:
+        window: Number of recent distinct lines remembered.
+        max_repetitions: Times a line may be published, 0 for unlimited.
+        rate_window_seconds: Interval at which repetition counts reset, 0 for never.
+    Methods:
+        should_publish(line: str) -> bool: Record a line and decide if it is new enough to publish.
+        __contains__(line: str) -> bool: Check if a line is in the recent window.
+        stats() -> Dict[str, Any]: Return counters and the memory footprint.
+    Usage:
+        dedup = LogDeduplicator(window=100, max_repetitions=3)
+        if dedup.should_publish(line):
+            publish(line)
+    """
+
+    def __init__(
+        self,
+        window: int = 100,
+        max_repetitions: int = 3,
+        sketch_width: int = 2048,
+        sketch_depth: int = 4,
+        rate_window_seconds: float = 0,
+    ):
+        self.window = window
+        self.max_repetitions = max_repetitions
+        self.rate_window_seconds = rate_window_seconds
+        self._recent: 'OrderedDict[str, None]' = OrderedDict()
+        self._recent_bytes = 0
+        self._sketch = CountMinSketch(sketch_width, sketch_depth)
+        self._window_started = time.monotonic()
+        self.published = 0
+        self.suppressed_duplicates = 0
+        self.suppressed_repetitions = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, line: str) -> bool:
+        return line in self._recent
+
+    def should_publish(self, line: str) -> bool:
+        """Record a line and return True if it should be published."""
+        with self._lock:
+            return self._record(line)
+
+    def _record(self, line: str) -> bool:
+        """Apply the dedup and rate limit rules. Caller holds the lock."""
+        # Skip lines we just published
+        if line in self._recent:
+            self._recent.move_to_end(line)
+            self.suppressed_duplicates += 1
+            return False
+
+        # Check rate limiting
+        if self.max_repetitions:
+            if self.rate_window_seconds and time.monotonic() - self._window_started >= self.rate_window_seconds:
+                self._sketch.reset()
+                self._window_started = time.monotonic()
+            if self._sketch.estimate(line) >= self.max_repetitions:
+                self.suppressed_repetitions += 1
+                return False
+            self._sketch.add(line)
+
+        # Remember the line, evicting the least recently seen one
+        self._recent[line] = None
+        self._recent_bytes += sys.getsizeof(line)
+        if len(self._recent) > self.window:
+            oldest, _ = self._recent.popitem(last=False)
+            self._recent_bytes -= sys.getsizeof(oldest)
+
+        self.published += 1
+        return True
+
+    def memory_bytes(self) -> int:
+        """Return the approximate memory used by the recent window and the sketch."""
+        return sys.getsizeof(self._recent) + self._recent_bytes + self._sketch.memory_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return dedup counters and the memory footprint."""
+        with self._lock:
+            return {
+                'published': self.published,
+                'suppressed_duplicates': self.suppressed_duplicates,
+                'suppressed_repetitions': self.suppressed_repetitions,
+                'recent_lines': len(self._recent),
+                'window': self.window,
+                'max_repetitions': self.max_repetitions,
+                'rate_window_seconds': self.rate_window_seconds,
+                'memory_bytes': self.memory_bytes(),
+            }
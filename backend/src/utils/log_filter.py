@@ -0,0 +1,120 @@
+"""
+Compiled, data-driven filter that decides which captured lines are agent activity.
+"""
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Pattern
+
+import yaml
+
+from ..config import BASE_DIR
+
+# Default location of the filter rules
+DEFAULT_RULES_PATH = os.path.join(BASE_DIR, 'config', 'log_filters.yaml')
+
+
+def _compile_alternation(patterns: List[str]) -> Optional[Pattern]:
+    """Combine patterns into a single case-insensitive alternation, or None if empty."""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+
+
+class LogFilter:
+    """
+    Decides whether a cleaned log line is substantive agent activity.
+
+    The rules (include/exclude regexes and keywords) are loaded from a YAML
+    file and compiled once into one alternation regex per rule group, so each
+    line costs at most three regex searches instead of one per pattern.
+    The rules can be reloaded at runtime, either explicitly or whenever the
+    file's modification time changes.
+
+    Attributes:
+        path: Path of the YAML rules file.
+        rules: The rules currently in effect.
+    Methods:
+        matches(line: str) -> bool: Check if a line should be streamed.
+        reload() -> None: Load and compile the rules file.
+        reload_if_changed(interval: float) -> bool: Reload if the file changed.
+    Usage:
+        log_filter = LogFilter('config/log_filters.yaml')
+        if log_filter.matches(line):
+            publish(line)
+    """
+
+    def __init__(self, path: str = DEFAULT_RULES_PATH):
+        self.path = path
+        self.rules: Dict[str, Any] = {}
+        self._min_length = 3
+        self._keyword_min_length = 20
+        self._exclude: Optional[Pattern] = None
+        self._include: Optional[Pattern] = None
+        self._keywords: Optional[Pattern] = None
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def matches(self, line: str) -> bool:
+        """Check if the log line is a substantive agent/task/requirements/instructions log."""
+        if not line or len(line.strip()) < self._min_length:
+            return False
+
+        # If any exclude pattern matches, skip
+        if self._exclude is not None and self._exclude.search(line):
+            return False
+
+        # If any include pattern matches, allow
+        if self._include is not None and self._include.search(line):
+            return True
+
+        # Also allow any line that's reasonably long and contains useful words
+        if self._keywords is not None and len(line) > self._keyword_min_length:
+            return self._keywords.search(line) is not None
+
+        return False
+
+    def reload(self) -> None:
+        """Load the rules file and swap in the newly compiled matchers."""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                rules = yaml.safe_load(f) or {}
+
+            exclude = _compile_alternation(rules.get('exclude_patterns', []))
+            include = _compile_alternation(rules.get('include_patterns', []))
+            keywords = _compile_alternation([re.escape(k) for k in rules.get('keywords', [])])
+        except (OSError, yaml.YAMLError, re.error) as e:
+            print(f"⚠️ Could not load log filter rules from {self.path}: {e}")
+            return
+
+        with self._lock:
+            self.rules = rules
+            self._min_length = int(rules.get('min_length', 3))
+            self._keyword_min_length = int(rules.get('keyword_min_length', 20))
+            self._exclude, self._include, self._keywords = exclude, include, keywords
+            self._mtime = mtime
+
+    def reload_if_changed(self, interval: float = 5.0) -> bool:
+        """Reload the rules if the file changed; checks the file at most once per interval."""
+        now = time.monotonic()
+        if now - self._last_check < interval:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+
+        self.reload()
+        return True
+
+
+# Global filter shared by all log captures
+log_filter = LogFilter()
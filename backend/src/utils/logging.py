@@ -2,14 +2,116 @@
 Logging utilities for capturing and streaming CrewAI agent logs.
 """
 import io
-import queue
 import re
 import sys
 import logging
-from typing import Optional
+import threading
+from collections import deque
+from typing import Callable, List, Optional, Tuple
 
-# Global queue for live logs
-log_queue = queue.Queue()
+from ..config import Config
+from .dedup import LogDeduplicator
+from .log_filter import log_filter
+
+# Patterns used to clean captured output, compiled once
+ANSI_ESCAPE_RE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+CURSOR_CODES_RE = re.compile(r'\[2K\[1A|\[2K|\[1A')
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+
+class LogBroadcaster:
+    """
+    Fan-out buffer that delivers every captured log line to every subscriber.
+    
+    Lines are kept in a fixed-size ring buffer and numbered with an increasing
+    sequence number. Each subscriber keeps its own cursor (the last sequence
+    number it has seen) and reads everything after it, so subscribers never
+    take lines away from each other, a reconnecting client can resume from
+    its Last-Event-ID, and memory stays bounded when nobody is listening.
+    Looking up an entry is a single index into the ring, so each delivery is O(1).
+    
+    Attributes:
+        capacity: Number of lines kept in the ring buffer.
+        subscribers: Number of currently connected subscribers.
+    Methods:
+        publish(line: str) -> int: Append a line and wake up waiting subscribers.
+        read(cursor: int, timeout: float) -> List[Tuple[int, str]]: Return lines after a cursor.
+        read_nowait(cursor: int) -> List[Tuple[int, str]]: Return lines after a cursor without waiting.
+        add_listener(callback) -> None: Get notified of every published line.
+        latest_seq() -> int: Return the sequence number of the newest line.
+        subscribe() -> int: Register a subscriber and return the current cursor.
+        unsubscribe() -> None: Unregister a subscriber.
+    Usage:
+        cursor = log_broadcaster.subscribe()
+        for seq, line in log_broadcaster.read(cursor, timeout=30):
+            cursor = seq
+    """
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError(f"Invalid log buffer size: {capacity}")
+        self.capacity = capacity
+        self.subscribers = 0
+        self._entries: List[Optional[Tuple[int, str]]] = [None] * capacity
+        self._next_seq = 1
+        self._condition = threading.Condition()
+        self._listeners: List[Callable[[int], None]] = []
+    
+    def publish(self, line: str) -> int:
+        """Append a line to the ring buffer and return its sequence number."""
+        with self._condition:
+            seq = self._next_seq
+            self._entries[seq % self.capacity] = (seq, line)
+            self._next_seq += 1
+            self._condition.notify_all()
+        for listener in self._listeners:
+            listener(seq)
+        return seq
+    
+    def latest_seq(self) -> int:
+        """Return the sequence number of the newest line, or 0 if there is none."""
+        with self._condition:
+            return self._next_seq - 1
+    
+    def read(self, cursor: int, timeout: Optional[float] = None) -> List[Tuple[int, str]]:
+        """
+        Return all buffered lines with a sequence number greater than cursor.
+        
+        Waits up to timeout seconds for new lines if there are none yet. Lines
+        that have already been overwritten in the ring buffer are skipped.
+        """
+        with self._condition:
+            if cursor >= self._next_seq - 1:
+                self._condition.wait(timeout)
+            return self._since(cursor)
+    
+    def read_nowait(self, cursor: int) -> List[Tuple[int, str]]:
+        """Return all buffered lines after cursor without waiting."""
+        with self._condition:
+            return self._since(cursor)
+    
+    def add_listener(self, callback: Callable[[int], None]) -> None:
+        """Register a callback invoked with the sequence number of every published line."""
+        self._listeners.append(callback)
+    
+    def _since(self, cursor: int) -> List[Tuple[int, str]]:
+        """Collect the lines after cursor. Caller holds the condition."""
+        start = max(cursor + 1, self._next_seq - self.capacity, 1)
+        return [self._entries[seq % self.capacity] for seq in range(start, self._next_seq)]
+    
+    def subscribe(self) -> int:
+        """Register a subscriber and return a cursor positioned at the newest line."""
+        with self._condition:
+            self.subscribers += 1
+            return self._next_seq - 1
+    
+    def unsubscribe(self) -> None:
+        """Unregister a subscriber."""
+        with self._condition:
+            self.subscribers = max(0, self.subscribers - 1)
+
+
+# Global broadcaster for live logs
+log_broadcaster = LogBroadcaster(Config.LOG_BUFFER_SIZE)
 
 class CrewAILogCapture:
     """
@@ -20,15 +122,24 @@ class CrewAILogCapture:
     specific patterns to determine if a line is substantive agent activity.
     
     It also handles writing to the original stream while capturing logs.
-    The captured logs are sent to a global queue for streaming to clients.
+    Writing only hands the raw text to a bounded queue; a background thread
+    does the cleaning, filtering and publishing in batches and coalesces
+    flushes of the original stream, so printing never waits on log processing.
+    The captured logs are published to the global log broadcaster for streaming to clients.
     This allows for real-time log streaming without cluttering the output with noise.
     
     Attributes:
         original_stream: The original stdout or stderr stream being captured.
         buffer: A StringIO buffer to temporarily hold log lines before processing.
-        recent_logs: A set to track recent log messages to prevent infinite repetition.
+        dedup: Bounded LRU and count-min sketch that suppress repeated log messages.
+        chunks_dropped: Number of raw chunks dropped because the handoff queue was full;
+            a line cut by a drop is discarded whole rather than published corrupted.
+        lines_processed: Number of non-empty lines cleaned and filtered.
+        lines_published: Number of lines published to the broadcaster.
     Methods:
-        write(text: str) -> None: Write text to the original stream and process for log queue.
+        write(text: str) -> None: Write text to the original stream and queue it for processing.
+        drain() -> None: Process all queued text immediately.
+        stats() -> dict: Return handoff, processing and dedup counters.
         _clean_ansi_codes(text: str) -> str: Remove ANSI escape codes and clean up the text.
         _is_agent_log(line: str) -> bool: Check if the log line is substantive agent activity.
         flush() -> None: Flush the original stream.
@@ -42,7 +153,7 @@ class CrewAILogCapture:
         To use this class, replace sys.stdout and sys.stderr with instances of CrewAILogCapture
         during application startup. This will capture all logs written to stdout/stderr
         and filter them according to the defined criteria.
-        The captured logs can then be accessed via the global log queue.
+        The captured logs can then be read from the global log broadcaster.
         Example:
             original_stdout, original_stderr = setup_crewai_log_capture()
             # Now all logs written to stdout/stderr will be captured and processed.
@@ -50,136 +161,147 @@ class CrewAILogCapture:
     def __init__(self, original_stream):
         self.original_stream = original_stream
         self.buffer = io.StringIO()
-        self.recent_logs = set()  # Track recent logs to prevent repetition
-        self.max_recent_logs = 100  # Maximum number of recent logs to track
-        self.message_counts = {}  # Track how many times each message appears
-        self.max_repetitions = 3  # Maximum times a message can be repeated
+        # Bounded recent-line window and repetition counter to prevent repetition
+        self.dedup = LogDeduplicator(
+            window=Config.LOG_DEDUP_WINDOW,
+            max_repetitions=Config.LOG_MAX_REPETITIONS,
+            sketch_width=Config.LOG_SKETCH_WIDTH,
+            sketch_depth=Config.LOG_SKETCH_DEPTH,
+            rate_window_seconds=Config.LOG_RATE_WINDOW_SECONDS,
+        )
+        # Raw chunks handed from writer threads to the processing thread; None marks a cut line
+        self._pending = deque()
+        self._max_pending = Config.LOG_HANDOFF_MAX_CHUNKS
+        self._skipping = False
+        self._writes = 0
+        # Guards the handoff state shared by all writing threads (counters, cut-line state, queue bound)
+        self._handoff_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._process_lock = threading.Lock()
+        self._partial = ''
+        self._worker = None
+        self.chunks_dropped = 0
+        self.lines_processed = 0
+        self.lines_published = 0
         
     def write(self, text: str) -> None:
-        """Write text to original stream and process for log queue."""
-        # Write to original stream
+        """Write text to original stream and hand it off for log processing."""
+        # Write to original stream; flushing is coalesced by the processing thread
         self.original_stream.write(text)
-        self.original_stream.flush()
         
-        # Filter and send relevant lines to log queue
-        lines = text.strip().split('\n') if text.strip() else []
+        # Hand the raw chunk off without blocking. When the queue is full the new
+        # chunk is dropped, and so is the rest of the line it was part of
+        with self._handoff_lock:
+            self._writes += 1
+            if self._skipping:
+                newline = text.find('\n')
+                if newline < 0:
+                    self.chunks_dropped += 1
+                    return
+                text = text[newline + 1:]
+            if len(self._pending) >= self._max_pending:
+                self.chunks_dropped += 1
+                if not self._skipping:
+                    self._skipping = True
+                    self._pending.append(None)
+                return
+            self._skipping = False
+            self._pending.append(text)
+        self._wakeup.set()
+        
+        if self._worker is None:
+            self._start_worker()
+    
+    def drain(self) -> None:
+        """Process all pending chunks, including an unterminated last line, right away."""
+        with self._process_lock:
+            self._process_pending(final=True)
+    
+    def stats(self) -> dict:
+        """Return handoff and processing counters together with the dedup stats."""
+        return {
+            'pending_chunks': len(self._pending),
+            'chunks_dropped': self.chunks_dropped,
+            'lines_processed': self.lines_processed,
+            'lines_published': self.lines_published,
+            'dedup': self.dedup.stats(),
+        }
+    
+    def _start_worker(self) -> None:
+        """Start the background thread that cleans, filters and publishes lines."""
+        with self._process_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_worker, name='log-capture', daemon=True)
+                self._worker.start()
+    
+    def _run_worker(self) -> None:
+        """Process handed-off chunks in batches until the process exits."""
+        seen = 0
+        while True:
+            self._wakeup.wait(timeout=Config.LOG_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            # Output is quiet when nothing was written since the previous pass
+            writes = self._writes
+            with self._process_lock:
+                # An unterminated line is only processed once output goes quiet
+                self._process_pending(final=writes == seen)
+                try:
+                    self.original_stream.flush()
+                except (OSError, ValueError):
+                    pass
+            seen = writes
+    
+    def _process_pending(self, final: bool) -> None:
+        """Split pending chunks into lines and publish the agent logs. Caller holds the process lock."""
+        chunks = [self._partial]
+        while True:
+            try:
+                chunk = self._pending.popleft()
+            except IndexError:
+                break
+            if chunk is None:
+                # The end of the line in progress was dropped; drop its start too
+                while chunks and '\n' not in chunks[-1]:
+                    chunks.pop()
+                if chunks:
+                    chunks[-1] = chunks[-1][:chunks[-1].rfind('\n') + 1]
+            else:
+                chunks.append(chunk)
+        
+        lines = ''.join(chunks).split('\n')
+        self._partial = '' if final else lines.pop()
+        
+        # Pick up edits to the filter rules
+        log_filter.reload_if_changed()
+        
+        # Filter and publish relevant lines to the broadcaster
         for line in lines:
+            if not line.strip():
+                continue
+            self.lines_processed += 1
             cleaned_line = self._clean_ansi_codes(line)
             if self._is_agent_log(cleaned_line) and cleaned_line.strip():
-                # Check for repetition to prevent infinite loops
-                if cleaned_line not in self.recent_logs:
-                    # Check rate limiting
-                    if cleaned_line in self.message_counts:
-                        if self.message_counts[cleaned_line] >= self.max_repetitions:
-                            continue  # Skip this message, it's been repeated too much
-                        self.message_counts[cleaned_line] += 1
-                    else:
-                        self.message_counts[cleaned_line] = 1
-                    
-                    try:
-                        log_queue.put(cleaned_line)
-                        # Add to recent logs and maintain size limit
-                        self.recent_logs.add(cleaned_line)
-                        if len(self.recent_logs) > self.max_recent_logs:
-                            # Remove oldest entries (convert to list, remove first, convert back)
-                            self.recent_logs = set(list(self.recent_logs)[-self.max_recent_logs//2:])
-                    except:
-                        pass
+                # Skip recent duplicates and lines repeated too often
+                if self.dedup.should_publish(cleaned_line):
+                    log_broadcaster.publish(cleaned_line)
+                    self.lines_published += 1
     
     def _clean_ansi_codes(self, text: str) -> str:
         """Remove ANSI escape codes and clean up the text."""
         # Remove ANSI escape sequences
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        cleaned = ansi_escape.sub('', text)
+        cleaned = ANSI_ESCAPE_RE.sub('', text)
         
         # Remove cursor movement codes
-        cursor_codes = re.compile(r'\[2K\[1A|\[2K|\[1A')
-        cleaned = cursor_codes.sub('', cleaned)
+        cleaned = CURSOR_CODES_RE.sub('', cleaned)
         
         # Clean up extra whitespace but preserve formatting
-        cleaned = re.sub(r'\n\s*\n', '\n', cleaned)
+        cleaned = BLANK_LINES_RE.sub('\n', cleaned)
         
         return cleaned.strip()
     
     def _is_agent_log(self, line: str) -> bool:
         """Check if the log line is a substantive agent/task/requirements/instructions log."""
-        if not line or len(line.strip()) < 3:
-            return False
-
-        # More restrictive include patterns - focus on actual agent activity
-        include_patterns = [
-            r'^Agent:\s',                # Agent: ...
-            r'^Task:\s',                 # Task: ...
-            r'Requirements:',            # Requirements: ...
-            r'Design:',                  # Design discussions
-            r'Implementation:',          # Implementation notes
-            r'Testing:',                 # Testing discussions
-            r'Frontend:',                # Frontend discussions
-            r'Backend:',                 # Backend discussions
-            r'\banalyzing\b',            # analyzing
-            r'\bimplementing\b',         # implementing
-            r'\bcreating\b',             # creating
-            r'\bbuilding\b',             # building
-            r'\bdesigning\b',            # designing
-            r'\btesting\b',              # testing
-            r'\bwriting\b',              # writing
-            r'\bcode\b',                 # code
-            r'\bfunction\b',             # function
-            r'\bclass\b',                # class
-            r'\bmethod\b',               # method
-            r'\bAPI\b',                  # API
-            r'\bUI\b',                   # UI
-            r'\bcomponent\b',            # component
-            r'📝',                       # Emoji for requirements
-            r'🔧',                       # Tools/implementation
-            r'💻',                       # Code/development
-            r'🎨',                       # Design/frontend
-            r'🧪',                       # Testing
-            r'⚙️',                       # Backend/systems
-            r'^\s*\d+\.\s',              # Numbered lists
-            r'^\s*[-*]\s',               # Bullet points
-            r'Let me',                   # Agent thinking
-            r'I need to',                # Agent planning
-            r'I will',                   # Agent actions
-            r'Here is',                  # Agent output
-            r'Here\'s',                  # Agent output
-            r'Executing Task', r'Agent Started', r'Agent Completed',  # Status messages
-        ]
-
-        # Much more restrictive exclude patterns - exclude CrewAI noise
-        exclude_patterns = [
-            r'werkzeug', r'HTTP/1.1', r'Starting Flask', r'Running on',
-            r'__main__', r'\[HEARTBEAT\]', r'Traceback', r'^\s*$',
-            r'Client connected', r'Client disconnected',
-            r'^Status:', r'^Assigned to:', r'^Crew:',  # CrewAI internal messages
-            r'^├──', r'^└──', r'^│', r'^╭─', r'^╰─', r'─────',  # Tree structures
-            r'🤖', r'📋', r'✅$', r'⚠️', r'❌',  # Status emojis
-            r'Engineering Team Lead', r'Senior Backend Engineer',  # Role assignments
-            r'Frontend Engineer', r'Test Engineer', r'Task Completion',
-            r'Python Engineer who can write code',  # Specific repetitive assignment
-            r'─{3,}',  # Long dashes (borders)
-            r'^\s*$',  # Empty lines
-        ]
-
-        import re
-        # If any exclude pattern matches, skip
-        for pat in exclude_patterns:
-            if re.search(pat, line, re.IGNORECASE):
-                return False
-
-        # If any include pattern matches, allow
-        for pat in include_patterns:
-            if re.search(pat, line, re.IGNORECASE):
-                return True
-
-        # Also allow any line that's reasonably long and contains useful words
-        useful_keywords = ['develop', 'build', 'create', 'implement', 'design', 'test', 'user', 'data', 'system', 'application']
-        if len(line) > 20:  # Reasonable length
-            for keyword in useful_keywords:
-                if keyword.lower() in line.lower():
-                    return True
-
-        return False
+        return log_filter.matches(line)
 
     def flush(self):
         """Flush the original stream."""
@@ -231,9 +353,119 @@ def setup_crewai_log_capture() -> tuple:
     return original_stdout, original_stderr
 
 
-def get_log_queue() -> queue.Queue:
-    """Get the global log queue."""
-    return log_queue
+# Event bus subscription of publish_crew_event, once set up
+_crew_event_subscription = None
+
+
+def format_crew_event(event) -> Optional[str]:
+    """Render a structured crew event as a live log line, or None to skip it."""
+    data = event.data
+    task = f" [{event.task_key}]" if event.task_key else ''
+    if event.type == 'task_started':
+        return f"🚦 Agent: {data.get('agent')} started task{task}"
+    if event.type == 'task_finished':
+        reused = ', reused' if data.get('reused') else ''
+        return (f"✅ Agent: {data.get('agent')} finished task{task} in "
+                f"{data.get('duration_ms', 0) / 1000:.1f}s ({data.get('size', 0)} chars{reused})")
+    if event.type == 'tool_call':
+        return f"🔧 Using tool: {data.get('tool')}{task}"
+    if event.type == 'llm_call_finished':
+        status = 'cached' if data.get('cached') else f"failed: {data['error']}" if data.get('error') else 'ok'
+        return f"🤖 LLM {data.get('model')}{task} answered in {data.get('duration_ms', 0) / 1000:.1f}s ({status})"
+    if event.type == 'context_shaped':
+        return (f"✂️ Context{task} shaped from {data.get('tokens_before')} to "
+                f"{data.get('tokens_after')} tokens (~{data.get('tokens_saved')} saved)")
+    return None
+
+
+def publish_crew_event(event) -> None:
+    """Event bus subscriber that streams crew events as live log lines."""
+    line = format_crew_event(event)
+    if line:
+        log_broadcaster.publish(line)
+
+
+def setup_crew_event_logging(bus) -> None:
+    """Stream crew events from the given event bus to live log clients, once."""
+    global _crew_event_subscription
+    if _crew_event_subscription is None:
+        _crew_event_subscription = bus.subscribe(publish_crew_event)
+
+
+def get_log_capture_stats() -> dict:
+    """Get processing and dedup stats of the active stdout/stderr captures."""
+    stats = {}
+    for name, stream in (('stdout', sys.stdout), ('stderr', sys.stderr)):
+        if isinstance(stream, CrewAILogCapture):
+            stats[name] = stream.stats()
+    return stats
+
+
+def get_log_broadcaster() -> LogBroadcaster:
+    """Get the global log broadcaster."""
+    return log_broadcaster
+
+
+# Sample lines that the log filter should include
+GOOD_LOG_SAMPLES = [
+    "Agent: I will analyze the requirements",
+    "Let me implement this feature",
+    "Requirements: Create a user management system",
+    "Design: The system will have these components",
+    "I need to write unit tests for this",
+    "Here is the implementation:",
+    "Testing: Running unit tests",
+    "Frontend: Creating the UI components",
+    "Backend: Implementing the API",
+    "1. First step",
+    "2. Second step",
+    "- Bullet point",
+    "* Another bullet",
+    "📝 Requirements analysis",
+    "🔧 Implementation",
+    "💻 Code development",
+    "🎨 UI design",
+    "🧪 Testing",
+    "⚙️ Backend systems"
+]
+
+# Sample lines that the log filter should exclude
+BAD_LOG_SAMPLES = [
+    "Assigned to: Python Engineer who can write code",
+    "Status: Starting",
+    "Status: Complete",
+    "Crew: Engineering Team",
+    "Executing Task",
+    "Agent Started",
+    "Agent Completed",
+    "Engineering Team Lead",
+    "Senior Backend Engineer",
+    "Frontend Engineer",
+    "Test Engineer",
+    "Task Completion",
+    "🤖 Agent",
+    "📋 Task",
+    "✅ Complete",
+    "⚠️ Warning",
+    "❌ Error",
+    "├── Task",
+    "└── Agent",
+    "│   Assigned to:",
+    "╭─ Crew",
+    "╰─ End",
+    "─────",
+    "werkzeug",
+    "HTTP/1.1",
+    "Starting Flask",
+    "Running on",
+    "__main__",
+    "[HEARTBEAT]",
+    "Traceback",
+    "",
+    "   ",
+    "Client connected",
+    "Client disconnected"
+]
 
 
 def test_log_filtering():
@@ -243,84 +475,25 @@ def test_log_filtering():
     test_stream = io.StringIO()
     capture = CrewAILogCapture(test_stream)
     
-    # Test messages that should be included
-    good_messages = [
-        "Agent: I will analyze the requirements",
-        "Let me implement this feature",
-        "Requirements: Create a user management system",
-        "Design: The system will have these components",
-        "I need to write unit tests for this",
-        "Here is the implementation:",
-        "Testing: Running unit tests",
-        "Frontend: Creating the UI components",
-        "Backend: Implementing the API",
-        "1. First step",
-        "2. Second step",
-        "- Bullet point",
-        "* Another bullet",
-        "📝 Requirements analysis",
-        "🔧 Implementation",
-        "💻 Code development",
-        "🎨 UI design",
-        "🧪 Testing",
-        "⚙️ Backend systems"
-    ]
-    
-    # Test messages that should be excluded
-    bad_messages = [
-        "Assigned to: Python Engineer who can write code",
-        "Status: Starting",
-        "Status: Complete",
-        "Crew: Engineering Team",
-        "Executing Task",
-        "Agent Started",
-        "Agent Completed",
-        "Engineering Team Lead",
-        "Senior Backend Engineer",
-        "Frontend Engineer",
-        "Test Engineer",
-        "Task Completion",
-        "🤖 Agent",
-        "📋 Task",
-        "✅ Complete",
-        "⚠️ Warning",
-        "❌ Error",
-        "├── Task",
-        "└── Agent",
-        "│   Assigned to:",
-        "╭─ Crew",
-        "╰─ End",
-        "─────",
-        "werkzeug",
-        "HTTP/1.1",
-        "Starting Flask",
-        "Running on",
-        "__main__",
-        "[HEARTBEAT]",
-        "Traceback",
-        "",
-        "   ",
-        "Client connected",
-        "Client disconnected"
-    ]
-    
     print("🧪 Testing log filtering...")
     
     # Test good messages
     included_count = 0
-    for msg in good_messages:
+    for msg in GOOD_LOG_SAMPLES:
         capture.write(msg + "\n")
-        if msg in capture.recent_logs:
+        capture.drain()
+        if msg in capture.dedup:
             included_count += 1
     
     # Test bad messages
     excluded_count = 0
-    for msg in bad_messages:
+    for msg in BAD_LOG_SAMPLES:
         capture.write(msg + "\n")
-        if msg not in capture.recent_logs:
+        capture.drain()
+        if msg not in capture.dedup:
             excluded_count += 1
     
-    print(f"✅ Included {included_count}/{len(good_messages)} good messages")
-    print(f"✅ Excluded {excluded_count}/{len(bad_messages)} bad messages")
+    print(f"✅ Included {included_count}/{len(GOOD_LOG_SAMPLES)} good messages")
+    print(f"✅ Excluded {excluded_count}/{len(BAD_LOG_SAMPLES)} bad messages")
     
-    return included_count == len(good_messages) and excluded_count == len(bad_messages)
+    return included_count == len(GOOD_LOG_SAMPLES) and excluded_count == len(BAD_LOG_SAMPLES)
@@ -1,11 +1,11 @@
-import { useState } from 'react';
+import { useRef, useState } from 'react';
 // Import necessary components
 import RequirementsForm from './components/RequirementsForm';
 import TeamOverview from './components/TeamOverview';
 import CodeOutputs from './components/CodeOutputs';
 import LiveLogs from './components/LiveLogs';
 // Import API service methods
-import { generateCode as apiGenerateCode } from './services/api';
+import { generateCode as apiGenerateCode, newIdempotencyKey } from './services/api';
 // Import modern icons
 import { Sparkles, Zap, Clock } from 'lucide-react';
 import './App.css';
@@ -20,12 +20,17 @@ function App() {
   const [requirements, setRequirements] = useState('');
   const [outputs, setOutputs] = useState({});
   const [loading, setLoading] = useState(false);
+  // Idempotency-Key of a submission whose outcome is unknown, reused when it is retried
+  const pendingSubmission = useRef(null);
 
   /**
    * Generates code based on the provided requirements.
    * Sends a request to the backend to process the requirements and generate code.
-   * Displays the generated code in the UI.
+   * Displays each task's output as soon as it finishes, then the final result.
    * If requirements are empty, alerts the user to enter them first.
+   * Each click is one submission with its own Idempotency-Key; if the request
+   * failed without an answer, clicking again for the same requirements reuses
+   * the key, so a job the backend already accepted is not started twice.
    * @returns {Promise<void>} - Generates code based on the provided requirements.
    */
   const generateCode = async () => {
@@ -34,12 +39,24 @@ function App() {
       alert('Please enter your requirements first!');
       return;
     }
+    // Ignore clicks while a submission is in progress
+    if (loading) {
+      return;
+    }
     // Reset outputs and set loading state
     setLoading(true);
     setOutputs({});
     
+    if (pendingSubmission.current?.requirements !== requirements) {
+      pendingSubmission.current = { requirements, idempotencyKey: newIdempotencyKey() };
+    }
+    
     try {
-      const data = await apiGenerateCode(requirements);
+      const data = await apiGenerateCode(requirements, (taskKey, output) => {
+        setOutputs((previous) => ({ ...previous, [taskKey]: output }));
+      }, pendingSubmission.current.idempotencyKey);
+      // The backend answered, so the next click is a new submission
+      pendingSubmission.current = null;
       
       // Check if the response is successful
       if (data.status === 'success') {
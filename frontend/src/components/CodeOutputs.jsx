@@ -74,7 +74,8 @@ function CodeOutputs({ outputs, loading }) {
             .join('');
     };
 
-    if (loading) {
+    // Finished tasks stream in while the rest of the team is still working
+    if (loading && (!outputs || Object.keys(outputs).length === 0)) {
         return (
             <div className="section">
                 <h2>
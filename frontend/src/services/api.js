@@ -1,6 +1,35 @@
 // Localhost for development
 const API_BASE_URL = 'http://localhost:5001';
 
+// How often to poll a queued code generation job
+const JOB_POLL_INTERVAL_MS = 2000;
+
+// How often a code generation submission is resent after a network error or 502/503/504
+const SUBMIT_RETRIES = 3;
+const SUBMIT_RETRY_DELAY_MS = 1000;
+const RETRYABLE_STATUSES = [502, 503, 504];
+
+/**
+ * New Idempotency-Key for one logical code generation submission.
+ * Pass the same key to every resend of that submission.
+ */
+export function newIdempotencyKey() {
+    return crypto.randomUUID();
+}
+
+/**
+ * Id of this browser tab's session, so requirements saved here are not
+ * shared with other users or tabs. Kept in sessionStorage across reloads.
+ */
+function getSessionId() {
+    let sessionId = sessionStorage.getItem('devteamSessionId');
+    if (!sessionId) {
+        sessionId = crypto.randomUUID();
+        sessionStorage.setItem('devteamSessionId', sessionId);
+    }
+    return sessionId;
+}
+
 /**
  * RESTful API service for handling all backend requests.
  * This service provides a generic fetch wrapper with error handling,
@@ -25,15 +54,18 @@ class ApiService {
                 
         try {
             const response = await fetch(url, {
+                ...options,
                 headers: {
                     'Content-Type': 'application/json',
+                    'X-Session-Id': getSessionId(),
                     ...options.headers,
                 },
-                ...options,
             });
             
             if (!response.ok) {
-                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                const error = new Error(`HTTP ${response.status}: ${response.statusText}`);
+                error.status = response.status;
+                throw error;
             }
 
             const data = await response.json();
@@ -63,15 +95,134 @@ class ApiService {
     }
 
     /**
-     * Generate code
+     * Submit a code generation job.
+     * Network errors and 502/503/504 responses are retried with the same
+     * Idempotency-Key, so a submission that reached the backend before the
+     * error returns its existing job instead of starting a second run.
      */
-    async generateCode(requirements) {
-        return await this.request('/api/code-generation', {
-            method: 'POST',
-            body: JSON.stringify({ requirements }),
+    async submitJob(requirements, idempotencyKey) {
+        for (let attempt = 0; ; attempt++) {
+            try {
+                return await this.request('/api/code-generation', {
+                    method: 'POST',
+                    headers: { 'Idempotency-Key': idempotencyKey },
+                    body: JSON.stringify({ requirements }),
+                });
+            } catch (error) {
+                const retryable = error.status === undefined || RETRYABLE_STATUSES.includes(error.status);
+                if (!retryable || attempt >= SUBMIT_RETRIES) {
+                    throw error;
+                }
+                await new Promise((resolve) => setTimeout(resolve, SUBMIT_RETRY_DELAY_MS * (attempt + 1)));
+            }
+        }
+    }
+
+    /**
+     * Generate code.
+     * Submits a generation job and follows its event stream, calling
+     * onTaskOutput(taskKey, { agent, output }) as soon as each task finishes.
+     * Resolves with the job result. Falls back to polling if the stream fails.
+     * The idempotencyKey identifies the logical submission: resends, and calls
+     * repeating the same key, return the same job (see newIdempotencyKey).
+     */
+    async generateCode(requirements, onTaskOutput = () => {}, idempotencyKey = newIdempotencyKey()) {
+        const submission = await this.submitJob(requirements, idempotencyKey);
+
+        if (submission.status !== 'accepted') {
+            return submission;
+        }
+
+        const streamed = await this.followJobEvents(submission.job_id, onTaskOutput);
+        if (!streamed) {
+            await this.pollJob(submission.job_id);
+        }
+
+        const { job } = await this.getJob(submission.job_id);
+        if (job.state === 'succeeded') {
+            return { ...job.result, outputs: await this.loadArtifacts(job.result.outputs) };
+        }
+        return { status: 'error', message: job.error };
+    }
+
+    /**
+     * Fetch the text of a task's artifact.
+     * The browser revalidates repeated fetches with the artifact's ETag.
+     */
+    async getArtifact(url) {
+        const response = await fetch(`${this.baseUrl}${url}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        return await response.text();
+    }
+
+    /**
+     * Turn the manifest entries of a job result into { agent, output } entries
+     */
+    async loadArtifacts(manifest = {}) {
+        const entries = await Promise.all(
+            Object.entries(manifest).map(async ([taskKey, entry]) => [
+                taskKey,
+                { agent: entry.agent, output: await this.getArtifact(entry.url) },
+            ])
+        );
+        return Object.fromEntries(entries);
+    }
+
+    /**
+     * Follow a job's event stream until it finishes.
+     * Resolves true once the job reached a final state, false if the stream failed.
+     */
+    followJobEvents(jobId, onTaskOutput) {
+        return new Promise((resolve) => {
+            const eventSource = new EventSource(`${this.baseUrl}/api/jobs/${jobId}/events`);
+
+            eventSource.addEventListener('task_completed', async (event) => {
+                const data = JSON.parse(event.data);
+                try {
+                    onTaskOutput(data.task_key, { agent: data.agent, output: await this.getArtifact(data.url) });
+                } catch (error) {
+                    console.error(`Could not load the ${data.task_key} artifact:`, error);
+                }
+            });
+
+            eventSource.addEventListener('job_state', (event) => {
+                const data = JSON.parse(event.data);
+                if (data.state === 'succeeded' || data.state === 'failed') {
+                    eventSource.close();
+                    resolve(true);
+                }
+            });
+
+            eventSource.onerror = () => {
+                // The stream closes after the final state; only a failure before that lands here
+                eventSource.close();
+                resolve(false);
+            };
         });
     }
 
+    /**
+     * Poll a job until it reaches a final state
+     */
+    async pollJob(jobId) {
+        while (true) {
+            const { job } = await this.getJob(jobId);
+            if (job.state === 'succeeded' || job.state === 'failed') {
+                return job;
+            }
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        }
+    }
+
+    /**
+     * Get a code generation job's status and result
+     */
+    async getJob(jobId) {
+        return await this.request(`/api/jobs/${jobId}`);
+    }
+
     /**
      * Health check
      */
@@ -86,5 +237,7 @@ export const apiService = new ApiService();
 // Export individual methods for convenience with proper binding
 export const getTeamConfig = () => apiService.getTeamConfig();
 export const saveRequirements = (requirements) => apiService.saveRequirements(requirements);
-export const generateCode = (requirements) => apiService.generateCode(requirements);
+export const generateCode = (requirements, onTaskOutput, idempotencyKey) =>
+    apiService.generateCode(requirements, onTaskOutput, idempotencyKey);
+export const getJob = (jobId) => apiService.getJob(jobId);
 export const healthCheck = () => apiService.healthCheck();